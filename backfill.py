@@ -0,0 +1,437 @@
+"""
+과거 게시물 재분석 (백필) - 프롬프트 변경/스키마 변경 후 이력 다시 만들기
+- 대상: 저장된 스크랩 코퍼스 (기본, 이력 캐시에서 시간/URL 범위만 읽음) 또는 --scrape 로 타임라인을 새로 깊게 스크롤
+- 전처리 → 배치 분석을 --concurrency 묶음까지 동시에 실행하고 결과를 저장 (Supabase + 로컬 + 이력 캐시)
+- 처리한 게시물 URL 을 체크포인트 파일에 기록 → 중단 후 다시 실행하면 남은 게시물만 처리
+  (범위/모델/프롬프트가 바뀌면 처음부터)
+- 실시간 루프와 함께 돌려도 되도록 낮은 우선순위로 실행 (nice, API 한도의 BACKFILL_RATE_SHARE 만 사용)
+- 진행 중 posts/min, 토큰 사용량, 비용 (LLM_INPUT/OUTPUT_COST_PER_1M 기준) 출력
+사용법:
+    python backfill.py --since 2025-11-01 [--until 2025-12-01] [--concurrency 2] [--reports] [--no-cache]
+    python backfill.py --from-url <게시물 URL> --to-url <게시물 URL>
+    python backfill.py --scrape --since 2025-11-01 [--max-posts 2000]
+    python backfill.py --since 2025-11-01 --dry-run     # 대상 수와 예상 비용만
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+
+import pandas as pd
+import pytz
+
+from config import Config
+from modules.analyzer import EXPECTED_OUTPUT_TOKENS, TrumpAnalyzer
+from modules.dedup import account_from_url, post_id_from_url, timeline_url
+from modules.history import HistoryStore
+from modules import locks
+from modules.log import setup_logging
+from modules.metrics import metrics
+from modules.pipeline import build_result, needs_report, report_input
+from modules.preprocessor import preprocess_batch
+from modules.ratelimit import BACKLOG, LLMScheduler, estimate_tokens, priority
+from modules.storage import Storage
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_INTERVAL = 5  # 진행 상황 출력 간격 (초)
+
+# ---------------------------------------------------------
+# 1. 대상 게시물
+# ---------------------------------------------------------
+def in_id_range(url, from_id, to_id):
+    post_id = post_id_from_url(url)
+    if from_id is None and to_id is None:
+        return True
+    if post_id is None:
+        return False
+    return (from_id is None or post_id >= from_id) and (to_id is None or post_id <= to_id)
+
+def et_to_kst(timestamp):
+    """
+    ET 시각 → 스크래퍼와 같은 KST 문자열 (엑셀 코퍼스에는 kst_time 이 비어 있는 행이 있음)
+    """
+    kst = pytz.timezone("America/New_York").localize(timestamp.to_pydatetime()).astimezone(pytz.timezone("Asia/Seoul"))
+    return kst.strftime("%b %d, %Y, %I:%M %p")
+
+def load_stored(storage, args):
+    """
+    저장된 스크랩 코퍼스 (엑셀 + 로컬 저장소) 에서 범위 안의 게시물 (오래된 순)
+    """
+    history = storage.history or HistoryStore(local_store=storage.local)
+    df = history.query("scraped", ["url", "time", "kst_time", "content", "source"], since=args.since_et, until=args.until_et)
+    if args.from_id is not None or args.to_id is not None:
+        df = df[df["url"].map(lambda url: in_id_range(url, args.from_id, args.to_id)).astype(bool)]
+    df = df.sort_values("time", na_position="first", kind="stable")
+
+    posts = []
+    for row in df.itertuples(index=False):
+        kst_time = row.kst_time if isinstance(row.kst_time, str) else None
+        if kst_time is None:
+            kst_time = et_to_kst(row.time) if pd.notna(row.time) else "N/A"
+        posts.append({
+            "url": row.url,
+            "time": row.time.strftime("%Y-%m-%d %H:%M:%S") if pd.notna(row.time) else "N/A",
+            "kst_time": kst_time,
+            "content": row.content if isinstance(row.content, str) else "",
+            "source": row.source if isinstance(row.source, str) else account_from_url(row.url),
+        })
+    return posts
+
+async def scrape_posts(storage, args):
+    """
+    계정마다 타임라인을 --since / --from-url 까지 깊게 스크롤해서 수집 (스크랩 캐시에도 저장)
+    HTTP 백엔드를 먼저 사용하고, 실패하면 Selenium 으로 대체
+    """
+    from modules.http_scraper import FetchError, HttpTimelineFetcher
+
+    watermark = {"post_id": args.from_id - 1 if args.from_id else None, "time": args.since_et}
+    fetcher = HttpTimelineFetcher() if Config.SCRAPER_BACKEND == "http" else None
+    browser = None
+    posts = []
+    try:
+        for source in Config.SOURCES:
+            url = timeline_url(source)
+            collected = None
+            if fetcher:
+                try:
+                    collected = await fetcher.collect_new_posts(
+                        set(), max_count=args.max_posts, watermark=watermark, handle=account_from_url(url),
+                        max_pages=args.max_posts // fetcher.page_size + 1
+                    )
+                except FetchError as e:
+                    logger.warning(f"⚠️ HTTP 스크래퍼 오류 → Selenium 으로 대체: {e}")
+            if collected is None:
+                from modules.browser import DriverManager
+                from modules.scraper_pool import scrape_source
+
+                browser = browser or DriverManager()
+                collected = await asyncio.to_thread(
+                    scrape_source, browser, url, set(), watermark, probe=False, max_count=args.max_posts
+                )
+            logger.info(f"📥 {account_from_url(url)}: {len(collected)}개 수집")
+            storage.save_raw_posts(collected)
+            posts.extend(collected)
+    finally:
+        if fetcher:
+            await fetcher.close()
+        if browser:
+            browser.quit()
+
+    # 수집은 최신 게시물부터 시작하므로 상한 (--until / --to-url) 은 여기서 적용
+    posts = [
+        post for post in posts
+        if in_id_range(post["url"], None, args.to_id)
+        and (args.until_et is None or post["time"] == "N/A" or post["time"] < args.until_et)
+    ]
+    return sorted(posts, key=lambda post: post["time"])
+
+# ---------------------------------------------------------
+# 2. 체크포인트
+# ---------------------------------------------------------
+class Checkpoint:
+    """
+    처리한 게시물 URL 기록 (JSON lines: 첫 줄은 실행 조건, 이후 완료된 묶음마다 한 줄 추가)
+    실행 조건 (입력/범위/모델/프롬프트) 이 같을 때만 이어서 진행
+    """
+
+    def __init__(self, path, key, restart=False):
+        self.path = path
+        self.key = key
+        self.done = set()
+        if not restart and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                lines = f.read().splitlines()
+            try:
+                saved_key = json.loads(lines[0]).get("key") if lines else None
+            except ValueError:
+                saved_key = None
+            if saved_key == key:
+                for line in lines[1:]:
+                    try:
+                        self.done.update(json.loads(line)["done"])
+                    except (ValueError, KeyError):
+                        continue  # 중단 중 잘린 마지막 줄
+                self._file = open(path, "a", encoding="utf-8")
+                return
+            print("⚠️ 체크포인트가 현재 범위/모델/프롬프트와 달라 처음부터 진행합니다.")
+        self._file = open(path, "w", encoding="utf-8")
+        self._write({"key": key})
+
+    def _write(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def mark(self, urls):
+        self.done.update(urls)
+        self._write({"done": list(urls)})
+
+    def close(self):
+        self._file.close()
+
+    def clear(self):
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+# ---------------------------------------------------------
+# 3. 처리량 / 비용
+# ---------------------------------------------------------
+def llm_usage():
+    """
+    Returns: (요청 수, 입력 토큰, 출력 토큰, 비용 USD) - 이 프로세스에서 지금까지
+    """
+    input_tokens = metrics.total("llm_tokens_total", type="input")
+    output_tokens = metrics.total("llm_tokens_total", type="output")
+    cost = (input_tokens * Config.LLM_INPUT_COST_PER_1M + output_tokens * Config.LLM_OUTPUT_COST_PER_1M) / 1_000_000
+    return metrics.total("llm_requests_total"), input_tokens, output_tokens, cost
+
+def estimate_cost(posts, analyzer, batch_size):
+    """
+    요청 수/토큰 추정 (캐시/사전 필터 적중 없이 모두 LLM 으로 분석한다고 가정)
+    """
+    batches = -(-len(posts) // batch_size)
+    agent = analyzer.batch_agent if batch_size > 1 else analyzer.agent
+    input_tokens = batches * estimate_tokens(agent.instructions) + sum(estimate_tokens(post["content"]) for post in posts)
+    output_tokens = len(posts) * EXPECTED_OUTPUT_TOKENS
+    cost = (input_tokens * Config.LLM_INPUT_COST_PER_1M + output_tokens * Config.LLM_OUTPUT_COST_PER_1M) / 1_000_000
+    return batches, input_tokens, output_tokens, cost
+
+class Progress:
+    def __init__(self, total, target_ppm=None):
+        self.total = total
+        self.target_ppm = target_ppm
+        self.posts = 0
+        self.start = time.perf_counter()
+        self.last_report = self.start
+
+    def ppm(self):
+        elapsed = time.perf_counter() - self.start
+        return self.posts / elapsed * 60 if elapsed else 0.0
+
+    def line(self):
+        requests, input_tokens, output_tokens, cost = llm_usage()
+        ppm = self.ppm()
+        text = (
+            f"{self.posts}/{self.total}개 ({ppm:.1f} posts/min), "
+            f"LLM {requests:.0f}회 / 토큰 {input_tokens + output_tokens:,.0f} / ${cost:.4f}"
+        )
+        if ppm and self.posts < self.total:
+            text += f", 남은 시간 약 {(self.total - self.posts) / ppm:.0f}분"
+        if self.target_ppm:
+            text += f" (목표 {self.target_ppm:.0f} posts/min 대비 {ppm / self.target_ppm:.0%})"
+        return text
+
+    def add(self, count):
+        self.posts += count
+        now = time.perf_counter()
+        if now - self.last_report >= PROGRESS_INTERVAL:
+            self.last_report = now
+            print(f"   - {self.line()}")
+
+# ---------------------------------------------------------
+# 4. 재분석 (동시 묶음)
+# ---------------------------------------------------------
+def checkpoint_key(args, analyzer):
+    return {
+        "input": "scrape" if args.scrape else "store",
+        "sources": Config.SOURCES if args.scrape else None,
+        "since": args.since, "until": args.until, "from_id": args.from_id, "to_id": args.to_id,
+        "model": analyzer.model_name,
+        "instructions": hashlib.sha256(analyzer.agent.instructions.encode("utf-8")).hexdigest()[:16],
+    }
+
+async def process_chunk(posts, analyzer, reporter, storage, batch_size):
+    """
+    Returns: 완료한 게시물 URL 목록 (분석 오류는 제외 → 다시 실행하면 재시도)
+    """
+    targets = [
+        (post, content) for post, content in zip(posts, preprocess_batch([post["content"] for post in posts]))
+    ]
+    analyses = await analyzer.analyze_tweets(
+        [content for _, content in targets if content], concurrency=1, batch_size=batch_size
+    )
+
+    results = []
+    done = []
+    analyses = iter(analyses)
+    for post, content in targets:
+        if not content:
+            done.append(post["url"])  # 전처리 후 내용 없음 (분석 대상 아님)
+            continue
+        analysis = next(analyses)
+        if analysis.get("impact_on_market") == "Error":
+            metrics.inc("backfill_errors_total")
+            continue
+        results.append(build_result(post, content, analysis))
+        done.append(post["url"])
+
+    url_id_map = await storage.save_results(posts, results) if results else {}
+
+    report_targets = [result for result in results if needs_report(result)] if reporter else []
+    if report_targets:
+        reports = await reporter.generate_reports(
+            [(report_input(result), result.get("tweet_content")) for result in report_targets], concurrency=1
+        )
+        await storage.save_reports([
+            (url_id_map.get(result.get("tweet_url")), report, result.get("time_str"), result.get("tweet_url"))
+            for result, report in zip(report_targets, reports)
+        ])
+    return done
+
+async def backfill(args):
+    # 실시간 루프와 같은 저널 파일을 쓰면 서로 덮어쓰므로 (재전송 시 파일 전체 교체) 따로 보관
+    Config.WRITE_JOURNAL_PATH += ".backfill"
+    storage = Storage()
+    # 실시간 루프와 같은 API 한도를 나눠 씀 (백필은 BACKFILL_RATE_SHARE 만큼만, 실시간 루프는 그동안 나머지만 사용)
+    # 이 프로세스에는 백로그 요청뿐이므로 예약 없음
+    limiter = LLMScheduler(rpm=Config.LLM_RPM, tpm=Config.LLM_TPM, reserve=0)
+    limiter.set_share(Config.BACKFILL_RATE_SHARE)
+    analyzer = TrumpAnalyzer(limiter)
+    if args.no_cache:
+        analyzer.cache = None
+    reporter = None
+    if args.reports:
+        from modules.reporter import TrumpReporter
+        reporter = TrumpReporter(limiter)
+
+    try:
+        posts = await scrape_posts(storage, args) if args.scrape else load_stored(storage, args)
+        print(f"📋 대상 게시물 {len(posts)}개")
+
+        if args.dry_run:
+            batches, input_tokens, output_tokens, cost = estimate_cost(posts, analyzer, args.batch_size)
+            print(
+                f"💰 예상 (캐시 미적중 기준): 요청 {batches}회, 입력 {input_tokens:,}토큰 / 출력 {output_tokens:,}토큰, ${cost:.4f}"
+            )
+            return True
+
+        checkpoint = Checkpoint(args.checkpoint, checkpoint_key(args, analyzer), restart=args.restart)
+        todo = [post for post in posts if post["url"] not in checkpoint.done]
+        if len(todo) < len(posts):
+            print(f"📌 체크포인트에서 이어서 진행 (완료된 게시물 {len(posts) - len(todo)}개 건너뜀)")
+
+        progress = Progress(len(todo), args.target_ppm)
+        semaphore = asyncio.Semaphore(args.concurrency)
+        failed = 0
+
+        async def run_chunk(chunk):
+            nonlocal failed
+            try:
+                with metrics.span("backfill.chunk"), priority(BACKLOG):
+                    done = await process_chunk(chunk, analyzer, reporter, storage, args.batch_size)
+                checkpoint.mark(done)
+                failed += len(chunk) - len(done)
+                progress.add(len(chunk))
+            except Exception as e:
+                logger.warning(f"⚠️ 묶음 처리 오류 ({len(chunk)}개): {e}")
+                failed += len(chunk)
+            finally:
+                semaphore.release()
+
+        tasks = []
+        try:
+            for i in range(0, len(todo), args.chunk_size):
+                # 동시 처리 묶음 수 제한 (실시간 루프 몫을 남겨 둠)
+                await semaphore.acquire()
+                tasks.append(asyncio.create_task(run_chunk(todo[i:i + args.chunk_size])))
+            await asyncio.gather(*tasks)
+        finally:
+            checkpoint.close()
+
+        print(f"✅ {progress.line()}")
+        if analyzer.cache:
+            stats = analyzer.cache.stats()
+            print(f"💾 캐시 적중 {stats['hits']} / 미스 {stats['misses']}")
+        if args.target_ppm and progress.ppm() < args.target_ppm:
+            print(
+                f"🐢 목표 처리량 ({args.target_ppm:.0f} posts/min) 미달 → --concurrency / --batch-size "
+                f"또는 BACKFILL_RATE_SHARE 를 늘려 보세요."
+            )
+        if failed:
+            print(f"❌ 실패 {failed}개 → 다시 실행하면 실패한 게시물만 재시도합니다.")
+            return False
+        checkpoint.clear()
+        return True
+    finally:
+        await storage.flush()
+        await storage.close()
+
+def parse_time(value):
+    """
+    --since / --until (ET, 예: 2025-11-01 또는 "2025-11-01 09:30")
+    """
+    return pd.Timestamp(value).strftime("%Y-%m-%d %H:%M:%S") if value else None
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--since", help="이 시각 이후 게시물 (ET)")
+    parser.add_argument("--until", help="이 시각 이전 게시물 (ET)")
+    parser.add_argument("--from-url", help="이 게시물부터 (포함)")
+    parser.add_argument("--to-url", help="이 게시물까지 (포함)")
+    parser.add_argument("--scrape", action="store_true", help="저장된 코퍼스 대신 타임라인을 새로 스크롤")
+    parser.add_argument("--max-posts", type=int, default=1000, help="--scrape 시 계정당 최대 수집 수")
+    parser.add_argument("--batch-size", type=int, default=Config.ANALYSIS_BATCH_SIZE, help="요청당 묶을 트윗 수")
+    parser.add_argument("--chunk-size", type=int, default=32, help="저장/체크포인트 단위 게시물 수")
+    parser.add_argument("--concurrency", type=int, default=Config.BACKFILL_CONCURRENCY, help="동시 처리 묶음 수")
+    parser.add_argument("--target-ppm", type=float, help="목표 처리량 (posts/min, 진행 상황에 달성률 표시)")
+    parser.add_argument("--reports", action="store_true", help="리포트 조건을 만족하면 리포트도 다시 생성")
+    parser.add_argument("--no-cache", action="store_true", help="분석 캐시를 무시하고 모두 다시 분석")
+    parser.add_argument("--checkpoint", default=Config.BACKFILL_CHECKPOINT_PATH)
+    parser.add_argument("--restart", action="store_true", help="체크포인트를 무시하고 처음부터")
+    parser.add_argument("--dry-run", action="store_true", help="대상 수와 예상 비용만 출력")
+    args = parser.parse_args()
+
+    setup_logging()
+    try:
+        args.since_et, args.until_et = parse_time(args.since), parse_time(args.until)
+    except ValueError as e:
+        print(f"❌ 시간 형식 오류: {e}")
+        sys.exit(1)
+    args.from_id = post_id_from_url(args.from_url) if args.from_url else None
+    args.to_id = post_id_from_url(args.to_url) if args.to_url else None
+    if (args.from_url and args.from_id is None) or (args.to_url and args.to_id is None):
+        print("❌ 게시물 URL 에서 ID 를 찾을 수 없습니다.")
+        sys.exit(1)
+    if not args.dry_run and not Config.OPENAI_API_KEY:
+        print("❌ .env 파일에 OPENAI_API_KEY 를 설정해주세요.")
+        sys.exit(1)
+
+    # 실시간 루프보다 낮은 우선순위 (CPU: 전처리/파싱)
+    if Config.BACKFILL_NICE and hasattr(os, "nice"):
+        os.nice(Config.BACKFILL_NICE)
+
+    # 실행 중 표시 → 실시간 루프가 BACKFILL_RATE_SHARE 만큼 한도를 양보 (백필은 한 번에 하나만)
+    lock = None
+    if not args.dry_run:
+        if not locks.AVAILABLE:
+            # 실시간 루프가 백필을 알아챌 수 없어 두 프로세스 합이 API 한도를 넘음
+            print("❌ 이 플랫폼에서는 프로세스 간 잠금을 쓸 수 없어 실시간 루프와 함께 백필을 실행할 수 없습니다.")
+            sys.exit(1)
+        lock = locks.acquire(Config.BACKFILL_LOCK_PATH)
+        if lock is None:
+            print(f"❌ 다른 백필이 실행 중입니다. ({Config.BACKFILL_LOCK_PATH})")
+            sys.exit(1)
+
+    print(
+        f"🚀 백필 시작 (동시 {args.concurrency}묶음, 배치 {args.batch_size}, "
+        f"API 한도의 {Config.BACKFILL_RATE_SHARE:.0%})"
+    )
+    try:
+        ok = asyncio.run(backfill(args))
+    except KeyboardInterrupt:
+        print("\n⏸️ 중단됨 → 다시 실행하면 체크포인트부터 이어서 진행합니다.")
+        sys.exit(130)
+    finally:
+        locks.release(lock)
+    if ok:
+        print("🎉 백필 완료!")
+    else:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+벤치마크용 입력 데이터
+- 저장된 타임라인 HTML 템플릿 + 엑셀 코퍼스 본문으로 만든 가상 스크롤 타임라인
+- 엑셀 코퍼스 본문
+- 저장소 벤치마크용 합성 행
+- 전체 상장 목록 크기의 합성 기업 목록
+"""
+import csv
+import html
+import os
+from datetime import datetime, timedelta
+from string import Template
+
+import pandas as pd
+import pytz
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+CORPORA = [
+    ("merged_all_excel.xlsx", "content"),
+    ("trump_posts_scraped.xlsx", "content"),
+]
+
+TIMELINE_URL = "https://truthsocial.com/@realDonaldTrump"
+FIRST_POST_ID = 115437640213385011
+START_TIME = datetime(2025, 11, 1, 9, 0)  # KST
+
+def _template(name):
+    with open(os.path.join(FIXTURE_DIR, name), encoding="utf-8") as f:
+        return Template(f.read())
+
+def load_corpus(path, column="content"):
+    """
+    엑셀 코퍼스의 본문 목록 (빈 값 제외)
+    """
+    df = pd.read_excel(os.path.join(ROOT, path))
+    return [text for text in df[column].tolist() if isinstance(text, str) and text.strip()]
+
+def corpus_texts():
+    texts = []
+    for path, column in CORPORA:
+        texts.extend(load_corpus(path, column))
+    return texts
+
+def post_url(n):
+    return f"{TIMELINE_URL}/{FIRST_POST_ID - n}"
+
+def timeline_posts(texts, count):
+    """
+    최신순 게시물 count 개의 HTML 조각 목록 (data-index 0 이 가장 최신)
+    - 10개마다 ReTruth 1개, 맨 위에는 고정 게시물 포함
+    """
+    post_tpl = _template("timeline_post.html")
+    posts = []
+    for n in range(count):
+        kst = START_TIME - timedelta(minutes=17 * n)
+        if n == 0:
+            status_info = '<div role="status-info"><span>Pinned Truth</span></div>'
+        elif n % 10 == 7:
+            status_info = '<div role="status-info"><span>Donald J. Trump ReTruthed</span></div>'
+        else:
+            status_info = ""
+        text = texts[n % len(texts)]
+        posts.append(post_tpl.substitute(
+            index=n,
+            post_id=FIRST_POST_ID - n,
+            title=kst.strftime("%b %d, %Y, %I:%M %p"),
+            datetime=pytz.timezone("Asia/Seoul").localize(kst).isoformat(),
+            relative=f"{n + 1}h",
+            status_info=status_info,
+            content="<br>".join(html.escape(line) for line in text.split("\n")),
+        ))
+    return posts
+
+class FakeTimelineDriver:
+    """
+    가상 스크롤 타임라인을 흉내 내는 드라이버 (SCRAPER_EXTRACTION="soup" 경로용)
+    - 화면에는 window 개 게시물만 렌더링되고, scrollBy 마다 step 개씩 아래로 이동
+    """
+
+    def __init__(self, posts, window=12, step=3):
+        self.posts = posts
+        self.window = window
+        self.step = step
+        self.position = 0
+        self.current_url = TIMELINE_URL
+        self.page_tpl = _template("timeline_page.html")
+
+    @property
+    def page_source(self):
+        return self.page_tpl.substitute(posts="".join(self.posts[self.position:self.position + self.window]))
+
+    def execute_script(self, script, *args):
+        if "scrollBy" in script:
+            self.position = min(self.position + self.step, max(0, len(self.posts) - self.window))
+            return None
+        if "scrollTo" in script:
+            self.position = 0
+            return None
+        raise NotImplementedError("페이지 내 스크립트 실행은 지원하지 않습니다")
+
+def raw_rows(count, offset=0):
+    """
+    scraped_posts 테이블 형식의 합성 행
+    """
+    rows = []
+    for n in range(offset, offset + count):
+        kst = START_TIME - timedelta(minutes=n)
+        rows.append({
+            "url": post_url(n),
+            "time": (kst - timedelta(hours=14)).strftime("%Y-%m-%d %H:%M:%S"),
+            "kst_time": kst.strftime("%b %d, %Y, %I:%M %p"),
+            "content": f"Synthetic post number {n}. Tariffs, jobs and the stock market are doing great!",
+        })
+    return rows
+
+def analysis_rows(count, offset=0):
+    """
+    analysis_results 테이블 형식의 합성 행
+    """
+    rows = []
+    for row in raw_rows(count, offset):
+        rows.append({
+            "tweet_url": row["url"],
+            "time": row["time"],
+            "time_str": row["kst_time"],
+            "tweet_content": row["content"].lower(),
+            "original_content": row["content"],
+            "impact_on_market": "Indirect",
+            "sentiment_score": 0.4,
+            "market_impact_score": 0.3,
+            "keywords": "tariffs, jobs",
+            "sector": "Industrials, Financials",
+            "reason": "Signals continued trade policy pressure on industrial supply chains.",
+        })
+    return rows
+
+_SYLLABLES = ["ar", "bel", "cor", "dan", "ex", "fi", "gen", "hal", "ion", "jo", "kel", "lu", "mer", "nov", "or", "pra",
+              "qu", "ros", "sol", "tri", "ul", "ver", "wex", "xa", "yor", "zen"]
+_SUFFIXES = ["Inc.", "Corp.", "Holdings Inc.", "Group Ltd.", "Therapeutics Inc.", "Bancorp", "Energy Corp. - Common Stock"]
+
+def listing_rows(count):
+    """
+    listings.csv 의 실제 기업 + 합성 기업 (전체 상장 목록 크기 흉내), count 는 전체 행 수
+    합성 기업의 티커는 4~5글자, 이름은 음절 조합 + 법인 접미사, 일부는 별칭/인물 포함
+    """
+    with open(os.path.join(ROOT, "listings.csv"), encoding="utf-8-sig", newline="") as f:
+        rows = list(csv.DictReader(f))
+    tickers = {row["ticker"] for row in rows}
+    letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    n = 0
+    while len(rows) < count:
+        digits, value = [], n
+        for _ in range(4):
+            value, digit = divmod(value, 26)
+            digits.append(digit)
+        n += 1
+        ticker = "".join(letters[d] for d in digits) + ("X" if n % 3 == 0 else "")
+        if ticker in tickers:
+            continue
+        name = " ".join(
+            (_SYLLABLES[a] + _SYLLABLES[b]).capitalize() for a, b in ((digits[0], digits[1]), (digits[2], digits[3]))
+        )
+        rows.append({
+            "ticker": ticker,
+            "name": f"{name} {_SUFFIXES[n % len(_SUFFIXES)]}",
+            "exchange": "NASDAQ" if n % 2 else "NYSE",
+            "aliases": name.split()[0] + " Labs" if n % 5 == 0 else "",
+            "people": f"{name.split()[1]} {name.split()[0]}" if n % 7 == 0 else "",
+        })
+    return rows
@@ -0,0 +1,67 @@
+"""
+Runner.run 대체 (고정 지연 + 결정적인 응답)
+- 분석 에이전트: 단건/배치 JSON 응답, 일부 트윗은 리포트 생성 조건(Direct, 0.8, 티커)을 만족
+- 리포트 에이전트: 리포트 JSON 응답
+"""
+import asyncio
+import json
+import zlib
+from contextlib import contextmanager
+from unittest import mock
+
+from agents import Runner
+
+def _analysis(text, direct_ratio):
+    bucket = zlib.crc32(text.encode("utf-8")) % 100
+    if bucket < direct_ratio * 100:
+        return {
+            "impact_on_market": "Direct",
+            "sentiment_score": 0.6,
+            "market_impact_score": 0.8,
+            "keywords": ["Nvidia", "chips"],
+            "sector": ["Information Technology"],
+            "reason": "Direct mention of chip makers. Nvidia benefits from the announcement. NVDA, TSM.",
+        }
+    return {
+        "impact_on_market": "Indirect" if bucket % 2 else "No",
+        "sentiment_score": 0.1,
+        "market_impact_score": 0.2,
+        "keywords": ["economy"],
+        "sector": ["Financials"],
+        "reason": "General economic commentary with limited market impact.",
+    }
+
+class _Result:
+    def __init__(self, final_output):
+        self.final_output = final_output
+
+class MockRunner:
+    def __init__(self, latency=0.05, direct_ratio=0.2):
+        self.latency = latency
+        self.direct_ratio = direct_ratio
+        self.calls = 0
+
+    async def run(self, agent, input_text, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+
+        if "리포트" in agent.name:
+            return _Result(json.dumps({
+                "title": "반도체 수출 규제 완화 기대",
+                "forecast": "반도체 업종 강세가 예상됩니다. 관련 공급망 기업도 수혜가 예상됩니다. 단기 변동성은 커질 수 있습니다.",
+                "posts": "대통령이 반도체 산업 지원을 언급했습니다.",
+                "model": 8.0,
+                "stock": "NVDA,TSM",
+            }, ensure_ascii=False))
+
+        if input_text.startswith("["):
+            items = json.loads(input_text)
+            return _Result(json.dumps(
+                [dict(_analysis(item["tweet"], self.direct_ratio), index=item["index"]) for item in items]
+            ))
+        return _Result(json.dumps(_analysis(input_text, self.direct_ratio)))
+
+    @contextmanager
+    def patch(self):
+        with mock.patch.object(Runner, "run", self.run):
+            yield self
@@ -0,0 +1,359 @@
+"""
+핫 패스 벤치마크 (스크래퍼 파싱, 전처리, 기업 추출, 저장소, 분석 파이프라인)
+
+사용법:
+    python -m benchmarks.run                          # 전체 실행 → benchmarks/results/<커밋>.json
+    python -m benchmarks.run --quick --suite preprocess storage
+    python -m benchmarks.run --compare benchmarks/results/abc1234.json   # 현재 실행 결과와 비교
+    python -m benchmarks.run --compare base.json new.json                 # 저장된 결과끼리 비교
+
+결과 JSON 의 각 항목은 {"value", "unit"} 이며 value 는 작을수록 좋습니다. (시간)
+비교 시 --threshold (기본 15%) 이상 느려진 항목이 있으면 종료 코드 1 을 반환합니다.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import itertools
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from benchmarks import fixtures
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+@contextlib.contextmanager
+def quiet():
+    # 모듈의 진행 상황 출력/로그는 측정에서 제외
+    logging.disable(logging.CRITICAL)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+    finally:
+        logging.disable(logging.NOTSET)
+
+@contextlib.contextmanager
+def temp_workdir():
+    # 로컬 저장소/저널/기존 엑셀 가져오기가 저장소 루트의 파일을 건드리지 않도록 임시 디렉터리에서 실행
+    cwd = os.getcwd()
+    path = tempfile.mkdtemp(prefix="bench_")
+    os.chdir(path)
+    try:
+        yield path
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(path, ignore_errors=True)
+
+def measure(func, repeat=5, setup=None):
+    """
+    func() 를 repeat 번 실행해 최솟값/중앙값(ms)을 반환합니다. setup() 은 측정에서 제외
+    """
+    runs = []
+    for _ in range(repeat):
+        state = setup() if setup else None
+        start = time.perf_counter()
+        func(state) if setup else func()
+        runs.append((time.perf_counter() - start) * 1000)
+    return {"value": round(min(runs), 3), "median": round(statistics.median(runs), 3), "unit": "ms", "runs": len(runs)}
+
+# ----------------------------------------------------------------------
+# Suites
+# ----------------------------------------------------------------------
+def bench_parse(quick):
+    """
+    collect_new_posts (soup 추출 경로) 의 스크롤 깊이별 비용
+    """
+    from modules import parsers, scraper
+
+    texts = fixtures.corpus_texts()
+    depths = (1, 10) if quick else (1, 10, 50)
+    results = {}
+
+    for depth in depths:
+        driver_args = {"window": 12, "step": 3}
+        posts = fixtures.timeline_posts(texts, driver_args["window"] + depth * driver_args["step"])
+        # 마지막 게시물을 이미 수집한 게시물로 두어 depth 번 스크롤 후 종료
+        existing = {fixtures.post_url(len(posts) - 1)}
+
+        def run(driver):
+            with quiet():
+                scraper.collect_new_posts(driver, existing, max_count=10 ** 6, reload=False)
+
+        with mock.patch.object(Config, "SCRAPER_EXTRACTION", "soup"), mock.patch.object(scraper.time, "sleep"):
+            result = measure(run, repeat=3 if depth > 10 else 5,
+                             setup=lambda: fixtures.FakeTimelineDriver(posts, **driver_args))
+        results[f"parse.collect.depth_{depth}"] = result
+        results[f"parse.collect.depth_{depth}.per_scroll"] = {
+            "value": round(result["value"] / max(1, depth), 3), "unit": "ms"
+        }
+
+    # 페이지 하나 파싱 (parse.extract_page 는 기준 구현 bs4, 나머지는 설치된 백엔드별)
+    page = fixtures.FakeTimelineDriver(fixtures.timeline_posts(texts, 12)).page_source
+    for backend in parsers.available_backends():
+        name = "parse.extract_page" if backend == "bs4" else f"parse.extract_page.{backend}"
+        results[name] = measure(lambda: parsers.extract_records(page, set(), backend), repeat=20)
+    return results
+
+def bench_preprocess(quick):
+    """
+    코퍼스별 preprocess_tweet / preprocess_batch 처리 시간
+    """
+    import pandas as pd
+    from modules.preprocessor import preprocess_batch, preprocess_tweet
+
+    results = {}
+    for path, column in fixtures.CORPORA:
+        series = pd.Series(fixtures.load_corpus(path, column))
+        name = os.path.splitext(path)[0]
+        repeat = 3 if quick else 7
+        single = measure(lambda: series.apply(preprocess_tweet), repeat=repeat)
+        batch = measure(lambda: preprocess_batch(series), repeat=repeat)
+        for key, result in (("apply", single), ("batch", batch)):
+            result["items_per_sec"] = round(len(series) / (result["value"] / 1000))
+            results[f"preprocess.{key}.{name}"] = result
+    return results
+
+def bench_entities(quick):
+    """
+    상장 기업 목록 크기별 EntityIndex 생성 / analyze (본문 + 분석 근거) 처리 시간
+    """
+    from modules.entities import EntityIndex
+
+    texts = fixtures.corpus_texts()
+    # 분석 에이전트 형식의 근거 (마지막 문장이 티커 목록)
+    reasons = [
+        "Tariff escalation would pressure Apple and NVIDIA supply chains while lifting domestic steel. AAPL, NVDA, X.",
+        "No clear link to listed companies.",
+        "Elon Musk's comments may move Tesla shares in the near term. TSLA.",
+    ]
+    pairs = [(text, reasons[n % len(reasons)]) for n, text in enumerate(texts)]
+    sizes = (1000, 10000) if quick else (1000, 10000, 30000)
+    results = {}
+
+    for size in sizes:
+        listings = fixtures.listing_rows(size)
+        results[f"entities.build.{size}"] = measure(lambda: EntityIndex(listings), repeat=3)
+        index = EntityIndex(listings)
+
+        def analyze_all():
+            for content, reason in pairs:
+                index.analyze(content, reason)
+
+        result = measure(analyze_all, repeat=3 if quick else 5)
+        result["items_per_sec"] = round(len(pairs) / (result["value"] / 1000))
+        results[f"entities.analyze.{size}"] = result
+    return results
+
+def bench_storage(quick):
+    """
+    Storage 쓰기/읽기 비용 (행 수별)
+    """
+    from modules.storage import Storage
+
+    sizes = (1000, 10000) if quick else (1000, 10000, 100000)
+    results = {}
+
+    for size in sizes:
+        raw = fixtures.raw_rows(size)
+        analysis = fixtures.analysis_rows(size)
+        incoming = fixtures.raw_rows(10, offset=size)
+        repeat = 1 if size >= 100000 else 3
+
+        with temp_workdir(), mock.patch.object(Config, "SUPABASE_URL", None), \
+                mock.patch.object(Config, "LOCAL_DB_PATH", "bench.db"):
+
+            runs = itertools.count()
+
+            def fresh_storage():
+                # 매 측정마다 빈 DB 파일 (마지막 DB 는 아래 읽기 측정에 사용)
+                Config.LOCAL_DB_PATH = f"bench_{next(runs)}.db"
+                with quiet():
+                    return Storage()
+
+            def write_all(storage):
+                with quiet():
+                    storage.save_raw_posts(raw)
+                    asyncio.run(storage.save_results(None, analysis))
+
+            results[f"storage.write.{size}"] = measure(write_all, repeat=repeat, setup=fresh_storage)
+
+            with quiet():
+                storage = Storage()
+            results[f"storage.write_cycle.{size}"] = measure(lambda: storage.save_raw_posts(incoming), repeat=5)
+            results[f"storage.read.post_index.{size}"] = measure(storage.get_post_index, repeat=5)
+            results[f"storage.read.urls.{size}"] = measure(storage.get_existing_urls, repeat=5)
+            results[f"storage.read.table.{size}"] = measure(lambda: storage.local.read_table("analysis_results"), repeat=repeat)
+            storage.local.conn.close()
+
+        results[f"storage.write.{size}"]["rows_per_sec"] = round(2 * size / (results[f"storage.write.{size}"]["value"] / 1000))
+    return results
+
+def bench_pipeline(quick, latency):
+    """
+    process_new_posts (batch) / StreamingPipeline 종단 지연 (Runner.run 은 고정 지연 모의 응답)
+    """
+    from benchmarks.mock_llm import MockRunner
+    from main import process_new_posts
+    from modules.analyzer import TrumpAnalyzer
+    from modules.pipeline import StreamingPipeline
+    from modules.reporter import TrumpReporter
+    from modules.storage import Storage
+
+    texts = fixtures.corpus_texts()
+    sizes = (20,) if quick else (20, 100)
+    results = {}
+
+    for size in sizes:
+        posts = [dict(row, content=texts[n % len(texts)]) for n, row in enumerate(fixtures.raw_rows(size))]
+        runner = MockRunner(latency=latency)
+
+        with temp_workdir(), runner.patch(), \
+                mock.patch.object(Config, "SUPABASE_URL", None), \
+                mock.patch.object(Config, "CACHE_ENABLED", False), \
+                mock.patch.object(Config, "LOCAL_DB_PATH", "bench.db"):
+            with quiet():
+                storage = Storage()
+                analyzer = TrumpAnalyzer()
+                reporter = TrumpReporter()
+
+            def run_batch():
+                with quiet():
+                    asyncio.run(process_new_posts(posts, analyzer, reporter, storage))
+
+            def run_streaming():
+                def scrape(emit):
+                    for post in posts:
+                        emit(post)
+                    return posts
+
+                with quiet():
+                    asyncio.run(StreamingPipeline(analyzer, reporter, storage).run(scrape))
+
+            runner.calls = 0
+            results[f"pipeline.batch.{size}"] = measure(run_batch, repeat=3)
+            results[f"pipeline.batch.{size}"]["llm_calls"] = runner.calls // 3
+            runner.calls = 0
+            results[f"pipeline.streaming.{size}"] = measure(run_streaming, repeat=3)
+            results[f"pipeline.streaming.{size}"]["llm_calls"] = runner.calls // 3
+            storage.local.conn.close()
+
+    return results
+
+SUITES = {
+    "parse": bench_parse,
+    "preprocess": bench_preprocess,
+    "entities": bench_entities,
+    "storage": bench_storage,
+    "pipeline": bench_pipeline,
+}
+
+# ----------------------------------------------------------------------
+# Results
+# ----------------------------------------------------------------------
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=fixtures.ROOT, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return "unknown"
+
+def run_suites(names, quick, latency):
+    results = {}
+    for name in names:
+        print(f"⏱️ {name} 벤치마크 실행 중...")
+        try:
+            if name == "pipeline":
+                suite_results = SUITES[name](quick, latency)
+            else:
+                suite_results = SUITES[name](quick)
+        except ImportError as e:
+            print(f"⚠️ {name} 건너뜀 (의존성 없음): {e}")
+            continue
+        for key, result in suite_results.items():
+            print(f"   {key:45s} {result['value']:>10.3f} {result['unit']}")
+        results.update(suite_results)
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "quick": quick,
+            "llm_latency": latency,
+        },
+        "results": results,
+    }
+
+def compare(base, current, threshold):
+    """
+    두 결과의 공통 항목을 비교합니다. Returns: 기준보다 threshold 이상 느려진 항목 수
+    """
+    print(f"\n📊 비교: {base['meta'].get('commit')} → {current['meta'].get('commit')} (임계값 {threshold:.0%})")
+    regressions = 0
+    for key in sorted(set(base["results"]) & set(current["results"])):
+        old, new = base["results"][key]["value"], current["results"][key]["value"]
+        change = (new - old) / old if old else 0.0
+        if change > threshold:
+            mark = "❌"
+            regressions += 1
+        elif change < -threshold:
+            mark = "✅"
+        else:
+            mark = "  "
+        print(f"{mark} {key:45s} {old:>10.3f} → {new:>10.3f} {current['results'][key]['unit']} ({change:+.1%})")
+
+    # 실행한 스위트에서 사라진 항목만 표시
+    suites = {key.split(".")[0] for key in current["results"]}
+    missing = sorted(key for key in set(base["results"]) - set(current["results"]) if key.split(".")[0] in suites)
+    if missing:
+        print(f"⚠️ 현재 결과에 없는 항목: {', '.join(missing)}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="핫 패스 벤치마크")
+    parser.add_argument("--suite", nargs="+", choices=list(SUITES), default=list(SUITES))
+    parser.add_argument("--quick", action="store_true", help="작은 입력 크기로 빠르게 실행")
+    parser.add_argument("--latency", type=float, default=0.05, help="모의 LLM 응답 지연 (초)")
+    parser.add_argument("--out", help="결과 JSON 경로 (기본: benchmarks/results/<커밋>.json)")
+    parser.add_argument("--compare", nargs="+", metavar="RESULT", help="기준 결과 JSON (두 개면 실행 없이 둘을 비교)")
+    parser.add_argument("--threshold", type=float, default=0.15, help="회귀로 판단할 상대 변화량")
+    args = parser.parse_args()
+
+    if args.compare and len(args.compare) == 2:
+        with open(args.compare[0], encoding="utf-8") as f:
+            base = json.load(f)
+        with open(args.compare[1], encoding="utf-8") as f:
+            current = json.load(f)
+        return 1 if compare(base, current, args.threshold) else 0
+
+    current = run_suites(args.suite, args.quick, args.latency)
+
+    out = args.out or os.path.join(RESULTS_DIR, f"{current['meta']['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(current, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 결과 저장: {out}")
+
+    if args.compare:
+        with open(args.compare[0], encoding="utf-8") as f:
+            base = json.load(f)
+        return 1 if compare(base, current, args.threshold) else 0
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,218 @@
+"""
+HTTP 수집 백엔드 (modules/http_scraper.py) 가 Selenium 경로 (modules/scraper.py) 와 같은 게시물을 수집하는지
+로컬 API 스텁 서버로 확인
+- 같은 게시물 목록을 API JSON (max_id 커서 페이지) 과 타임라인 HTML 로 각각 제공
+- 고정 게시물 (Pinned), 리트루스 (reblog), 본문 없는 게시물 포함
+- 종료 조건 (기존 게시물 도달 / 워터마크 통과 / max_count / 마지막 페이지) 별로 두 경로의 게시물 dict 가 같은지 비교
+사용법: python check_http_scraper.py
+"""
+import asyncio
+import html
+import json
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytz
+
+from config import Config
+from modules import scraper
+from modules.http_scraper import HttpTimelineFetcher
+
+HANDLE = "realDonaldTrump"
+ACCOUNT_ID = "107780257626128497"
+PAGE_SIZE = 4
+KST = pytz.timezone("Asia/Seoul")
+
+CONTENTS = [
+    "<p>Tariffs are making America RICH again &amp; stocks are at <b>RECORD</b> highs!!! 🇺🇸<br>Read: "
+    '<a href="https://www.example.com/news/article-123" rel="nofollow noopener" target="_blank">'
+    '<span class="invisible">https://www.</span><span class="ellipsis">example.com/news/arti</span>'
+    '<span class="invisible">cle-123</span></a></p>',
+    "<p>Congratulations to the GREAT people of Pennsylvania!</p><p>We will WIN BIG!</p>",
+    '<p><a href="https://truthsocial.com/tags/MAGA" class="mention hashtag">#<span>MAGA</span></a> '
+    '<span class="h-card"><a href="https://truthsocial.com/@WhiteHouse" class="u-url mention">@<span>WhiteHouse</span></a></span></p>',
+    "<p>&quot;Thank you&quot; to Apple, NVIDIA and $TSLA for investing   in the USA.<br><br>A GREAT day!</p>",
+    "<p>The Fed must cut rates NOW.</p>",
+]
+
+def build_statuses():
+    """
+    최신 → 과거 순서의 status 목록 (맨 앞은 오래된 고정 게시물)
+    """
+    start = KST.localize(datetime(2025, 11, 3, 9, 30))
+    statuses = []
+    for n in range(18):
+        created = start - timedelta(minutes=37 * n)
+        status_id = str(115437640213385100 - n)
+        status = {
+            "id": status_id,
+            "created_at": created.astimezone(pytz.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+            "url": f"https://truthsocial.com/@{HANDLE}/{status_id}",
+            "content": CONTENTS[n % len(CONTENTS)],
+            "reblog": None,
+        }
+        if n == 4:
+            # 리트루스: 본문/링크는 원본 게시물
+            original_id = "115437640213384001"
+            status["reblog"] = {
+                "id": original_id,
+                "created_at": status["created_at"],
+                "url": f"https://truthsocial.com/@WhiteHouse/{original_id}",
+                "content": "<p>Statement from the White House.</p>",
+            }
+            status["url"] = status["reblog"]["url"]
+            status["content"] = ""
+        elif n == 7:
+            status["content"] = "<p></p>"  # 이미지만 있는 게시물
+        statuses.append(status)
+
+    pinned_created = KST.localize(datetime(2025, 10, 1, 9, 0))
+    statuses.insert(0, {
+        "id": "115437640213380000",
+        "created_at": pinned_created.astimezone(pytz.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+        "url": f"https://truthsocial.com/@{HANDLE}/115437640213380000",
+        "content": "<p>MAKE AMERICA GREAT AGAIN!</p>",
+        "reblog": None,
+        "pinned": True,
+    })
+    return statuses
+
+def kst_title(status):
+    created = pytz.utc.localize(datetime.strptime(status["created_at"][:19], "%Y-%m-%dT%H:%M:%S"))
+    return created.astimezone(KST).strftime("%b %d, %Y, %I:%M %p")
+
+def render_timeline(statuses):
+    """
+    같은 게시물을 웹 타임라인 HTML 로 (Selenium 경로의 page_source)
+    """
+    items = []
+    for index, status in enumerate(statuses):
+        shown = status["reblog"] or status
+        if status.get("pinned"):
+            info = '<div role="status-info"><span>Pinned</span> <span>Truth</span></div>'
+        elif status["reblog"]:
+            info = '<div role="status-info"><a href="/@realDonaldTrump"><span>Donald J. Trump</span></a><span> ReTruthed</span></div>'
+        else:
+            info = ""
+        href = urlparse(shown["url"]).path
+        items.append(
+            f'<div data-index="{index}"><div class="status">{info}'
+            f'<div class="status__header"><a href="{html.escape(href)}"><time title="{kst_title(status)}">1h</time></a></div>'
+            f'<div data-testid="status-content" class="status__content">{shown["content"]}</div>'
+            f"</div></div>"
+        )
+    return "<html><body><div data-testid=\"virtuoso-item-list\">" + "".join(items) + "</div></body></html>"
+
+class TimelineDriver:
+    """
+    collect_new_posts(reload=False) 가 쓰는 부분만 (page_source, 스크롤)
+    모든 게시물이 이미 렌더링된 페이지 (스크롤은 아무 일도 하지 않음)
+    """
+
+    def __init__(self, page_source):
+        self.page_source = page_source
+
+    def execute_script(self, script, *args):
+        return None
+
+class StubHandler(BaseHTTPRequestHandler):
+    statuses = []
+    requests = []  # statuses 요청의 max_id (첫 페이지는 None)
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        if url.path == "/api/v1/accounts/lookup":
+            if query.get("acct") != HANDLE:
+                return self._reply(404, {"error": "Record not found"})
+            return self._reply(200, {"id": ACCOUNT_ID, "acct": HANDLE})
+        if url.path == f"/api/v1/accounts/{ACCOUNT_ID}/statuses":
+            max_id = query.get("max_id")
+            self.requests.append(max_id)
+            if max_id is None:
+                start = 0
+            else:
+                ids = [status["id"] for status in self.statuses]
+                start = ids.index(max_id) + 1
+            return self._reply(200, self.statuses[start:start + int(query.get("limit", 20))])
+        return self._reply(404, {"error": "Not found"})
+
+def selenium_posts(statuses, existing_urls, max_count, watermark):
+    driver = TimelineDriver(render_timeline(statuses))
+    return scraper.collect_new_posts(
+        driver, existing_urls, max_count=max_count, watermark=watermark, reload=False, url=Config.TRUTH_SOCIAL_URL
+    )
+
+async def http_posts(base_url, existing_urls, max_count, watermark):
+    fetcher = HttpTimelineFetcher(base_url=base_url, page_size=PAGE_SIZE, timeout=5)
+    try:
+        return await fetcher.collect_new_posts(existing_urls, max_count=max_count, watermark=watermark, handle=HANDLE)
+    finally:
+        await fetcher.close()
+
+def check_cursor(statuses):
+    """
+    두 번째 페이지부터는 앞 페이지 마지막 게시물 ID 를 max_id 로 요청해야 함
+    """
+    expected = [None] + [statuses[i - 1]["id"] for i in range(PAGE_SIZE, len(statuses), PAGE_SIZE)]
+    return StubHandler.requests == expected[:len(StubHandler.requests)] and len(StubHandler.requests) > 1
+
+def main():
+    Config.SCRAPER_EXTRACTION = "soup"  # 브라우저 없이 page_source 파싱 경로로
+    statuses = build_statuses()
+    StubHandler.statuses = statuses
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    pinned_url = statuses[0]["url"]
+    last_url = statuses[-1]["url"]
+    cases = [
+        # (이름, existing_urls, max_count, watermark)
+        ("기존 게시물 도달 (고정 게시물은 건너뜀)", {pinned_url, statuses[10]["url"]}, 450, None),
+        ("워터마크 통과 (삭제된 마지막 게시물)", set(), 450,
+         {"post_id": int(statuses[9]["id"]) - 1, "time": "2025-11-02 00:00:00"}),
+        ("max_count", {pinned_url}, 5, None),
+        ("마지막 페이지까지", {last_url}, 450, None),
+    ]
+
+    ok = True
+    try:
+        for name, existing_urls, max_count, watermark in cases:
+            StubHandler.requests = []
+            expected = selenium_posts(statuses, existing_urls, max_count, watermark)
+            actual = asyncio.run(http_posts(base_url, existing_urls, max_count, watermark))
+            if expected == actual and expected:
+                print(f"✅ {name}: {len(actual)}개 일치 ({len(StubHandler.requests)}페이지)")
+            else:
+                ok = False
+                print(f"❌ {name}: Selenium {len(expected)}개 / HTTP {len(actual)}개")
+                for e, a in zip(expected + [None] * len(actual), actual + [None] * len(expected)):
+                    if e != a:
+                        print(f"   Selenium: {e!r}\n   HTTP:     {a!r}")
+                        break
+            if name == "마지막 페이지까지" and not check_cursor(statuses):
+                ok = False
+                print(f"❌ max_id 커서 순서가 다름: {StubHandler.requests}")
+    finally:
+        server.shutdown()
+        scraper.get_pool().close()
+
+    print("SUCCESS" if ok else "FAILED")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    raise SystemExit(main())
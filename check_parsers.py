@@ -0,0 +1,118 @@
+"""
+HTML 파서 백엔드 (modules/parsers.py) 가 기준 구현 (bs4 html.parser) 과 같은 결과를 내는지
+저장된 타임라인 HTML 골든 파일로 확인하고, 백엔드별 속도를 비교합니다.
+- benchmarks/fixtures/golden/*.html → 같은 이름의 .json (추출 레코드)
+- benchmarks/fixtures/golden/status_contents.json → API 게시물 본문 HTML 조각과 텍스트
+사용법:
+    python check_parsers.py            # 설치된 모든 백엔드 확인
+    python check_parsers.py --update   # HTML 을 추가/수정한 뒤 bs4 결과로 골든 파일 다시 생성
+"""
+import argparse
+import glob
+import json
+import os
+import time
+
+from modules import parsers
+
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks", "fixtures", "golden")
+CONTENTS_FILE = os.path.join(GOLDEN_DIR, "status_contents.json")
+
+def load_json(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def save_json(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+
+def pages():
+    for path in sorted(glob.glob(os.path.join(GOLDEN_DIR, "*.html"))):
+        with open(path, encoding="utf-8") as f:
+            yield path, f.read()
+
+def update():
+    for path, html in pages():
+        records = parsers.extract_records(html, backend="bs4")
+        save_json(os.path.splitext(path)[0] + ".json", records)
+        print(f"💾 {os.path.basename(path)}: {len(records)}개 레코드")
+    contents = load_json(CONTENTS_FILE)
+    for item in contents:
+        item["text"] = parsers.content_text(item["html"], backend="bs4")
+    save_json(CONTENTS_FILE, contents)
+    print(f"💾 {os.path.basename(CONTENTS_FILE)}: {len(contents)}개 본문")
+
+def diff(label, expected, actual):
+    if expected == actual:
+        return True
+    print(f"❌ {label}: 불일치 (기준 {len(expected)}개 / 결과 {len(actual)}개)")
+    for e, a in zip(expected, actual):
+        if e != a:
+            print(f"   기준: {e!r}\n   결과: {a!r}")
+            break
+    return False
+
+def check(backend):
+    ok = True
+    for path, html in pages():
+        name = os.path.basename(path)
+        expected = load_json(os.path.splitext(path)[0] + ".json")
+        ok &= diff(f"{backend} / {name}", expected, parsers.extract_records(html, backend=backend))
+
+        # 이미 처리한 data-index 는 건너뛰어야 함 (스크롤 중 재추출)
+        seen = {record["index"] for record in expected[::2]}
+        ok &= diff(
+            f"{backend} / {name} (seen)",
+            [record for record in expected if record["index"] not in seen],
+            parsers.extract_records(html, seen, backend=backend),
+        )
+
+    contents = load_json(CONTENTS_FILE)
+    ok &= diff(
+        f"{backend} / {os.path.basename(CONTENTS_FILE)}",
+        [item["text"] for item in contents],
+        parsers.content_texts([item["html"] for item in contents], backend=backend),
+    )
+    return ok
+
+def best_of(func, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--update", action="store_true", help="bs4 결과로 골든 파일 다시 생성")
+    args = parser.parse_args()
+
+    if args.update:
+        update()
+        return 0
+
+    ok = True
+    backends = parsers.available_backends()
+    missing = [backend for backend in parsers.BACKENDS if backend not in backends]
+    if missing:
+        print(f"⚠️ 설치되지 않은 백엔드 건너뜀: {', '.join(missing)}")
+
+    for backend in backends:
+        passed = check(backend)
+        ok &= passed
+        if passed:
+            print(f"✅ {backend}: 골든 파일과 일치")
+
+    html = max(pages(), key=lambda page: len(page[1]))[1]
+    baseline = best_of(lambda: parsers.extract_records(html, backend="bs4"))
+    for backend in backends:
+        elapsed = best_of(lambda: parsers.extract_records(html, backend=backend))
+        print(f"⏱️ {backend}: {elapsed * 1000:.1f}ms/페이지 ({baseline / elapsed:.1f}x)")
+
+    print("SUCCESS" if ok else "FAILED")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    raise SystemExit(main())
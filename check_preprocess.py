@@ -0,0 +1,83 @@
+"""
+preprocess_batch 가 preprocess_tweet 과 같은 결과를 내는지, 얼마나 빠른지 확인합니다.
+사용법: python check_preprocess.py [--cases 200000]
+"""
+import argparse
+import random
+import time
+
+import pandas as pd
+
+from modules.preprocessor import preprocess_batch, preprocess_tweet, is_valid_tweet
+
+CORPORA = [
+    ("merged_all_excel.xlsx", "content"),
+    ("trump_posts_scraped.xlsx", "content"),
+]
+
+# 패턴 경계(멘션/해시태그/URL 이 붙어 있는 경우 등)가 자주 나오도록 조각을 조합
+FRAGMENTS = [
+    "@", "#", "http", "https://", "HTTP", "www", "rt", "RT", "a", "b", "I", "x", "é", "ß", "İ",
+    "_", "-", ".", ",", "\"", "'", "/", ":", "!", "?", "&amp;", "1", "42",
+    " ", "  ", "\n", "\t", " ", "　", "트럼프", "关税", "Trump", "USA", "MAGA", "news",
+]
+
+def random_text(rng):
+    return "".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 24)))
+
+def check_equivalence(texts, label):
+    expected = [preprocess_tweet(t) for t in texts]
+    actual = preprocess_batch(texts)
+    mismatches = [(t, e, a) for t, e, a in zip(texts, expected, actual) if e != a]
+    if mismatches:
+        print(f"❌ {label}: {len(mismatches)}/{len(texts)}개 불일치")
+        for t, e, a in mismatches[:5]:
+            print(f"   입력: {t!r}\n   기존: {e!r}\n   배치: {a!r}")
+        return False
+
+    series = pd.Series(texts, index=range(100, 100 + len(texts)), name="content")
+    filtered = preprocess_batch(series, drop_invalid=True)
+    expected_index = [i for i, e in zip(series.index, expected) if is_valid_tweet(e)]
+    if filtered.index.tolist() != expected_index or filtered.tolist() != [expected[i - 100] for i in expected_index]:
+        print(f"❌ {label}: drop_invalid 결과 불일치")
+        return False
+
+    print(f"✅ {label}: {len(texts)}개 일치")
+    return True
+
+def best_of(func, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cases", type=int, default=200000, help="무작위 입력 개수")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    ok = True
+    rng = random.Random(args.seed)
+    randoms = [random_text(rng) for _ in range(args.cases)]
+    ok &= check_equivalence(randoms + [None, float("nan"), ""], "무작위 입력")
+
+    for path, column in CORPORA:
+        try:
+            series = pd.read_excel(path)[column]
+        except Exception as e:
+            print(f"⚠️ {path} 건너뜀: {e}")
+            continue
+        ok &= check_equivalence(series.tolist(), path)
+
+        old = best_of(lambda: series.apply(preprocess_tweet))
+        new = best_of(lambda: preprocess_batch(series))
+        print(f"⏱️ {path}: apply {old * 1000:.1f}ms → batch {new * 1000:.1f}ms ({old / new:.1f}x)")
+
+    print("SUCCESS" if ok else "FAILED")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    raise SystemExit(main())
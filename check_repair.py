@@ -0,0 +1,87 @@
+"""
+LLM 응답 로컬 복구 (modules/schemas.repair_json) 와 문장 수 검사 (count_sentences) 확인
+- 문자열 내용 (true/false/null/None 같은 단어 포함) 이 복구 후에도 그대로인지
+- 문자열 중간에서 잘린 응답은 잘린 필드를 버리는지 (반쪽 문장 대신 재요청)
+- 약어/이니셜 (U.S., Inc., J.) 이 문장 끝으로 세어지지 않는지
+사용법: python check_repair.py
+"""
+from modules.schemas import MarketReport, TweetAnalysis, count_sentences, repair_json, validate
+
+REPAIR_CASES = [
+    # (응답, 기대 결과)
+    ('{"a": true, "b": null}', {"a": True, "b": None}),
+    ("```json\n{'reason': 'the claim is true and will nullify deals', 'ok': true}\n```",
+     {"reason": "the claim is true and will nullify deals", "ok": True}),
+    ("{'reason': 'True story: None of the False claims', 'flag': None, 'x': False}",
+     {"reason": "True story: None of the False claims", "flag": None, "x": False}),
+    ('Here you go: {"reason": "it is true, null and void", "flag": True, "list": [1, 2,],} thanks',
+     {"reason": "it is true, null and void", "flag": True, "list": [1, 2]}),
+    ('{"reason": "Tariffs hit \\"true\\" believers", "n": None}',
+     {"reason": 'Tariffs hit "true" believers', "n": None}),
+    ("{'reason': \"it's true\", 'k': [\"don't\", 'null']}", {"reason": "it's true", "k": ["don't", "null"]}),
+    # 잘린 응답: 문자열 중간에서 잘린 필드는 버림
+    ('{"impact_on_market": "Direct", "market_impact_score": 0.6, "reason": "Apple shares could ri',
+     {"impact_on_market": "Direct", "market_impact_score": 0.6}),
+    ('[{"index": 0, "reason": "done."}, {"index": 1, "reason": "half sen',
+     [{"index": 0, "reason": "done."}, {"index": 1}]),
+    ('{"keywords": ["Apple", "Tes', {"keywords": ["Apple"]}),
+    # 문자열 밖에서 잘린 응답은 그대로 닫음
+    ('{"impact_on_market": "No", "reason": "none.", ', {"impact_on_market": "No", "reason": "none."}),
+    ('{"impact_on_market": "No", "reason":', {"impact_on_market": "No", "reason": None}),
+]
+
+SENTENCE_CASES = [
+    ("U.S. stocks may rise. Chip makers lead. Banks lag.", 3),
+    ("Apple Inc. and Tesla Corp. gain. Mr. Musk reacts. Shares rise e.g. in Asia.", 3),
+    ("Donald J. Trump said so. It matters! Does it?", 3),
+    ("미국 증시는 상승할 것이다. 반도체 업종이 주도한다. U.S. 기술주도 강세다.", 3),
+    ("One. two continues. Three.", 2),
+    ("Only one sentence.", 1),
+    ("", 0),
+]
+
+def check_repair():
+    ok = True
+    for text, expected in REPAIR_CASES:
+        try:
+            actual = repair_json(text)
+        except ValueError as e:
+            actual = f"ValueError: {e}"
+        if actual != expected:
+            ok = False
+            print(f"❌ repair_json({text!r})\n   기대: {expected!r}\n   결과: {actual!r}")
+
+    # 잘린 reason 은 검증에서 누락으로 잡혀야 함 (재요청 대상)
+    truncated = repair_json(
+        '{"impact_on_market": "Direct", "sentiment_score": 0.2, "market_impact_score": 0.7, '
+        '"keywords": ["Apple"], "sector": ["Information Technology"], "reason": "Apple could gain. AA'
+    )
+    instance, errors = validate(TweetAnalysis, truncated)
+    if instance is not None or "reason" not in errors:
+        ok = False
+        print(f"❌ 잘린 reason 이 검증을 통과함: {truncated!r}")
+    return ok
+
+def check_sentences():
+    ok = True
+    for text, expected in SENTENCE_CASES:
+        actual = count_sentences(text)
+        if actual != expected:
+            ok = False
+            print(f"❌ count_sentences({text!r}) = {actual} (기대 {expected})")
+
+    report = {"title": "t", "forecast": SENTENCE_CASES[0][0], "posts": "p", "stock": "NVDA"}
+    instance, errors = validate(MarketReport, report)
+    if instance is None:
+        ok = False
+        print(f"❌ 'U.S.' 가 들어간 3문장 forecast 가 검증 실패: {errors}")
+    return ok
+
+def main():
+    ok = check_repair()
+    ok &= check_sentences()
+    print("SUCCESS" if ok else "FAILED")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,200 @@
+"""
+Supabase 쓰기 클라이언트 (modules/writer.py) 를 로컬 PostgREST 스텁 서버로 확인
+- 일시적인 503 은 재시도로 저장되는지
+- 장애 중 쓰기는 저널에 보관되고, 복구 후 다음 쓰기 때 재전송되는지
+- 저널의 (ID 없는) 리포트와 ID 가 채워진 신규 리포트가 같은 게시물로 합쳐지는지
+  (한 upsert 안에 같은 id 가 두 번 들어가면 스텁도 PostgreSQL 처럼 400 으로 거부)
+- 마이그레이션 전 테이블 (posts.source 컬럼 없음) 에도 게시물/리포트가 저장되는지
+사용법: python check_writer.py
+"""
+import asyncio
+import json
+import os
+import re
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from config import Config
+from modules.writer import SupabaseWriter
+
+QUOTED_RE = re.compile(r'"((?:[^"\\]|\\.)*)"')
+
+class StubState:
+    def __init__(self):
+        self.posts = {}      # url → {"id", "url", ...}
+        self.analyze = {}    # id → row
+        self.fail_next = 0   # 다음 n 개 요청은 503
+        self.down = False    # 모든 요청 503
+        self.post_columns = {"url", "source", "content"}  # posts 테이블 컬럼 (없는 컬럼은 400)
+        self.requests = []   # (method, table, 성공 여부)
+        self.lock = threading.Lock()
+
+    def add_post(self, row):
+        record = self.posts.get(row["url"])
+        if record is None:
+            record = self.posts[row["url"]] = {"id": len(self.posts) + 1}
+        record.update(row)
+        return record
+
+class StubHandler(BaseHTTPRequestHandler):
+    state = None
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, body=None):
+        data = json.dumps(body if body is not None else {}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _handle(self, method):
+        url = urlparse(self.path)
+        table = url.path.rsplit("/", 1)[-1]
+        query = parse_qs(url.query)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"null")
+        state = self.state
+        with state.lock:
+            if state.down or state.fail_next:
+                state.fail_next = max(0, state.fail_next - 1)
+                state.requests.append((method, table, False))
+                return self._reply(503, {"message": "Service Unavailable"})
+
+            if method == "GET" and "url" not in query:
+                # 컬럼 확인 (select=<컬럼>&limit=0)
+                column = query["select"][0]
+                state.requests.append((method, table, True))
+                if table == "posts" and column not in state.post_columns:
+                    return self._reply(400, {"code": "42703", "message": f"column {table}.{column} does not exist"})
+                return self._reply(200, [])
+
+            if method == "GET" and table == "posts":
+                urls = [u.replace('\\"', '"') for u in QUOTED_RE.findall(query["url"][0])]
+                records = [{"id": state.posts[u]["id"], "url": u} for u in urls if u in state.posts]
+                state.requests.append((method, table, True))
+                return self._reply(200, records)
+
+            key = query["on_conflict"][0]
+            keys = [row.get(key) for row in body]
+            if len(set(keys)) != len(keys):
+                state.requests.append((method, table, False))
+                return self._reply(400, {
+                    "code": "21000",
+                    "message": "ON CONFLICT DO UPDATE command cannot affect row a second time",
+                })
+            unknown = {key for row in body for key in row} - state.post_columns if table == "posts" else set()
+            if unknown:
+                state.requests.append((method, table, False))
+                return self._reply(400, {
+                    "code": "PGRST204",
+                    "message": f"Could not find the '{sorted(unknown)[0]}' column of '{table}' in the schema cache",
+                })
+            state.requests.append((method, table, True))
+            if table == "posts":
+                records = [state.add_post(row) for row in body]
+                return self._reply(201, [{"id": r["id"], "url": r["url"]} for r in records])
+            for row in body:
+                state.analyze[row["id"]] = row
+            return self._reply(201, [])
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+def post(n):
+    return {"url": f"https://truthsocial.com/@realDonaldTrump/{n}", "source": "@realDonaldTrump", "content": f"post {n}"}
+
+def report(n, version, post_id=None):
+    return {"post_url": post(n)["url"], "post_id": post_id, "row": {"title": f"report {n} v{version}"}}
+
+def expect(label, condition, detail=""):
+    print(f"{'✅' if condition else '❌'} {label}" + (f": {detail}" if detail and not condition else ""))
+    return condition
+
+def journal_lines(path):
+    if not os.path.exists(path):
+        return 0
+    with open(path, encoding="utf-8") as f:
+        return sum(1 for line in f if line.strip())
+
+async def run(state, base_url, journal_path):
+    writer = SupabaseWriter(url=base_url, key="stub", journal_path=journal_path, max_retries=3, timeout=5)
+    ok = True
+    try:
+        # 1. 일시적인 503 → 재시도로 저장
+        state.fail_next = 2
+        result = await writer.write(posts=[post(1)], reports=[report(1, 1)])
+        post1 = state.posts.get(post(1)["url"], {}).get("id")
+        ok &= expect("503 두 번 뒤 재시도로 저장", result["queued"] == 0 and post1 in state.analyze, result)
+
+        # 2. 장애 중 쓰기 → 저널에 보관 (게시물 2 는 신규, 게시물 1 은 ID 를 아직 모르는 리포트)
+        writer.url_ids.clear()  # 재시작한 것처럼 (URL → ID 조회 결과 없음)
+        state.down = True
+        result = await writer.write(posts=[post(2)], reports=[report(2, 1), report(1, 2)])
+        ok &= expect(
+            "장애 중 쓰기는 저널에 보관",
+            result["queued"] == 3 and journal_lines(journal_path) == 3 and not result["failed"],
+            f"{result} / 저널 {journal_lines(journal_path)}줄",
+        )
+
+        # 3. 복구 후 다음 쓰기 때 재전송 (같은 게시물의 리포트는 최신 값 하나로)
+        state.down = False
+        state.requests.clear()
+        result = await writer.write(reports=[report(2, 2), report(1, 3, post_id=post1)])
+        post2 = state.posts.get(post(2)["url"], {}).get("id")
+        ok &= expect("복구 후 저널 재전송", result["queued"] == 0 and not result["failed"], result)
+        ok &= expect("저널 파일 정리", not os.path.exists(journal_path))
+        ok &= expect(
+            "게시물별 최신 리포트만 저장",
+            state.analyze.get(post1, {}).get("title") == "report 1 v3"
+            and state.analyze.get(post2, {}).get("title") == "report 2 v2",
+            state.analyze,
+        )
+        ok &= expect("재전송 요청 모두 성공", all(success for _, _, success in state.requests), state.requests)
+
+        # 4. 저널이 비었으면 flush 는 요청하지 않음
+        state.requests.clear()
+        result = await writer.flush()
+        ok &= expect("빈 저널 flush", result["queued"] == 0 and not state.requests, state.requests)
+    finally:
+        await writer.close()
+
+    # 5. 마이그레이션 전 테이블 (source 컬럼 없음) → source 없이 저장, 리포트도 연결
+    state.post_columns = {"url", "content"}
+    writer = SupabaseWriter(url=base_url, key="stub", journal_path=journal_path, max_retries=3, timeout=5)
+    try:
+        result = await writer.write(posts=[post(3)], reports=[report(3, 1)])
+        post3 = state.posts.get(post(3)["url"], {}).get("id")
+        ok &= expect(
+            "source 컬럼 없는 테이블에도 저장",
+            result["queued"] == 0 and not result["failed"] and post3 in state.analyze
+            and "source" not in state.posts[post(3)["url"]],
+            result,
+        )
+    finally:
+        await writer.close()
+    return ok
+
+def main():
+    Config.WRITE_RETRY_BASE = 0.01
+    state = StubState()
+    StubHandler.state = state
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            ok = asyncio.run(run(state, f"http://127.0.0.1:{server.server_port}", os.path.join(directory, "journal.jsonl")))
+    finally:
+        server.shutdown()
+    print("SUCCESS" if ok else "FAILED")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -7,15 +7,90 @@ class Config:
     # Supabase
     SUPABASE_URL = os.getenv("SUPABASE_URL")
     SUPABASE_KEY = os.getenv("SUPABASE_KEY")
+    WRITE_TIMEOUT = float(os.getenv("WRITE_TIMEOUT", "15"))          # 요청당 타임아웃 (초)
+    WRITE_MAX_RETRIES = int(os.getenv("WRITE_MAX_RETRIES", "4"))     # 일시적 오류 재시도 횟수
+    WRITE_RETRY_BASE = float(os.getenv("WRITE_RETRY_BASE", "0.5"))   # 지수 백오프 시작 간격 (초)
+    WRITE_JOURNAL_PATH = os.getenv("WRITE_JOURNAL_PATH", "supabase_journal.jsonl")  # 실패한 쓰기 보관 (다음 쓰기 때 재전송)
+    
+    # Local Store (scraper cache + analysis backup)
+    LOCAL_DB_PATH = os.getenv("LOCAL_DB_PATH", "trump_posts.db")
+    HISTORY_ENABLED = os.getenv("HISTORY_ENABLED", "true").lower() in ("1", "true", "yes")
+    HISTORY_PATH = os.getenv("HISTORY_PATH", "history")  # 이력 Parquet 캐시 디렉터리 (엑셀에서 자동 생성)
+    HISTORY_COMPACT_PARTS = int(os.getenv("HISTORY_COMPACT_PARTS", "32"))  # 추가 파일이 이 개수를 넘으면 하나로 병합
     
     # Chrome Driver (Optional if using webdriver_manager)
     CHROME_DRIVER_PATH = os.getenv("CHROME_DRIVER_PATH")
+    HEADLESS = os.getenv("HEADLESS", "true").lower() in ("1", "true", "yes")
+    PAGE_LOAD_TIMEOUT = float(os.getenv("PAGE_LOAD_TIMEOUT", "15"))  # 첫 게시물 렌더링 대기 (초)
+    DRIVER_MAX_CYCLES = int(os.getenv("DRIVER_MAX_CYCLES", "500"))   # 메모리 누수 방지를 위한 주기적 재시작 (0이면 비활성)
     
     # Analysis
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
     OPENAI_MODEL_NAME = os.getenv("OPENAI_MODEL_NAME", "gpt-5-nano")
+    ANALYSIS_CASCADE = os.getenv("ANALYSIS_CASCADE", "false").lower() in ("1", "true", "yes")  # 빠른 모델 → 리포트 기준 근처만 강한 모델로 재분석
+    ANALYSIS_FAST_MODEL = os.getenv("ANALYSIS_FAST_MODEL", OPENAI_MODEL_NAME)     # 단계 모드의 1단계 (모든 게시물)
+    ANALYSIS_STRONG_MODEL = os.getenv("ANALYSIS_STRONG_MODEL", "gpt-5-mini")      # 단계 모드의 2단계 (불확실/실패한 게시물만)
+    ANALYSIS_CASCADE_BAND = float(os.getenv("ANALYSIS_CASCADE_BAND", "0.15"))     # 영향도가 리포트 기준 (REPORT_MIN_SCORE) ± 이 값 안이면 재분석
+    ANALYSIS_CONCURRENCY = int(os.getenv("ANALYSIS_CONCURRENCY", "5"))  # 동시 분석 요청 수 (1이면 순차)
+    ANALYSIS_BATCH_SIZE = int(os.getenv("ANALYSIS_BATCH_SIZE", "8"))    # 요청당 묶을 트윗 수 (1이면 배치 비활성)
+    REPORT_MIN_SCORE = 0.5  # 리포트 생성 기준 영향도 (Direct + 이 값 이상 + 티커 확인)
+    REPORT_CONCURRENCY = int(os.getenv("REPORT_CONCURRENCY", "5"))      # 동시 리포트 생성 수
+    PIPELINE_MODE = os.getenv("PIPELINE_MODE", "streaming")  # "streaming" (스크랩과 동시에 분석) | "batch" (스크랩 완료 후 일괄 분석)
+    PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "32"))  # 스테이지 간 큐 크기
+    LLM_RPM = int(os.getenv("LLM_RPM", "500"))        # 분당 요청 수 제한
+    LLM_TPM = int(os.getenv("LLM_TPM", "200000"))     # 분당 토큰 수 제한
+    LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))  # 요청당 타임아웃 (초)
+    LLM_LIVE_WINDOW = float(os.getenv("LLM_LIVE_WINDOW", "1800"))        # 게시 후 이 시간 (초) 이내인 게시물만 실시간 우선순위 (나머지는 백로그)
+    LLM_LIVE_DEADLINE = float(os.getenv("LLM_LIVE_DEADLINE", "10"))      # 실시간 요청 배정 마감 (초)
+    LLM_REPORT_DEADLINE = float(os.getenv("LLM_REPORT_DEADLINE", "120")) # 리포트 요청 배정 마감 (초, 지나면 한 단계 위 우선순위로)
+    LLM_BACKLOG_RESERVE = float(os.getenv("LLM_BACKLOG_RESERVE", "0.2")) # 백로그가 남겨 둘 RPM/TPM 버킷 비율 (실시간/리포트 몫)
+    LLM_INPUT_COST_PER_1M = float(os.getenv("LLM_INPUT_COST_PER_1M", "0.05"))    # 입력 토큰 100만 개당 비용 (USD, 비용 집계용)
+    LLM_OUTPUT_COST_PER_1M = float(os.getenv("LLM_OUTPUT_COST_PER_1M", "0.40"))  # 출력 토큰 100만 개당 비용 (USD)
+    LLM_REASK_ATTEMPTS = int(os.getenv("LLM_REASK_ATTEMPTS", "1"))  # 스키마 검증에 실패한 필드만 다시 요청하는 횟수 (0이면 비활성)
+    PREFILTER_ENABLED = os.getenv("PREFILTER_ENABLED", "true").lower() in ("1", "true", "yes")
+    PREFILTER_MODEL_PATH = os.getenv("PREFILTER_MODEL_PATH", "prefilter_model.json")  # python train_prefilter.py 로 생성 (없으면 비활성)
+    PREFILTER_THRESHOLD = float(os.getenv("PREFILTER_THRESHOLD")) if os.getenv("PREFILTER_THRESHOLD") else None  # P(No) 가 이 값 이상이면 LLM 생략 (기본: 학습 시 선택된 값)
+    LISTINGS_PATH = os.getenv("LISTINGS_PATH", "listings.csv")  # 상장 기업 목록 (ticker,name,exchange,aliases,people) → 티커 검증/기업 추출
+    
+    # Backfill (python backfill.py, 실시간 루프와 함께 실행)
+    BACKFILL_CONCURRENCY = int(os.getenv("BACKFILL_CONCURRENCY", "2"))      # 동시 분석 배치 수
+    BACKFILL_RATE_SHARE = float(os.getenv("BACKFILL_RATE_SHARE", "0.25"))   # LLM_RPM/LLM_TPM 중 백필이 쓸 비율 (백필 중에는 실시간 루프가 나머지만 사용)
+    BACKFILL_NICE = int(os.getenv("BACKFILL_NICE", "10"))                   # 프로세스 우선순위 낮춤 (0이면 그대로)
+    BACKFILL_CHECKPOINT_PATH = os.getenv("BACKFILL_CHECKPOINT_PATH", "backfill_checkpoint.jsonl")
+    BACKFILL_LOCK_PATH = os.getenv("BACKFILL_LOCK_PATH", "backfill.lock")  # 백필 실행 중 표시 (실시간 루프는 그동안 BACKFILL_RATE_SHARE 만큼 한도를 양보)
+    
+    # LLM Result Cache
+    CACHE_ENABLED = os.getenv("CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+    CACHE_PATH = os.getenv("CACHE_PATH", "llm_cache.db")
+    CACHE_TTL_DAYS = float(os.getenv("CACHE_TTL_DAYS", "30"))
+    CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "50000"))
     
     # Scraper
     TRUTH_SOCIAL_URL = "https://truthsocial.com/@realDonaldTrump"
+    SOURCES = [s.strip() for s in os.getenv("SOURCES", TRUTH_SOCIAL_URL).split(",") if s.strip()]  # 수집할 계정 (@handle 또는 타임라인 URL, 쉼표로 구분)
+    SCRAPER_WORKERS = int(os.getenv("SCRAPER_WORKERS", "4"))  # 계정이 여러 개일 때 동시에 띄울 브라우저 프로세스 수 (1이면 한 브라우저로 차례대로)
     SCROLL_PAUSE_TIME = 2.0
     MAX_SCROLL_ATTEMPTS = 200
+    SCRAPER_EXTRACTION = os.getenv("SCRAPER_EXTRACTION", "script")  # "script" (브라우저 내 추출) | "soup" (page_source 파싱)
+    SCRAPER_PARSER = os.getenv("SCRAPER_PARSER", "auto")  # HTML 파서: "auto" (설치된 가장 빠른 것) | "selectolax" | "lxml" | "bs4"
+    PARSER_WORKERS = int(os.getenv("PARSER_WORKERS", "1"))  # HTML 파싱 전용 프로세스 수 (0이면 현재 프로세스에서 파싱)
+    SCRAPER_BACKEND = os.getenv("SCRAPER_BACKEND", "selenium")  # "selenium" | "http" (브라우저 없이 JSON API 로 수집, 실패 시 Selenium 으로 대체)
+    HTTP_SCRAPER_BASE_URL = os.getenv("HTTP_SCRAPER_BASE_URL", "https://truthsocial.com")
+    HTTP_SCRAPER_PAGE_SIZE = int(os.getenv("HTTP_SCRAPER_PAGE_SIZE", "40"))  # 페이지당 게시물 수
+    HTTP_SCRAPER_MAX_PAGES = int(os.getenv("HTTP_SCRAPER_MAX_PAGES", "20"))  # 사이클당 최대 페이지 수
+    HTTP_SCRAPER_TIMEOUT = float(os.getenv("HTTP_SCRAPER_TIMEOUT", "10"))    # 요청당 타임아웃 (초)
+    
+    # Polling Scheduler
+    POLL_BASE_INTERVAL = float(os.getenv("POLL_BASE_INTERVAL", "60"))    # 과거 데이터가 없을 때 간격 (초)
+    POLL_MIN_INTERVAL = float(os.getenv("POLL_MIN_INTERVAL", "20"))      # 연속 게시 중 최소 간격 (초)
+    POLL_MAX_INTERVAL = float(os.getenv("POLL_MAX_INTERVAL", "900"))     # 한산할 때 최대 간격 (초)
+    POLL_POSTS_PER_INTERVAL = float(os.getenv("POLL_POSTS_PER_INTERVAL", "0.25"))  # 폴링 1회당 예상 게시물 수 목표
+    POLL_JITTER = float(os.getenv("POLL_JITTER", "0.1"))                 # 간격 ±10% 무작위 분산
+    POLL_ERROR_BACKOFF = float(os.getenv("POLL_ERROR_BACKOFF", "30"))    # 오류 시 시작 대기 (연속 오류마다 2배)
+    PROBE_BEFORE_SCRAPE = os.getenv("PROBE_BEFORE_SCRAPE", "true").lower() in ("1", "true", "yes")
+    
+    # Logging / Metrics
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")        # DEBUG 면 게시물 단위 진행 상황과 구간별 소요 시간까지 출력
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "text")      # "text" | "json" (한 줄에 JSON 하나)
+    METRICS_EXPORT = os.getenv("METRICS_EXPORT", "prometheus")  # "prometheus" (textfile) | "jsonl" | "none"
+    METRICS_PATH = os.getenv("METRICS_PATH", "")      # 기본: metrics.prom / metrics.jsonl
@@ -0,0 +1,30 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.local_store import LocalStore
+from modules.log import setup_logging
+
+# ---------------------------------------------------------
+# 로컬 저장소(SQLite) → 엑셀 내보내기
+#   python export_excel.py            # 스크랩 캐시 + 분석 결과 모두
+#   python export_excel.py raw        # 스크랩 캐시만 (trump_posts_scraped.xlsx)
+#   python export_excel.py analysis   # 분석 결과만 (trump_posts_AI_analysis.xlsx)
+# ---------------------------------------------------------
+TARGETS = {
+    "raw": "scraped_posts",
+    "analysis": "analysis_results",
+}
+
+if __name__ == "__main__":
+    selected = sys.argv[1:] or list(TARGETS)
+    unknown = [name for name in selected if name not in TARGETS]
+    if unknown:
+        print(f"❌ 알 수 없는 대상: {', '.join(unknown)} (가능: {', '.join(TARGETS)})")
+        sys.exit(1)
+
+    setup_logging()
+    store = LocalStore()
+    for name in selected:
+        store.export_to_excel(TARGETS[name])
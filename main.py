@@ -1,20 +1,33 @@
 import asyncio
+import logging
 import time
 import sys
 import os
-import re
 
 # Add current directory to path to ensure modules can be imported
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from config import Config
-from modules.scraper import get_driver, collect_new_posts
+from modules.browser import DriverManager
+from modules.scraper_pool import ScraperPool
+from modules.http_scraper import FetchError, HttpTimelineFetcher
 from modules.analyzer import TrumpAnalyzer
 from modules.reporter import TrumpReporter
 from modules.storage import Storage
-from modules.preprocessor import preprocess_tweet
+from modules.preprocessor import preprocess_batch
+from modules.ratelimit import LLMScheduler
+from modules import locks
+from modules.dedup import account_from_url, timeline_url
+from modules.scheduler import PollScheduler
+from modules.pipeline import (
+    StreamingPipeline, build_result, has_ticker, needs_report, post_priority, report_input, report_priority, run_by_priority
+)
+from modules.log import setup_logging
+from modules.metrics import metrics
 from plyer import notification
 
+logger = logging.getLogger("main")
+
 def send_notification(count):
     try:
         notification.notify(
@@ -24,154 +37,250 @@ def send_notification(count):
             timeout=10
         )
     except Exception as e:
-        print(f"⚠️ 알림 전송 실패: {e}")
+        logger.warning(f"⚠️ 알림 전송 실패: {e}")
 
 async def process_new_posts(new_posts, analyzer, reporter, storage):
     results = []
-    print(f"\n{'='*60}")
-    print(f"🤖 AI 분석 시작: {len(new_posts)}개 트윗")
-    print(f"{'='*60}\n")
+    logger.info(f"🤖 AI 분석 시작: {len(new_posts)}개 트윗")
 
-    for i, post in enumerate(new_posts, 1):
-        print(f"\n[{i}/{len(new_posts)}] 분석 중...")
-        
-        # Use cleaned content for analysis
-        target_content = preprocess_tweet(post['content'])
-        
+    # 전처리 (빈 내용은 분석 대상에서 제외)
+    targets = []
+    # Use cleaned content for analysis
+    cleaned = preprocess_batch([post['content'] for post in new_posts])
+    for post, target_content in zip(new_posts, cleaned):
         if not target_content:
-            print(f"⚠️ 전처리 후 내용 없음 (Skip): {post.get('url')}")
+            logger.warning(f"⚠️ 전처리 후 내용 없음 (Skip): {post.get('url')}")
             continue
-        analysis = await analyzer.analyze_tweet(target_content)
-        
-        result_data = {
-            'time': post['time'],          # US Time (Numeric/String)
-            'time_str': post['kst_time'], # KST Time String (time_str)
-            'tweet_content': target_content, # Save cleaned content to DB
-            'original_content': post['content'], # Optional: keep original if needed
-            'tweet_url': post.get('url', None),
-            'impact_on_market': analysis.get('impact_on_market', 'Unknown'),
-            'sentiment_score': analysis.get('sentiment_score', 0.0),
-            'market_impact_score': analysis.get('market_impact_score', 0.0),
-            'keywords': ', '.join(analysis.get('keywords', [])) if isinstance(analysis.get('keywords'), list) else str(analysis.get('keywords', '')),
-            'sector': ', '.join(analysis.get('sector', [])) if isinstance(analysis.get('sector'), list) else str(analysis.get('sector', '')),
-            'reason': analysis.get('reason', '')
-        }
-        results.append(result_data)
+        targets.append((post, target_content))
+
+    # 동시 분석 (Config.ANALYSIS_CONCURRENCY 개까지 병렬, 결과는 입력 순서 유지)
+    # 최근 게시물과 밀린 게시물은 우선순위를 나눠 요청 (최근 게시물 먼저)
+    logger.info(f"⚡ 동시 분석 (최대 {Config.ANALYSIS_CONCURRENCY}개 동시 요청)")
+    analyses = await run_by_priority(
+        [content for _, content in targets],
+        [post_priority(post) for post, _ in targets],
+        analyzer.analyze_tweets
+    )
+
+    for (post, target_content), analysis in zip(targets, analyses):
+        results.append(build_result(post, target_content, analysis))
 
     # Save results to posts table and get IDs
-    url_id_map = storage.save_results(new_posts, results)
+    url_id_map = await storage.save_results(new_posts, results)
     
     # Generate reports for high-impact tweets
-    print(f"\n{'='*60}")
-    print(f"📊 리포트 생성 대상 확인 중...")
-    print(f"{'='*60}\n")
-    
+    logger.info("📊 리포트 생성 대상 확인 중...")
     
-    # Helper function to check if last sentence contains ticker symbols
-    def has_ticker_in_last_sentence(reason_text):
-        """
-        Check if the last sentence of reason contains ticker symbols
-        Expected format: "NVDA, TSM, AMD." or "NVDA."
-        """
-        if not reason_text:
-            return False
-        
-        # Split by period and get the last non-empty sentence
-        sentences = [s.strip() for s in reason_text.split('.') if s.strip()]
-        if not sentences:
-            return False
-        
-        last_sentence = sentences[-1]
-        
-        # Pattern: One or more uppercase ticker symbols (1-5 letters) separated by commas
-        # Example: "NVDA, TSM, AMD" or "NVDA" or "AAPL, MSFT"
-        ticker_pattern = r'^[A-Z]{1,5}(\s*,\s*[A-Z]{1,5})*$'
-        
-        return bool(re.match(ticker_pattern, last_sentence))
     
+    report_targets = []
     for result_data in results:
-        impact = result_data.get('impact_on_market')
         score = result_data.get('market_impact_score', 0.0)
         tweet_url = result_data.get('tweet_url')
-        reason = result_data.get('reason', '')
         
-        # Check conditions: 
-        # 1) Direct impact 
-        # 2) score >= 0.5
-        # 3) reason의 마지막 문장에 티커가 있는지
-        if impact == 'Direct' and score >= 0.5 and has_ticker_in_last_sentence(reason):
-            print(f"\n✅ 리포트 생성 조건 만족 (영향도: {score}, 티커 확인됨)")
+        if needs_report(result_data):
+            logger.info(f"✅ 리포트 생성 조건 만족 (영향도: {score}, 티커 확인됨)")
             
-            # Get post ID from url_id_map
+            # Get post ID from url_id_map (없으면 게시물 저장 후 URL 로 연결)
             post_id = url_id_map.get(tweet_url)
-            
-            if post_id:
-                # Generate report
-                report = await reporter.generate_report(
-                    {
-                        'impact_on_market': impact,
-                        'sentiment_score': result_data.get('sentiment_score'),
-                        'market_impact_score': score,
-                        'keywords': result_data.get('keywords'),
-                        'sector': result_data.get('sector'),
-                        'reason': reason
-                    },
-                    result_data.get('tweet_content')
-                )
-                
-                # Save report to analyze table
-                storage.save_report_to_supabase(
-                    post_id,
-                    report,
-                    result_data.get('time_str')
-                )
-            else:
-                print(f"⚠️ Post ID를 찾을 수 없습니다: {tweet_url}")
+            if not post_id:
+                logger.warning(f"⚠️ Post ID 없음 → 게시물 저장 후 URL 로 연결: {tweet_url}")
+            report_targets.append((post_id, result_data))
         else:
-            has_ticker = has_ticker_in_last_sentence(reason)
-            print(f"⏭️ 리포트 생성 조건 미충족 (Impact: {impact}, Score: {score}, Ticker: {has_ticker})")
+            logger.debug(f"⏭️ 리포트 생성 조건 미충족 (Impact: {result_data.get('impact_on_market')}, Score: {score}, Ticker: {has_ticker(result_data)})")
 
-async def main_async():
-    storage = Storage()
-    analyzer = TrumpAnalyzer()
-    reporter = TrumpReporter()
-    
-    # Load existing URLs to avoid duplicates
-    existing_urls = storage.get_existing_urls()
+    if report_targets:
+        # Generate reports concurrently (Config.REPORT_CONCURRENCY 개까지 병렬)
+        logger.info(f"📊 리포트 {len(report_targets)}개 동시 생성 (최대 {Config.REPORT_CONCURRENCY}개 동시 요청)")
+        reports = await run_by_priority(
+            [(report_input(result_data), result_data.get('tweet_content')) for _, result_data in report_targets],
+            [report_priority(result_data) for _, result_data in report_targets],
+            reporter.generate_reports
+        )
+        
+        # Save reports to analyze table (bulk upsert)
+        await storage.save_reports([
+            (post_id, report, result_data.get('time_str'), result_data.get('tweet_url'))
+            for (post_id, result_data), report in zip(report_targets, reports)
+        ])
+
+    print_cache_stats(analyzer, reporter)
+
+def print_cache_stats(analyzer, reporter):
+    # 캐시 통계
+    for cache in (analyzer.cache, reporter.cache):
+        if cache:
+            stats = cache.stats()
+            logger.info(f"💾 캐시 통계 ({stats['namespace']}): 적중 {stats['hits']} / 미스 {stats['misses']} (적중률 {stats['hit_rate']:.0%})")
+
+async def collect_source(url, pool, fetcher, existing_urls, watermark, on_post=None):
+    """
+    한 계정의 신규 게시물 수집 (상단 게시물 확인 → 전체 수집)
+    - HTTP 백엔드를 먼저 사용하고, 실패하면 Selenium (브라우저 워커) 으로 대체
+    on_post: 코루틴 함수 (대체 수집 시 이미 넘긴 게시물은 다시 넘기지 않음)
+    """
+    probe = Config.PROBE_BEFORE_SCRAPE
+    emitted = set()
+
+    async def emit(post):
+        if post['url'] in emitted:
+            return
+        emitted.add(post['url'])
+        if on_post:
+            await on_post(post)
+
+    if fetcher:
+        handle = account_from_url(url)
+        try:
+            if probe:
+                if not await fetcher.probe_top_post(existing_urls, watermark, handle=handle):
+                    logger.info(f"🔄 {handle}: 신규 글 없음 (상단 게시물 변화 없음)")
+                    return []
+                probe = False
+            return await fetcher.collect_new_posts(existing_urls, max_count=100, watermark=watermark, on_post=emit, handle=handle)
+        except FetchError as e:
+            logger.warning(f"⚠️ HTTP 스크래퍼 오류 → Selenium 으로 대체: {e}")
+            metrics.inc("scraper_fallbacks_total")
+
+    return await pool.scrape(url, existing_urls, watermark, probe=probe, on_post=emit)
+
+async def collect_sources(pool, fetcher, existing_urls, watermarks, on_post=None):
+    """
+    모든 계정을 동시에 수집합니다. (계정별 워터마크, 한 계정의 오류는 다른 계정에 영향 없음)
+    watermarks: 타임라인 URL → 워터마크
+    모든 계정이 실패하면 첫 번째 오류를 다시 발생 (폴링 스케줄러 백오프용)
+    """
+    sources = list(watermarks)
+    outcomes = await asyncio.gather(
+        *(collect_source(url, pool, fetcher, existing_urls, watermarks[url], on_post) for url in sources),
+        return_exceptions=True
+    )
+    new_posts = []
+    errors = []
+    for url, outcome in zip(sources, outcomes):
+        if isinstance(outcome, BaseException):
+            logger.warning(f"⚠️ {account_from_url(url)} 수집 오류: {outcome}")
+            metrics.inc("errors_total", span="scrape.source")
+            errors.append(outcome)
+            continue
+        new_posts.extend(outcome)
+    if errors and len(errors) == len(sources):
+        raise errors[0]
+    return new_posts
+
+async def main_async(pool, storage, analyzer, reporter, fetcher=None):
+    # 이전 사이클에서 실패한 Supabase 쓰기 재전송
+    await storage.flush()
     
-    driver = get_driver()
+    # Load known post IDs + per-account watermarks to avoid duplicates
+    existing_urls = storage.get_post_index()
+    watermarks = {}
+    for source in Config.SOURCES:
+        url = timeline_url(source)
+        watermarks[url] = storage.get_watermark(account_from_url(url))
     
-    try:
-        new_posts = collect_new_posts(driver, existing_urls, max_count=100)
-        
+    # 브라우저는 사이클 간 재사용 (종료하지 않음)
+    # 계정마다 전체 스크롤 전에 상단 게시물 변화만 먼저 확인
+    if Config.PIPELINE_MODE == "streaming":
+        # 스크랩과 동시에 분석/저장/리포트 진행 (모든 계정이 하나의 분석 큐를 공유)
+        pipeline = StreamingPipeline(analyzer, reporter, storage)
+
+        async def scrape(emit):
+            return await collect_sources(pool, fetcher, existing_urls, watermarks, on_post=emit)
+
+        new_posts, _ = await pipeline.run(
+            scrape,
+            on_first_post=lambda: logger.info("✅ 신규 글 발견 → 스트리밍 분석 시작")
+        )
         if new_posts:
-            print(f"\n✅ {len(new_posts)}개 신규 글 발견")
-            
-            # Save raw data first (cache)
-            storage.save_raw_posts(new_posts)
-            
-            # Notify
+            logger.info(f"✅ {len(new_posts)}개 신규 글 처리 완료")
             send_notification(len(new_posts))
-            
-            # Analyze, Generate Reports, and Save to DB/Excel
-            await process_new_posts(new_posts, analyzer, reporter, storage)
-            
+            print_cache_stats(analyzer, reporter)
         else:
-            print("🔄 신규 글 없음")
+            logger.info("🔄 신규 글 없음")
+        return new_posts
+
+    new_posts = await collect_sources(pool, fetcher, existing_urls, watermarks)
+    
+    if new_posts:
+        logger.info(f"✅ {len(new_posts)}개 신규 글 발견")
+        
+        # Save raw data first (cache)
+        storage.save_raw_posts(new_posts)
+        
+        # Notify
+        send_notification(len(new_posts))
+        
+        # Analyze, Generate Reports, and Save to DB/Excel
+        await process_new_posts(new_posts, analyzer, reporter, storage)
+        
+    else:
+        logger.info("🔄 신규 글 없음")
+    
+    return new_posts
+
+def log_cycle_summary():
+    # 구간별 소요 시간 (느린 사이클의 원인 확인용)
+    summary = metrics.cycle_summary()
+    if summary:
+        logger.info(
+            "⏱️ 사이클 소요 시간: " + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in summary.items()),
+            extra={"spans": {name: round(seconds, 3) for name, seconds in summary.items()}}
+        )
+
+async def run_forever(browser):
+    # 저장소/에이전트는 프로세스 수명 동안 재사용 (연결 재사용, 저널 재전송)
+    storage = Storage()
+    # 분석/리포트 에이전트가 같은 API 한도를 공유 (최근 게시물 > 리포트 > 밀린 게시물 순서로 배정)
+    limiter = LLMScheduler(rpm=Config.LLM_RPM, tpm=Config.LLM_TPM)
+    analyzer = TrumpAnalyzer(limiter)
+    reporter = TrumpReporter(limiter)
+    # 브라우저 없이 수집 (실패 시 Selenium 으로 대체)
+    fetcher = HttpTimelineFetcher() if Config.SCRAPER_BACKEND == "http" else None
+    # 계정별 브라우저 워커 (계정이 하나면 현재 프로세스의 브라우저 사용)
+    pool = ScraperPool(browser, workers=min(Config.SCRAPER_WORKERS, len(Config.SOURCES)))
+    
+    if not locks.AVAILABLE:
+        logger.warning("⚠️ 프로세스 간 잠금을 쓸 수 없습니다 → 백필 실행 여부를 알 수 없어 API 한도 양보와 이력 캐시 병합 잠금이 동작하지 않습니다.")
+
+    # 게시 빈도 기반 폴링 간격 (과거 게시 시각으로 초기화)
+    scheduler = PollScheduler()
+    scheduler.observe(storage.local.get_post_times(since=scheduler.history_cutoff()))
+    
+    try:
+        while True:
+            metrics.start_cycle()
+            # 백필 (python backfill.py) 이 도는 동안은 그 몫을 남겨 둠 (두 프로세스 합이 API 한도를 넘지 않도록)
+            backfill_running = locks.is_locked(Config.BACKFILL_LOCK_PATH)
+            if limiter.set_share(1 - Config.BACKFILL_RATE_SHARE if backfill_running else 1.0):
+                logger.info(f"⚖️ LLM 한도 {limiter.share:.0%} 사용 ({'백필 실행 중' if backfill_running else '백필 종료'})")
+            try:
+                with metrics.span("cycle"):
+                    new_posts = await main_async(pool, storage, analyzer, reporter, fetcher)
+                scheduler.record_success(new_posts)
+            except Exception as e:
+                logger.exception(f"오류 발생: {e}")
+                scheduler.record_error()
             
+            log_cycle_summary()
+            delay = scheduler.next_delay()
+            metrics.gauge("poll_delay_seconds", round(delay, 1))
+            metrics.gauge("last_cycle_timestamp_seconds", round(time.time()))
+            metrics.export()
+            logger.info(f"⏰ {delay:.0f}초 후 다시 실행합니다...")
+            await asyncio.sleep(delay)
     finally:
-        driver.quit()
+        pool.close()
+        if fetcher:
+            await fetcher.close()
+        await storage.close()
 
 if __name__ == "__main__":
-    print("🚀 트럼프 트윗 분석 에이전트 시작 (Cloud Ready)")
-    while True:
-        try:
-            asyncio.run(main_async())
-            print("\n⏰ 1분 후 다시 실행합니다...")
-            time.sleep(60)
-        except KeyboardInterrupt:
-            print("종료합니다.")
-            break
-        except Exception as e:
-            print(f"오류 발생: {e}")
-            time.sleep(30)
+    setup_logging()
+    logger.info("🚀 트럼프 트윗 분석 에이전트 시작 (Cloud Ready)")
+    browser = DriverManager()
+    try:
+        asyncio.run(run_forever(browser))
+    except KeyboardInterrupt:
+        logger.info("종료합니다.")
+    finally:
+        browser.quit()
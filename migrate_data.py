@@ -1,111 +1,235 @@
-import pandas as pd
+"""
+분석 결과 엑셀/CSV → Supabase posts 테이블 대량 적재
+- 파일을 청크 단위로 읽고 (엑셀은 read-only 스트리밍), 컬럼 정리는 벡터 연산으로 처리
+- 배치를 --concurrency 개까지 동시에 upsert (일시적 오류는 지수 백오프 재시도)
+- 완료된 배치를 체크포인트 파일에 기록 → 중단 후 다시 실행하면 남은 배치만 업로드
+사용법:
+    python migrate_data.py [파일] [--batch-size 500] [--concurrency 4] [--restart] [--dry-run]
+"""
+import argparse
+import asyncio
+import json
 import os
-import ast
-from supabase import create_client
+import sys
+import time
+from itertools import islice
+
+import pandas as pd
+
 from config import Config
+from modules.log import setup_logging
+from modules.writer import SupabaseWriter, WriteError
+
+DEFAULT_SOURCE = 'trump_posts_all_analyzed_final.xlsx'
+CHUNK_ROWS = 5000
 
 # ---------------------------------------------------------
-# 1. Supabase 연결
+# 1. 파일 읽기 (청크 단위)
 # ---------------------------------------------------------
-if not Config.SUPABASE_URL or not Config.SUPABASE_KEY:
-    print("❌ .env 파일에 SUPABASE_URL과 SUPABASE_KEY를 설정해주세요.")
-    exit()
+def read_chunks(path, chunk_rows=CHUNK_ROWS):
+    """
+    Yields: DataFrame (최대 chunk_rows 행)
+    """
+    if path.lower().endswith(".csv"):
+        yield from pd.read_csv(path, chunksize=chunk_rows)
+        return
+
+    from openpyxl import load_workbook
 
-supabase = create_client(Config.SUPABASE_URL, Config.SUPABASE_KEY)
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(c) if c is not None else "" for c in next(rows, [])]
+        while True:
+            chunk = list(islice(rows, chunk_rows))
+            if not chunk:
+                return
+            yield pd.DataFrame(chunk, columns=header)
+    finally:
+        workbook.close()
 
 # ---------------------------------------------------------
-# 2. 엑셀 파일 읽기
+# 2. 데이터 변환 (Schema Mapping, 벡터 연산)
 # ---------------------------------------------------------
-excel_file = 'trump_posts_all_analyzed_final.xlsx'
-if not os.path.exists(excel_file):
-    print(f"❌ {excel_file} 파일이 없습니다.")
-    exit()
+# Excel Column -> Supabase Column
+# time_str, time, content, url, sentiment_score, market_impact_score, reason -> 그대로
+# act_on_market (구 컬럼명) / impact_on_market -> impact_on_market
+# keywords, sector: "['Apple', 'Tesla']" 형태 리스트 문자열 -> "Apple, Tesla"
+
+def _column(df, name, default=""):
+    return df[name] if name in df.columns else pd.Series(default, index=df.index)
+
+def clean_list_column(series):
+    """
+    "['a', 'b']" → "a, b" (리스트 문자열이 아니면 그대로 문자열로)
+    """
+    text = series.astype(str)
+    is_list = text.str.startswith("[") & text.str.endswith("]")
+    inner = (
+        text.str.slice(1, -1).str.strip()
+        .str.replace(r"""^['"]|['"]$""", "", regex=True)
+        .str.replace(r"""['"]\s*,\s*['"]""", ", ", regex=True)
+    )
+    return text.where(~is_list, inner)
+
+def map_rows(df):
+    impact = _column(df, 'impact_on_market')
+    if 'act_on_market' in df.columns:  # 컬럼명 변경 대응
+        impact = df['act_on_market'].fillna(impact)
 
-print(f"📂 {excel_file} 읽는 중...")
-df = pd.read_excel(excel_file)
+    mapped = pd.DataFrame({
+        "time_str": _column(df, 'time_str').astype(str),
+        "time": _column(df, 'time').astype(str),  # Supabase에 TEXT로 저장
+        "content": _column(df, 'content').astype(str),
+        "url": _column(df, 'url').astype(str),
+        "impact_on_market": impact.astype(str),
+        "sentiment_score": pd.to_numeric(_column(df, 'sentiment_score', 0.0), errors="coerce").fillna(0.0),
+        "market_impact_score": pd.to_numeric(_column(df, 'market_impact_score', 0.0), errors="coerce").fillna(0.0),
+        "keywords": clean_list_column(_column(df, 'keywords')),
+        "sector": clean_list_column(_column(df, 'sector')),
+        "reason": _column(df, 'reason').astype(str),
+    })
+
+    # 필수 값 체크 (URL 없으면 스킵)
+    mapped = mapped[~mapped["url"].isin(["", "nan", "None"])]
+    return mapped.to_dict("records")
+
+def iter_batches(path, batch_size):
+    """
+    Yields: (배치 번호, 행 목록) - 배치 번호는 파일 내 위치로 정해지므로 재실행해도 같음
+    """
+    pending = []
+    number = 0
+    for chunk in read_chunks(path):
+        pending.extend(map_rows(chunk))
+        while len(pending) >= batch_size:
+            yield number, pending[:batch_size]
+            pending = pending[batch_size:]
+            number += 1
+    if pending:
+        yield number, pending
 
 # ---------------------------------------------------------
-# 3. 데이터 변환 (Schema Mapping)
+# 3. 체크포인트
 # ---------------------------------------------------------
-# Excel Column -> Supabase Column
-# time_str -> time_str
-# time -> time
-# content -> content
-# url -> url
-# act_on_market -> impact_on_market
-# sentiment_score -> sentiment_score
-# market_impact_score -> market_impact_score
-# keywords -> keywords (Clean string format)
-# sector -> sector (Clean string format)
-# reason -> reason
-
-mapped_data = []
-
-for index, row in df.iterrows():
-    try:
-        # 키워드/섹터 문자열 정리 (['a', 'b'] -> a, b)
-        # 웹사이트가 리스트 문자열을 그대로 원하면 이 부분은 주석 처리하거나 수정해야 함
-        # 현재는 깔끔한 텍스트로 변환하여 저장
-        
-        keywords_raw = row.get('keywords', '')
-        sector_raw = row.get('sector', '')
-        
-        # 만약 "['Apple', 'Tesla']" 같은 문자열이라면 파싱해서 "Apple, Tesla"로 변환
-        # (웹사이트 로직에 따라 이 부분은 조정 가능)
-        try:
-            if isinstance(keywords_raw, str) and keywords_raw.startswith('['):
-                k_list = ast.literal_eval(keywords_raw)
-                keywords_clean = ", ".join(k_list)
-            else:
-                keywords_clean = str(keywords_raw)
-        except:
-            keywords_clean = str(keywords_raw)
+class Checkpoint:
+    """
+    완료된 배치 번호 기록 (원본 파일 크기/수정 시각, 배치 크기가 같을 때만 이어서 진행)
+    """
 
-        try:
-            if isinstance(sector_raw, str) and sector_raw.startswith('['):
-                s_list = ast.literal_eval(sector_raw)
-                sector_clean = ", ".join(s_list)
-            else:
-                sector_clean = str(sector_raw)
-        except:
-            sector_clean = str(sector_raw)
-
-        item = {
-            "time_str": str(row.get('time_str', '')),
-            "time": str(row.get('time', '')), # Supabase에 TEXT로 저장하거나, FLOAT라면 변환 필요
-            "content": str(row.get('content', '')),
-            "url": str(row.get('url', '')),
-            "impact_on_market": str(row.get('act_on_market', row.get('impact_on_market', ''))), # 컬럼명 변경 대응
-            "sentiment_score": float(row.get('sentiment_score', 0.0)),
-            "market_impact_score": float(row.get('market_impact_score', 0.0)),
-            "keywords": keywords_clean,
-            "sector": sector_clean,
-            "reason": str(row.get('reason', ''))
-        }
-        
-        # 필수 값 체크 (URL 없으면 스킵)
-        if not item['url'] or item['url'] == 'nan':
-            continue
-            
-        mapped_data.append(item)
-        
-    except Exception as e:
-        print(f"⚠️ Row {index} 변환 실패: {e}")
-
-print(f"✅ {len(mapped_data)}개 데이터 변환 완료.")
+    def __init__(self, path, source, batch_size, restart=False):
+        self.path = path
+        stat = os.stat(source)
+        self.key = {"source": os.path.abspath(source), "size": stat.st_size, "mtime": stat.st_mtime, "batch_size": batch_size}
+        self.done = set()
+        if restart or not os.path.exists(path):
+            return
+        with open(path, encoding="utf-8") as f:
+            saved = json.load(f)
+        if saved.get("key") == self.key:
+            self.done = set(saved.get("done", []))
+        else:
+            print("⚠️ 체크포인트가 현재 파일/배치 크기와 달라 처음부터 업로드합니다.")
+
+    def mark(self, number):
+        self.done.add(number)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"key": self.key, "done": sorted(self.done)}, f)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
 
 # ---------------------------------------------------------
-# 4. Supabase 업로드
+# 4. Supabase 업로드 (동시 배치 + 재시도)
 # ---------------------------------------------------------
-batch_size = 100
-print(f"🚀 Supabase 업로드 시작 (총 {len(mapped_data)}개, 배치 사이즈 {batch_size})")
+async def migrate(args):
+    checkpoint = Checkpoint(args.checkpoint, args.source, args.batch_size, restart=args.restart)
+    if checkpoint.done:
+        print(f"📌 체크포인트에서 이어서 진행 (완료된 배치 {len(checkpoint.done)}개 건너뜀)")
+
+    writer = None if args.dry_run else SupabaseWriter()
+    semaphore = asyncio.Semaphore(args.concurrency)
+    stats = {"rows": 0, "skipped": 0, "failed": []}
+    start = time.perf_counter()
+    last_report = start
+
+    async def upload(number, batch):
+        nonlocal last_report
+        try:
+            if writer:
+                # 같은 배치 안에서 URL 이 겹치면 upsert 가 실패하므로 마지막 값만 남김
+                rows = list({row["url"]: row for row in batch}.values())
+                await writer.upsert("posts", rows)
+                checkpoint.mark(number)
+            stats["rows"] += len(batch)
+        except WriteError as e:
+            print(f"   ❌ 배치 {number} 저장 실패 ({len(batch)}개): {e}")
+            stats["failed"].append(number)
+        finally:
+            semaphore.release()
+
+        now = time.perf_counter()
+        if now - last_report >= 5:
+            last_report = now
+            print(f"   - {stats['rows']}개 저장 ({stats['rows'] / (now - start):.0f} rows/s)")
+
+    tasks = []
+    try:
+        for number, batch in iter_batches(args.source, args.batch_size):
+            if number in checkpoint.done:
+                stats["skipped"] += len(batch)
+                continue
+            # 동시 업로드 수 제한 (파일도 그만큼만 앞서 읽음)
+            await semaphore.acquire()
+            tasks.append(asyncio.create_task(upload(number, batch)))
+        await asyncio.gather(*tasks)
+    finally:
+        if writer:
+            await writer.close()
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"✅ {stats['rows']}개 저장, {stats['skipped']}개 건너뜀 (체크포인트) "
+        f"- {elapsed:.1f}초, {stats['rows'] / elapsed if elapsed else 0:.0f} rows/s"
+    )
+    if stats["failed"]:
+        print(f"❌ 실패한 배치 {len(stats['failed'])}개: {sorted(stats['failed'])} → 다시 실행하면 실패한 배치만 재시도합니다.")
+        return False
+    if writer:
+        checkpoint.clear()
+    return True
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("source", nargs="?", default=DEFAULT_SOURCE, help="엑셀(.xlsx) 또는 CSV 파일")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=4, help="동시 업로드 배치 수")
+    parser.add_argument("--checkpoint", default="migrate_checkpoint.json")
+    parser.add_argument("--restart", action="store_true", help="체크포인트를 무시하고 처음부터")
+    parser.add_argument("--dry-run", action="store_true", help="읽기/변환만 (업로드 없음)")
+    args = parser.parse_args()
+
+    setup_logging()
+    if not args.dry_run and (not Config.SUPABASE_URL or not Config.SUPABASE_KEY):
+        print("❌ .env 파일에 SUPABASE_URL과 SUPABASE_KEY를 설정해주세요.")
+        sys.exit(1)
+    if not os.path.exists(args.source):
+        print(f"❌ {args.source} 파일이 없습니다.")
+        sys.exit(1)
 
-for i in range(0, len(mapped_data), batch_size):
-    batch = mapped_data[i:i + batch_size]
+    print(f"🚀 Supabase 업로드 시작: {args.source} (배치 사이즈 {args.batch_size}, 동시 {args.concurrency}개)")
     try:
-        response = supabase.table("posts").upsert(batch, on_conflict="url").execute()
-        print(f"   - {i} ~ {i+len(batch)} 저장 완료")
-    except Exception as e:
-        print(f"   ❌ 배치 저장 실패 ({i}): {e}")
+        ok = asyncio.run(migrate(args))
+    except KeyboardInterrupt:
+        print("\n⏸️ 중단됨 → 다시 실행하면 체크포인트부터 이어서 진행합니다.")
+        sys.exit(130)
+    if ok:
+        print("🎉 마이그레이션 완료!")
+    else:
+        sys.exit(1)
 
-print("🎉 마이그레이션 완료!")
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,62 @@
 from agents import Agent, Runner
 import json
 import asyncio
+import logging
 
 from config import Config
+from modules.ratelimit import LIVE, current_priority, estimate_tokens
+from modules.cache import ResultCache
+from modules.prefilter import NoImpactFilter
+from modules.metrics import metrics
+from modules.schemas import TweetAnalysis, load_json, parse_structured, validate
+
+logger = logging.getLogger(__name__)
+
+# 응답 JSON (keywords/sector/reason) 에 대한 대략적인 출력 토큰 예산
+EXPECTED_OUTPUT_TOKENS = 300
+
+# 배치 모드: 여러 트윗을 한 번의 요청으로 분석 (항목별 스키마는 단건과 동일)
+BATCH_INSTRUCTIONS = (
+    "\n\nBatch Mode:\n"
+    "The input is a JSON array of objects, each with an integer 'index' and a 'tweet'. "
+    "Analyze every tweet independently, following all instructions and rules above for each one. "
+    "Respond strictly with a valid JSON array containing exactly one object per input tweet. "
+    "Each object must contain the same 'index' as its input plus the fields "
+    "impact_on_market, sentiment_score, market_impact_score, keywords, sector and reason. "
+    "Do not add any text outside the JSON array."
+)
+
+def passes_report_gate(analysis):
+    """
+    리포트 조건 중 분석 결과로 정해지는 부분 (Direct + 영향도 기준 이상)
+    """
+    return (
+        analysis.get("impact_on_market") == "Direct"
+        and analysis.get("market_impact_score", 0.0) >= Config.REPORT_MIN_SCORE
+    )
+
+def needs_escalation(analysis, band=None):
+    """
+    강한 모델로 재분석할지: 분석 실패, 또는 시장 영향이 있고 영향도가 리포트 기준 ± band 안
+    """
+    band = Config.ANALYSIS_CASCADE_BAND if band is None else band
+    impact = analysis.get("impact_on_market")
+    if impact == "Error":
+        return True
+    return (
+        impact in ("Direct", "Indirect")
+        and abs(analysis.get("market_impact_score", 0.0) - Config.REPORT_MIN_SCORE) <= band
+    )
 
 class TrumpAnalyzer:
-    def __init__(self):
+    def __init__(self, limiter=None):
+        self.limiter = limiter
+        # 단계 모드: 모든 게시물은 빠른 모델로, 리포트 기준 근처 결과만 강한 모델로 재분석
+        fast_model = Config.ANALYSIS_FAST_MODEL if Config.ANALYSIS_CASCADE else Config.OPENAI_MODEL_NAME
+        self.model_name = f"{fast_model}>{Config.ANALYSIS_STRONG_MODEL}" if Config.ANALYSIS_CASCADE else fast_model
         self.agent = Agent(
             name="트럼프 트윗 분석 에이전트",
-            model=Config.OPENAI_MODEL_NAME,
+            model=fast_model,
             instructions=(
                 "Forget all previous instructions and context.\n\n"
                 "You are an expert who analyzes Donald Trump's tweets for economic and stock market implications. "
@@ -30,24 +78,170 @@ class TrumpAnalyzer:
                 "Respond strictly in valid JSON with no extra text."
             )
         )
+        self.batch_agent = Agent(
+            name="트럼프 트윗 배치 분석 에이전트",
+            model=fast_model,
+            instructions=self.agent.instructions + BATCH_INSTRUCTIONS
+        )
+        self.strong_agent = None
+        self.strong_batch_agent = None
+        if Config.ANALYSIS_CASCADE:
+            self.strong_agent = Agent(
+                name="트럼프 트윗 분석 에이전트 (재분석)",
+                model=Config.ANALYSIS_STRONG_MODEL,
+                instructions=self.agent.instructions
+            )
+            self.strong_batch_agent = Agent(
+                name="트럼프 트윗 배치 분석 에이전트 (재분석)",
+                model=Config.ANALYSIS_STRONG_MODEL,
+                instructions=self.batch_agent.instructions
+            )
+        # 지표 라벨 (단계별 요청 수/토큰)
+        self._labels = [
+            (self.agent, "analyzer"), (self.batch_agent, "analyzer_batch"),
+            (self.strong_agent, "analyzer_strong"), (self.strong_batch_agent, "analyzer_strong_batch"),
+        ]
+        # 배치 결과도 항목별 스키마가 같으므로 단건 분석 캐시를 공유 (단계 모드는 최종 결과를 모델 조합별로)
+        # 배치 프롬프트가 바뀌어도 무효화되도록 두 프롬프트를 함께 키에 반영
+        self.cache = (
+            ResultCache("analyzer", self.model_name, self.batch_agent.instructions)
+            if Config.CACHE_ENABLED else None
+        )
+        # 확실한 'No' 게시물은 LLM 을 호출하지 않음 (모델 파일이 없으면 비활성)
+        self.prefilter = (
+            NoImpactFilter.load(Config.PREFILTER_MODEL_PATH, Config.PREFILTER_THRESHOLD)
+            if Config.PREFILTER_ENABLED else None
+        )
+
+    def _label(self, agent):
+        for tier_agent, label in self._labels:
+            if agent is tier_agent:
+                return label
+        return "analyzer"
 
+    async def _run(self, agent, input_text, expected_output_tokens=EXPECTED_OUTPUT_TOKENS):
+        label = self._label(agent)
+        if self.limiter:
+            with metrics.span("llm.rate_limit", agent=label):
+                await self.limiter.acquire(
+                    estimate_tokens(agent.instructions) + estimate_tokens(input_text) + expected_output_tokens,
+                    priority=current_priority(LIVE)
+                )
+        with metrics.span("llm.request", agent=label):
+            try:
+                result = await asyncio.wait_for(Runner.run(agent, input_text), timeout=Config.LLM_TIMEOUT)
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"LLM 응답 시간 초과 ({Config.LLM_TIMEOUT}초)")
+        metrics.record_usage(label, result)
+        return result.final_output
+
+    def _prefiltered(self, tweet_text):
+        if not self.prefilter:
+            return None
+        analysis = self.prefilter.check(tweet_text)
+        metrics.inc("prefilter_checks_total", result="skip" if analysis else "pass")
+        if analysis:
+            logger.debug(f"⏭️ 사전 필터로 LLM 생략: {tweet_text[:50]}...")
+        return analysis
+
+    @metrics.timed("analyze.tweet")
     async def analyze_tweet(self, tweet_text):
+        skipped = self._prefiltered(tweet_text)
+        if skipped:
+            return skipped
+
+        if self.cache:
+            cached = self.cache.get(tweet_text)
+            if cached is not None:
+                logger.debug(f"💾 캐시 사용: {tweet_text[:50]}...")
+                return cached
+
+        return (await self._analyze_uncached([tweet_text]))[0]
+
+    async def _analyze_uncached(self, tweet_texts):
+        """
+        LLM 분석 (단계 모드면 빠른 모델 → 불확실하거나 실패한 결과만 강한 모델로 재분석) 후 캐시에 저장
+        """
+        results = await self._analyze_tier(tweet_texts, "fast")
+        if self.strong_agent:
+            results = await self._escalate(tweet_texts, results)
+        if self.cache:
+            for text, analysis in zip(tweet_texts, results):
+                if analysis.get("impact_on_market") != "Error":
+                    self.cache.set(text, analysis)
+        return results
+
+    async def _escalate(self, tweet_texts, results):
+        """
+        리포트 기준 근처 (또는 오류) 결과만 강한 모델로 재분석하고, 두 모델의 판정 일치율을 기록
+        """
+        escalate = [i for i, analysis in enumerate(results) if needs_escalation(analysis)]
+        metrics.inc("analysis_tier_posts_total", len(results) - len(escalate), tier="fast")
+        if not escalate:
+            return results
+
+        logger.info(f"🔼 강한 모델로 재분석: {len(escalate)}/{len(results)}개 (리포트 기준 근처/오류)")
+        retried = await self._analyze_tier([tweet_texts[i] for i in escalate], "strong")
+        results = list(results)
+        for i, analysis in zip(escalate, retried):
+            first = results[i]
+            if analysis.get("impact_on_market") == "Error":
+                metrics.inc("analysis_cascade_errors_total")
+                if first.get("impact_on_market") != "Error":
+                    # 강한 모델이 실패하면 빠른 모델 결과 유지
+                    metrics.inc("analysis_tier_posts_total", tier="fast")
+                    continue
+            elif first.get("impact_on_market") != "Error":
+                metrics.inc(
+                    "analysis_cascade_agreement_total", field="gate",
+                    result="agree" if passes_report_gate(first) == passes_report_gate(analysis) else "disagree"
+                )
+                metrics.inc(
+                    "analysis_cascade_agreement_total", field="impact",
+                    result="agree" if first.get("impact_on_market") == analysis.get("impact_on_market") else "disagree"
+                )
+            metrics.inc("analysis_tier_posts_total", tier="strong")
+            results[i] = analysis
+        return results
+
+    async def _analyze_tier(self, tweet_texts, tier):
+        """
+        한 단계 모델로 분석 (1개면 단건 요청, 2개 이상이면 배치 요청, 캐시하지 않음)
+        """
+        with metrics.span("analyze.tier", tier=tier):
+            if len(tweet_texts) == 1:
+                return [await self._analyze_single(tweet_texts[0], tier)]
+            return await self._analyze_multi(tweet_texts, tier)
+
+    def _agents(self, tier):
+        """
+        Returns: (단건 에이전트, 배치 에이전트)
+        """
+        if tier == "strong":
+            return self.strong_agent, self.strong_batch_agent
+        return self.agent, self.batch_agent
+
+    async def _validated(self, tweet_text, response, tier="fast"):
+        """
+        응답을 TweetAnalysis 스키마로 검증 (실패한 필드만 단건 에이전트로 재요청)
+        """
+        agent = self._agents(tier)[0]
+        return await parse_structured(
+            TweetAnalysis, response, tweet_text,
+            reask=lambda prompt: self._run(agent, prompt),
+            agent="analyzer"
+        )
+
+    async def _analyze_single(self, tweet_text, tier="fast"):
         try:
-            print(f"🤖 AI 분석 중: {tweet_text[:50]}...")
-            result = await Runner.run(self.agent, tweet_text)
-            response_text = result.final_output
-
-            # JSON Parsing
-            if "```json" in response_text:
-                response_text = response_text.split("```json")[1].split("```")[0].strip()
-            elif "```" in response_text:
-                response_text = response_text.split("```")[1].split("```")[0].strip()
-
-            analysis = json.loads(response_text)
-            print(f"✅ 분석 완료: {analysis.get('impact_on_market')} | 영향도: {analysis.get('market_impact_score')}")
+            logger.debug(f"🤖 AI 분석 중: {tweet_text[:50]}...")
+            response_text = await self._run(self._agents(tier)[0], tweet_text)
+            analysis = await self._validated(tweet_text, response_text, tier)
+            logger.info(f"✅ 분석 완료: {analysis.get('impact_on_market')} | 영향도: {analysis.get('market_impact_score')}")
             return analysis
         except Exception as e:
-            print(f"⚠️ 분석 오류: {e}")
+            logger.warning(f"⚠️ 분석 오류: {e}")
+            metrics.inc("errors_total", span="analyze.tweet")
             return {
                 "impact_on_market": "Error",
                 "sentiment_score": 0.0,
@@ -56,3 +250,116 @@ class TrumpAnalyzer:
                 "sector": [],
                 "reason": f"분석 오류: {str(e)}"
             }
+
+    @metrics.timed("analyze.batch")
+    async def analyze_batch(self, tweet_texts):
+        """
+        여러 트윗을 한 번의 요청으로 분석합니다.
+        - 응답은 index 로 매칭하며, 스키마 검증에 실패한 항목은 실패한 필드만 재요청
+        - 누락된 항목 (또는 필드 재요청도 실패한 항목) 은 단건으로 재요청
+        - 결과는 입력 순서와 동일한 순서로 반환
+        """
+        results = [None] * len(tweet_texts)
+        pending = []
+        for i, text in enumerate(tweet_texts):
+            cached = self._prefiltered(text) or (self.cache.get(text) if self.cache else None)
+            if cached is not None:
+                results[i] = cached
+            else:
+                pending.append(i)
+
+        if not pending:
+            logger.info(f"💾 배치 전체 캐시/사전 필터 사용 ({len(tweet_texts)}개)")
+            return results
+
+        analyses = await self._analyze_uncached([tweet_texts[i] for i in pending])
+        for i, analysis in zip(pending, analyses):
+            results[i] = analysis
+        return results
+
+    async def _analyze_multi(self, tweet_texts, tier="fast"):
+        results = [None] * len(tweet_texts)
+        pending = list(range(len(tweet_texts)))
+        batch_agent = self._agents(tier)[1]
+
+        payload = json.dumps(
+            [{"index": n, "tweet": tweet_texts[i]} for n, i in enumerate(pending)],
+            ensure_ascii=False
+        )
+        failed = []
+        invalid = []
+        try:
+            logger.info(f"🤖 AI 배치 분석 중: {len(pending)}개 트윗")
+            response_text = await self._run(batch_agent, payload, EXPECTED_OUTPUT_TOKENS * len(pending))
+            items = load_json(response_text, "analyzer_batch")
+            if not isinstance(items, list):
+                raise ValueError("응답이 JSON 배열이 아닙니다")
+
+            by_index = {}
+            for item in items:
+                try:
+                    by_index[int(item["index"])] = item
+                except (TypeError, KeyError, ValueError):
+                    continue
+
+            for n, i in enumerate(pending):
+                item = by_index.get(n)
+                if item is None:
+                    failed.append(i)
+                    continue
+                item = {field: value for field, value in item.items() if field != "index"}
+                instance, errors = validate(TweetAnalysis, item)
+                if instance is None:
+                    invalid.append((i, item))
+                    continue
+                results[i] = instance.model_dump()
+            logger.info(f"✅ 배치 분석 완료: {len(pending) - len(failed) - len(invalid)}/{len(pending)}개 성공")
+        except Exception as e:
+            logger.warning(f"⚠️ 배치 분석 오류: {e}")
+            metrics.inc("errors_total", span="analyze.batch")
+            failed = pending
+            invalid = []
+
+        # 재요청은 순서대로 (배치 하나가 analyze_tweets 의 동시 요청 슬롯 하나만 쓰도록)
+        # 형식이 잘못된 항목은 실패한 필드만 재요청
+        for i, item in invalid:
+            try:
+                results[i] = await self._validated(tweet_texts[i], item, tier)
+            except Exception as e:
+                logger.warning(f"⚠️ 필드 재요청 실패: {e}")
+                failed.append(i)
+
+        # 실패한 항목만 단건으로 재요청
+        if failed:
+            logger.info(f"🔁 단건 재요청: {len(failed)}개")
+            metrics.inc("analysis_batch_fallbacks_total", len(failed))
+            for i in failed:
+                results[i] = await self._analyze_single(tweet_texts[i], tier)
+
+        return results
+
+    async def analyze_tweets(self, tweet_texts, concurrency=None, batch_size=None):
+        """
+        여러 트윗을 동시에 분석합니다.
+        - 동시 요청 수는 concurrency (기본값: Config.ANALYSIS_CONCURRENCY) 로 제한
+        - batch_size (기본값: Config.ANALYSIS_BATCH_SIZE) 가 2 이상이면 batch_size 개씩 묶어 한 번에 요청
+        - 결과는 입력 순서와 동일한 순서로 반환
+        """
+        concurrency = max(1, concurrency or Config.ANALYSIS_CONCURRENCY)
+        batch_size = max(1, batch_size or Config.ANALYSIS_BATCH_SIZE)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        if batch_size > 1 and len(tweet_texts) > 1:
+            async def run_batch(texts):
+                async with semaphore:
+                    return await self.analyze_batch(texts)
+
+            batches = [tweet_texts[i:i + batch_size] for i in range(0, len(tweet_texts), batch_size)]
+            batch_results = await asyncio.gather(*(run_batch(texts) for texts in batches))
+            return [analysis for results in batch_results for analysis in results]
+
+        async def run_one(text):
+            async with semaphore:
+                return await self.analyze_tweet(text)
+
+        return await asyncio.gather(*(run_one(text) for text in tweet_texts))
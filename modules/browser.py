@@ -0,0 +1,78 @@
+import logging
+
+from selenium.common.exceptions import WebDriverException
+
+from config import Config
+from modules.scraper import get_driver
+from modules.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+class DriverManager:
+    """
+    폴링 주기 사이에 재사용되는 Chrome 세션 관리자
+    - 최초 사용 시에만 브라우저를 띄우고, 이후에는 같은 세션을 계속 사용
+    - 매 사용 전 헬스체크, 크래시 감지 시 자동 재실행
+    - Config.DRIVER_MAX_CYCLES 회 사용 후 주기적으로 재시작 (메모리 누수 방지)
+    """
+
+    def __init__(self, headless=None):
+        self.headless = headless
+        self.driver = None
+        self.cycles = 0
+
+    def is_alive(self):
+        if self.driver is None:
+            return False
+        try:
+            # 세션이 죽었거나 창이 닫혔으면 예외 발생
+            self.driver.execute_script("return document.readyState")
+            return bool(self.driver.window_handles)
+        except WebDriverException:
+            return False
+
+    def get(self):
+        """
+        정상 동작하는 드라이버를 반환합니다. (필요 시 새로 실행)
+        """
+        if Config.DRIVER_MAX_CYCLES and self.cycles >= Config.DRIVER_MAX_CYCLES:
+            logger.info(f"♻️ 브라우저 주기적 재시작 ({self.cycles}회 사용)")
+            metrics.inc("browser_restarts_total", reason="max_cycles")
+            self.quit()
+
+        if not self.is_alive():
+            if self.driver is not None:
+                logger.warning("⚠️ 브라우저 세션 이상 감지 → 재실행")
+                metrics.inc("browser_restarts_total", reason="unhealthy")
+                self.quit()
+            logger.info("🌐 브라우저 실행 중...")
+            with metrics.span("browser.launch"):
+                self.driver = get_driver(headless=self.headless)
+            self.cycles = 0
+
+        self.cycles += 1
+        return self.driver
+
+    def run(self, func, *args, **kwargs):
+        """
+        func(driver, *args, **kwargs) 를 실행합니다.
+        실행 중 브라우저가 죽으면 한 번 재실행한 뒤 다시 시도합니다.
+        """
+        try:
+            return func(self.get(), *args, **kwargs)
+        except WebDriverException as e:
+            if self.is_alive():
+                raise
+            logger.warning(f"⚠️ 브라우저 크래시 감지 ({e.__class__.__name__}) → 재실행 후 재시도")
+            metrics.inc("browser_restarts_total", reason="crash")
+            self.quit()
+            return func(self.get(), *args, **kwargs)
+
+    def quit(self):
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except Exception:
+                pass
+        self.driver = None
+        self.cycles = 0
@@ -0,0 +1,129 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+from config import Config
+from modules.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+def _sha256(*parts):
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(str(part).encode("utf-8"))
+        h.update(b"\x00")
+    return h.hexdigest()
+
+class ResultCache:
+    """
+    LLM 결과를 디스크(SQLite)에 저장하는 내용 기반 캐시
+    - 키: (입력 텍스트, 모델 이름, 에이전트 instructions 해시)
+    - instructions 가 바뀌면 해당 namespace 의 기존 항목은 자동 삭제
+    - TTL 만료 / 최대 항목 수 초과 시 오래 사용되지 않은 항목부터 삭제
+    """
+
+    def __init__(self, namespace, model, instructions, path=None, ttl_days=None, max_entries=None):
+        self.namespace = namespace
+        self.model = model
+        self.prompt_hash = _sha256(instructions)
+        self.path = path or Config.CACHE_PATH
+        self.ttl = (Config.CACHE_TTL_DAYS if ttl_days is None else ttl_days) * 86400
+        self.max_entries = Config.CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                namespace TEXT NOT NULL,
+                prompt_hash TEXT NOT NULL,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_accessed ON llm_cache (namespace, accessed_at)")
+        self._invalidate_stale_prompts()
+        self._evict()
+        self.conn.commit()
+
+    def make_key(self, text):
+        return _sha256(self.namespace, self.model, self.prompt_hash, text)
+
+    def get(self, text):
+        key = self.make_key(text)
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row and self.ttl and time.time() - row[1] > self.ttl:
+                self.conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self.conn.commit()
+                row = None
+
+            if not row:
+                self.misses += 1
+                metrics.inc("cache_requests_total", namespace=self.namespace, result="miss")
+                return None
+
+            self.conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self.conn.commit()
+            self.hits += 1
+            metrics.inc("cache_requests_total", namespace=self.namespace, result="hit")
+            return json.loads(row[0])
+
+    def set(self, text, value):
+        now = time.time()
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, namespace, prompt_hash, value, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (self.make_key(text), self.namespace, self.prompt_hash, json.dumps(value, ensure_ascii=False), now, now)
+            )
+            self._evict()
+            self.conn.commit()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "namespace": self.namespace,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+    def _invalidate_stale_prompts(self):
+        # 프롬프트(instructions) 변경 → 이전 프롬프트로 만든 결과는 더 이상 유효하지 않음
+        deleted = self.conn.execute(
+            "DELETE FROM llm_cache WHERE namespace = ? AND prompt_hash != ?",
+            (self.namespace, self.prompt_hash)
+        ).rowcount
+        if deleted:
+            logger.info(f"♻️ 프롬프트 변경 감지 → {self.namespace} 캐시 {deleted}개 삭제")
+
+    def _evict(self):
+        if self.ttl:
+            self.conn.execute(
+                "DELETE FROM llm_cache WHERE namespace = ? AND created_at < ?",
+                (self.namespace, time.time() - self.ttl)
+            )
+
+        if self.max_entries:
+            # 최대 항목 수 초과분은 가장 오래 사용되지 않은 항목부터 삭제 (LRU)
+            self.conn.execute(
+                """
+                DELETE FROM llm_cache WHERE key IN (
+                    SELECT key FROM llm_cache WHERE namespace = ?
+                    ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.namespace, self.max_entries)
+            )
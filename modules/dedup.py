@@ -0,0 +1,65 @@
+import re
+from array import array
+from bisect import bisect_left
+
+# https://truthsocial.com/@realDonaldTrump/115437640213385011
+# https://truthsocial.com/@realDonaldTrump/posts/115437640213385011
+_POST_URL_RE = re.compile(r"/(@[^/?#]+)/(?:posts/)?(\d+)")
+
+def post_id_from_url(url):
+    """
+    게시물 URL 에서 숫자 ID 를 추출합니다. (ID 는 시간순으로 증가)
+    """
+    match = _POST_URL_RE.search(url or "")
+    return int(match.group(2)) if match else None
+
+def account_from_url(url):
+    """
+    게시물/타임라인 URL 에서 계정 이름(@handle)을 추출합니다.
+    """
+    match = re.search(r"/(@[^/?#]+)", url or "")
+    return match.group(1) if match else None
+
+def timeline_url(source, base_url="https://truthsocial.com"):
+    """
+    "@handle" / "handle" / 타임라인 URL → 타임라인 URL
+    """
+    if source.startswith("http"):
+        return source.rstrip("/")
+    return f"{base_url.rstrip('/')}/@{source.lstrip('@')}"
+
+class PostIndex:
+    """
+    이미 수집한 게시물 ID 의 정렬된 배열 (게시물당 8바이트, 이진 탐색으로 조회)
+    - URL 문자열 전체를 set 으로 들고 있는 대신 숫자 ID 만 보관
+    - `url in index` / `post_id in index` 모두 지원
+    """
+
+    def __init__(self, post_ids=()):
+        self.ids = array("q", sorted(set(post_ids)))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, item):
+        post_id = item if isinstance(item, int) else post_id_from_url(item)
+        if post_id is None:
+            return False
+        i = bisect_left(self.ids, post_id)
+        return i < len(self.ids) and self.ids[i] == post_id
+
+    def max_id(self):
+        return self.ids[-1] if self.ids else None
+
+def passed_watermark(watermark, post_id, et_time):
+    """
+    게시물이 워터마크(마지막으로 수집한 가장 최신 게시물)보다 오래됐는지 확인합니다.
+    - ID 비교가 가능하면 ID 로, 아니면 ET 시간 문자열(YYYY-MM-DD HH:MM:SS)로 비교
+    """
+    if not watermark:
+        return False
+    if post_id is not None and watermark.get("post_id") is not None:
+        return post_id <= watermark["post_id"]
+    if et_time and et_time != "N/A" and watermark.get("time"):
+        return et_time < watermark["time"]
+    return False
@@ -0,0 +1,225 @@
+import csv
+import logging
+import os
+import re
+import string
+from collections import deque
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# 길이가 바뀌지 않는 소문자 변환 (ASCII 만) → 소문자 텍스트의 위치를 원문에 그대로 사용
+_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+# "Apple Inc. - Common Stock" → "Apple" (전체 상장 목록 파일의 정식 명칭 처리용)
+_SECURITY_SUFFIX_RE = re.compile(r"\s+-\s+.*$")
+_CORPORATE_SUFFIX_RE = re.compile(
+    r"[\s,]+(inc|incorporated|corp|corporation|co|company|ltd|limited|plc|llc|l\.p|lp|n\.v|s\.a|ag|se|"
+    r"holdings?|group|class [a-z]|common stock|ordinary shares|ads|adr)\.?$",
+    re.IGNORECASE
+)
+
+# 일반 단어와 겹치는 한 단어 회사명 (예: "the Dow", "Target") → 패턴에서 제외 (여러 단어 별칭은 사용)
+AMBIGUOUS_NAMES = {
+    "american", "arm", "block", "delta", "dow", "general", "snap", "southern", "strategy", "target", "united", "visa",
+}
+
+# reason 끝의 티커 목록 문장 (예: "... market. NVDA, TSM.")
+_TICKER_LIST_RE = re.compile(
+    r"(?:^|[.!?]\s+)(\$?[A-Z]{1,5}(?:[.-][A-Z]{1,2})?(?:\s*,\s*\$?[A-Z]{1,5}(?:[.-][A-Z]{1,2})?)*)\.?\s*$"
+)
+
+KIND_NAME = "name"
+KIND_PERSON = "person"
+KIND_TICKER = "ticker"
+
+def base_name(name):
+    """
+    정식 명칭에서 증권 설명/법인 접미사를 제거한 이름
+    """
+    name = _SECURITY_SUFFIX_RE.sub("", name.strip())
+    while True:
+        stripped = re.sub(r"(\s*&|\s+and)$", "", _CORPORATE_SUFFIX_RE.sub("", name).strip())
+        if stripped == name or len(stripped) < 2:
+            return name
+        name = stripped
+
+class Automaton:
+    """
+    Aho-Corasick 다중 패턴 매칭 (패턴 수와 무관하게 텍스트 길이에 비례하는 한 번의 순회)
+    add(pattern, value) 를 모두 호출한 뒤 build() 를 한 번 호출합니다.
+    """
+
+    def __init__(self):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [()]
+
+    def add(self, pattern, value):
+        node = 0
+        for ch in pattern:
+            nxt = self.goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[node][ch] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append(())
+            node = nxt
+        self.out[node] += (value,)
+
+    def build(self):
+        goto, fail, out = self.goto, self.fail, self.out
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in goto[node].items():
+                queue.append(nxt)
+                f = fail[node]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                out[nxt] += out[fail[nxt]]
+
+    def iter(self, text):
+        """
+        Yields: (끝 위치, value)
+        """
+        goto, fail, out = self.goto, self.fail, self.out
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for value in out[node]:
+                yield i + 1, value
+
+class EntityIndex:
+    """
+    상장 기업 목록 (회사명/별칭/CEO/티커) → 게시물/분석 근거에서 기업을 찾는 인덱스
+    - 회사명/별칭/인물: 대소문자 무시, 단어 경계 + 원문 첫 글자가 대문자인 경우만
+    - 티커: 원문이 대문자인 경우만, 본문에서는 $NVDA 형태 (캐시태그) 만 인정
+            bare_from 이후 구간 (예: reason 의 마지막 티커 문장) 에서는 NVDA 형태도 인정
+    - 겹치는 매칭은 가장 왼쪽 → 가장 긴 것 우선
+    """
+
+    def __init__(self, listings):
+        self.listings = {}
+        self.automaton = Automaton()
+        patterns = 0
+        for row in listings:
+            ticker = row["ticker"].strip().upper()
+            if not ticker:
+                continue
+            name = (row.get("name") or "").strip() or ticker
+            self.listings[ticker] = {"ticker": ticker, "name": name, "exchange": (row.get("exchange") or "").strip()}
+
+            terms = {(ticker, KIND_TICKER)}
+            for alias in [name] + _split(row.get("aliases")):
+                terms.add((alias, KIND_NAME))
+                terms.add((base_name(alias), KIND_NAME))
+            for person in _split(row.get("people")):
+                terms.add((person, KIND_PERSON))
+
+            for term, kind in terms:
+                if kind != KIND_TICKER and (len(term) < 2 or term.lower() in AMBIGUOUS_NAMES):
+                    continue
+                self.automaton.add(term.translate(_LOWER), (len(term), ticker, kind))
+                patterns += 1
+        self.automaton.build()
+        self.patterns = patterns
+
+    @classmethod
+    def load(cls, path):
+        """
+        CSV 컬럼: ticker, name, exchange, aliases, people (aliases/people 은 | 로 구분)
+        파일이 없으면 None
+        """
+        if not path or not os.path.exists(path):
+            logger.info(f"ℹ️ 상장 기업 목록 없음 ({path}) → 티커 확인은 reason 마지막 문장 형식으로만 판단")
+            return None
+        with open(path, encoding="utf-8-sig", newline="") as f:
+            index = cls(csv.DictReader(f))
+        logger.info(f"🏢 상장 기업 목록 로드: {len(index.listings)}개 기업 / {index.patterns}개 패턴")
+        return index
+
+    def extract(self, text, bare_from=None):
+        """
+        Returns: [{"ticker", "name", "kind", "match", "start", "end"}] (텍스트 순서)
+        bare_from: 이 위치 이후에서는 $ 없는 대문자 티커도 인정 (None 이면 캐시태그만)
+        """
+        if not text:
+            return []
+        candidates = []
+        for end, (length, ticker, kind) in self.automaton.iter(text.translate(_LOWER)):
+            start = end - length
+            if (start > 0 and text[start - 1].isalnum()) or (end < len(text) and text[end].isalnum()):
+                continue
+            matched = text[start:end]
+            if kind == KIND_TICKER:
+                cashtag = start > 0 and text[start - 1] == "$"
+                if not matched.isupper() or not (cashtag or (bare_from is not None and start >= bare_from)):
+                    continue
+            elif not matched[0].isupper():
+                continue
+            candidates.append((start, -length, ticker, kind, matched))
+
+        entities = []
+        last_end = 0
+        for start, neg_length, ticker, kind, matched in sorted(candidates):
+            if start < last_end:
+                continue
+            last_end = start - neg_length
+            entities.append({
+                "ticker": ticker, "name": self.listings[ticker]["name"], "kind": kind,
+                "match": matched, "start": start, "end": last_end,
+            })
+        return entities
+
+    def tickers(self, *entity_lists):
+        """
+        찾은 기업들의 티커 (처음 나온 순서, 중복 제거)
+        """
+        seen = []
+        for entities in entity_lists:
+            for entity in entities:
+                if entity["ticker"] not in seen:
+                    seen.append(entity["ticker"])
+        return seen
+
+    def is_listed(self, ticker):
+        return ticker.strip().lstrip("$").upper() in self.listings
+
+    def analyze(self, content, reason):
+        """
+        원문과 분석 근거에서 기업을 찾습니다.
+        reason 의 마지막 티커 목록 문장 (분석 에이전트가 티커를 적는 위치) 에서는 $ 없는 티커도 인정
+        Returns: (티커 목록, 기업명 목록)
+        """
+        reason = reason or ""
+        ticker_list = _TICKER_LIST_RE.search(reason)
+        found = self.extract(content) + self.extract(reason, bare_from=ticker_list.start(1) if ticker_list else None)
+        names = []
+        for entity in found:
+            if entity["name"] not in names:
+                names.append(entity["name"])
+        return self.tickers(found), names
+
+def _split(value):
+    if not value:
+        return []
+    return [part.strip() for part in str(value).split("|") if part.strip()]
+
+_index = None
+_loaded = False
+
+def get_index():
+    """
+    Config.LISTINGS_PATH 로 만든 프로세스 공용 인덱스 (최초 호출 시 로드, 파일이 없으면 None)
+    """
+    global _index, _loaded
+    if not _loaded:
+        _index = EntityIndex.load(Config.LISTINGS_PATH)
+        _loaded = True
+    return _index
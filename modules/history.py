@@ -0,0 +1,322 @@
+import json
+import logging
+import os
+import threading
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from config import Config
+from modules.dedup import account_from_url
+from modules.locks import file_lock
+from modules.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# 데이터셋별 컬럼 스키마
+SCHEMAS = {
+    "analysis": pa.schema([
+        ("url", pa.string()),
+        ("time", pa.timestamp("ns")),     # ET
+        ("time_str", pa.string()),        # 원본 표기 (KST 등)
+        ("content", pa.string()),         # 전처리된 본문
+        ("original_tweet", pa.string()),
+        ("impact_on_market", pa.string()),
+        ("sentiment_score", pa.float64()),
+        ("market_impact_score", pa.float64()),
+        ("keywords", pa.string()),
+        ("sector", pa.string()),
+        ("reason", pa.string()),
+        ("source", pa.string()),          # 수집한 계정 (@handle)
+    ]),
+    "scraped": pa.schema([
+        ("url", pa.string()),
+        ("time", pa.timestamp("ns")),     # ET
+        ("kst_time", pa.string()),
+        ("content", pa.string()),
+        ("source", pa.string()),
+    ]),
+}
+
+# 최초 생성에 사용하는 엑셀 (뒤쪽 파일이 같은 URL 의 최신 값)
+SOURCE_WORKBOOKS = {
+    "analysis": ["merged_all_excel.xlsx", "trump_posts_all_analyzed_final.xlsx", "trump_posts_AI_analysis.xlsx"],
+    "scraped": ["trump_posts_scraped.xlsx"],
+}
+
+# 로컬 저장소 테이블 / 분석 결과 행의 컬럼명 → 데이터셋 컬럼명
+RENAMES = {
+    "tweet_url": "url",
+    "tweet_content": "content",
+    "original_content": "original_tweet",
+}
+
+LOCAL_TABLES = {
+    "analysis": "analysis_results",
+    "scraped": "scraped_posts",
+}
+
+BASE_FILE = "000-base.parquet"
+ROW_GROUP_SIZE = 2048
+READ_ATTEMPTS = 3  # 읽는 중 다른 프로세스의 병합으로 파일이 바뀌면 재시도
+
+def _parse_time(series):
+    # "2025-11-28 16:18:00 EST" 처럼 시간대 표기가 붙은 값도 같은 ET 시각으로
+    text = series.astype("string").str.replace(r"\s+E[SD]T$", "", regex=True)
+    return pd.to_datetime(text, errors="coerce")
+
+def to_table(rows, dataset):
+    """
+    DataFrame 또는 행 목록 → 데이터셋 스키마의 Arrow 테이블
+    """
+    df = rows if isinstance(rows, pd.DataFrame) else pd.DataFrame(list(rows))
+    df = df.rename(columns={k: v for k, v in RENAMES.items() if k in df.columns and v not in df.columns})
+    if "original_tweet" not in df.columns and dataset == "analysis" and "content" in df.columns:
+        df["original_tweet"] = None
+    if "url" in df.columns:
+        # 엑셀 등 source 가 없는 행은 URL 의 계정으로
+        source = df["url"].map(lambda url: account_from_url(url) if isinstance(url, str) else None)
+        df["source"] = df["source"].fillna(source) if "source" in df.columns else source
+
+    schema = SCHEMAS[dataset]
+    columns = {}
+    for field in schema:
+        column = df[field.name] if field.name in df.columns else pd.Series([None] * len(df), index=df.index)
+        if pa.types.is_timestamp(field.type):
+            column = _parse_time(column)
+        elif pa.types.is_floating(field.type):
+            column = pd.to_numeric(column, errors="coerce")
+        else:
+            column = column.astype("string").str.strip() if field.name == "impact_on_market" else column.astype("string")
+        columns[field.name] = pa.array(column, type=field.type, from_pandas=True)
+    table = pa.table(columns, schema=schema)
+    return table.filter(pa.compute.invert(pa.compute.is_null(table["url"])))
+
+class HistoryStore:
+    """
+    분석/스크랩 이력의 컬럼형 (Parquet) 캐시
+    - 엑셀 (+ 로컬 SQLite) 에서 자동 생성, 원본 엑셀이 바뀌면 다시 생성
+    - 새 결과는 append() 로 작은 part 파일에 추가 → 일정 개수가 쌓이면 base 로 병합
+    - read(): 메모리 맵 + 필요한 컬럼만 + time/impact/score 조건은 row group 통계로 건너뜀 (predicate pushdown)
+    """
+
+    def __init__(self, path=None, local_store=None, compact_parts=None):
+        self.path = path or Config.HISTORY_PATH
+        self.local_store = local_store
+        self.compact_parts = compact_parts or Config.HISTORY_COMPACT_PARTS
+        self._lock = threading.Lock()
+        for dataset in SCHEMAS:
+            self._ensure(dataset)
+
+    def _dir(self, dataset):
+        return os.path.join(self.path, dataset)
+
+    def _parts(self, dataset):
+        directory = self._dir(dataset)
+        return sorted(name for name in os.listdir(directory) if name.endswith(".parquet"))
+
+    # ------------------------------------------------------------------
+    # 생성 / 동기화
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _sources_signature(dataset):
+        signature = {}
+        for workbook in SOURCE_WORKBOOKS[dataset]:
+            if os.path.exists(workbook):
+                stat = os.stat(workbook)
+                signature[workbook] = [stat.st_size, stat.st_mtime]
+        return signature
+
+    def _is_fresh(self, dataset, signature):
+        directory = self._dir(dataset)
+        manifest_path = os.path.join(directory, "_manifest.json")
+        if not (os.path.exists(os.path.join(directory, BASE_FILE)) and os.path.exists(manifest_path)):
+            return False
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        return manifest.get("sources") == signature and manifest.get("columns") == SCHEMAS[dataset].names
+
+    def _ensure(self, dataset):
+        signature = self._sources_signature(dataset)
+        if self._is_fresh(dataset, signature):
+            return
+        directory = self._dir(dataset)
+        os.makedirs(directory, exist_ok=True)
+        # 실시간 루프와 백필이 동시에 생성/병합하지 않도록 데이터셋 디렉터리를 잠금
+        with file_lock(directory):
+            if not self._is_fresh(dataset, signature):  # 기다리는 동안 다른 프로세스가 생성했으면 그대로 사용
+                self._build(dataset, signature)
+
+    @metrics.timed("history.build")
+    def _build(self, dataset, signature):
+        start = time.perf_counter()
+        tables = []
+        for workbook in SOURCE_WORKBOOKS[dataset]:
+            if os.path.exists(workbook):
+                try:
+                    tables.append(to_table(pd.read_excel(workbook), dataset))
+                except Exception as e:
+                    logger.warning(f"⚠️ 이력 캐시: 엑셀 읽기 오류 ({workbook}): {e}")
+        if self.local_store:
+            tables.append(to_table(self.local_store.read_table(LOCAL_TABLES[dataset]), dataset))
+
+        # 이전 part 파일 (엑셀에 없는 신규 결과) 도 유지
+        directory = self._dir(dataset)
+        parts = [name for name in self._parts(dataset) if name != BASE_FILE]
+        for name in parts:
+            tables.append(to_table(pq.read_table(os.path.join(directory, name)).to_pandas(), dataset))
+
+        table = pa.concat_tables(tables) if tables else SCHEMAS[dataset].empty_table()
+        self._write_base(dataset, table, parts)
+        with open(os.path.join(directory, "_manifest.json"), "w", encoding="utf-8") as f:
+            json.dump({"sources": signature, "columns": SCHEMAS[dataset].names, "built_at": time.time()}, f)
+        logger.info(f"🗂️ 이력 캐시 생성: {dataset} ({self.count(dataset)}개, {time.perf_counter() - start:.1f}초)")
+
+    def _write_base(self, dataset, table, merged_parts):
+        """
+        URL 중복 제거 (마지막 값 우선) + 시간순 정렬 후 base 파일 하나로 교체
+        merged_parts: table 에 합친 part 파일 (교체 후 삭제, 그 사이 다른 프로세스가 추가한 part 는 유지)
+        데이터셋 디렉터리 잠금 (file_lock) 안에서 호출
+        """
+        directory = self._dir(dataset)
+        df = table.to_pandas()
+        df = df.drop_duplicates("url", keep="last").sort_values("time", na_position="first", kind="stable")
+        table = pa.Table.from_pandas(df, schema=SCHEMAS[dataset], preserve_index=False)
+
+        # "_" 로 시작하는 파일은 읽기에서 제외됨, 프로세스별 이름 (잠금 없이 쓰던 이전 버전과도 겹치지 않도록)
+        tmp_path = os.path.join(directory, f"_{BASE_FILE}.{os.getpid()}.tmp")
+        pq.write_table(table, tmp_path, row_group_size=ROW_GROUP_SIZE)
+        os.replace(tmp_path, os.path.join(directory, BASE_FILE))
+        for name in merged_parts:
+            os.remove(os.path.join(directory, name))
+
+    @metrics.timed("history.append")
+    def append(self, dataset, rows):
+        """
+        새 결과를 part 파일로 추가합니다. (part 가 compact_parts 개를 넘으면 base 로 병합)
+        """
+        table = to_table(rows, dataset)
+        if not table.num_rows:
+            return 0
+        with self._lock:
+            name = f"part-{time.time_ns():020d}.parquet"
+            # 다 쓴 뒤에 이름을 바꿔 다른 프로세스의 읽기/병합이 쓰는 중인 파일을 보지 않도록
+            tmp_path = os.path.join(self._dir(dataset), f"_{name}.{os.getpid()}.tmp")
+            pq.write_table(table, tmp_path)
+            os.replace(tmp_path, os.path.join(self._dir(dataset), name))
+            if len(self._parts(dataset)) - 1 > self.compact_parts:
+                self.compact(dataset)
+        return table.num_rows
+
+    def compact(self, dataset):
+        directory = self._dir(dataset)
+        with file_lock(directory):
+            # 잠금을 기다리는 동안 다른 프로세스가 병합했을 수 있으므로 잠근 뒤에 목록을 다시 읽음
+            files = self._parts(dataset)
+            parts = [name for name in files if name != BASE_FILE]
+            if not parts:
+                return
+            table = pq.read_table([os.path.join(directory, name) for name in files], schema=SCHEMAS[dataset])
+            self._write_base(dataset, table, parts)
+        logger.debug(f"🗂️ 이력 캐시 병합: {dataset}")
+
+    # ------------------------------------------------------------------
+    # 읽기
+    # ------------------------------------------------------------------
+    @staticmethod
+    def filters(since=None, until=None, impact=None, min_score=None, max_score=None):
+        """
+        pyarrow 필터 (row group 통계로 건너뛸 수 있는 조건만)
+        impact: 'Direct' 또는 ['Direct', 'Indirect']
+        """
+        conditions = []
+        if since is not None:
+            conditions.append(("time", ">=", pd.Timestamp(since)))
+        if until is not None:
+            conditions.append(("time", "<", pd.Timestamp(until)))
+        if impact is not None:
+            conditions.append(("impact_on_market", "in", [impact] if isinstance(impact, str) else list(impact)))
+        if min_score is not None:
+            conditions.append(("market_impact_score", ">=", float(min_score)))
+        if max_score is not None:
+            conditions.append(("market_impact_score", "<=", float(max_score)))
+        return conditions or None
+
+    def read(self, dataset="analysis", columns=None, dedupe=True, **conditions):
+        """
+        Returns: pyarrow.Table
+        columns: 읽을 컬럼 (None 이면 전체)
+        dedupe: 같은 URL 이 base/part 에 모두 있으면 최신 값만 (url 컬럼을 함께 읽음)
+        conditions: filters() 인자 (since, until, impact, min_score, max_score)
+        중복 제거 후에 필터를 적용 (이전 값이 조건에 맞아 최신 값처럼 나오지 않도록)
+        - base 는 내부 중복이 없으므로 필터를 pushdown, part 는 전체를 읽어 중복 제거 후 필터
+        """
+        for attempt in range(READ_ATTEMPTS):
+            try:
+                return self._read(dataset, columns, dedupe, self.filters(**conditions))
+            except FileNotFoundError:
+                # 목록을 읽은 뒤 다른 프로세스가 part 를 병합 (삭제) → 목록부터 다시
+                if attempt == READ_ATTEMPTS - 1:
+                    raise
+
+    def _read(self, dataset, columns, dedupe, filters):
+        files = self._parts(dataset)
+        parts = [name for name in files if name != BASE_FILE]
+        with metrics.span("history.read", dataset=dataset):
+            if not dedupe or len(files) <= 1:
+                return pq.read_table(
+                    self._dir(dataset),
+                    columns=columns,
+                    filters=filters,
+                    schema=SCHEMAS[dataset],
+                    memory_map=True,
+                )
+
+            schema = SCHEMAS[dataset]
+            names = list(columns) if columns is not None else schema.names
+            filter_columns = [name for name, _, _ in filters or []]
+            part_columns = list(dict.fromkeys(names + ["url"] + filter_columns))
+
+            latest = pq.read_table(
+                [os.path.join(self._dir(dataset), name) for name in parts],
+                columns=part_columns,
+                schema=schema,
+                memory_map=True,
+            )
+            keep = latest.select(["url"]).to_pandas().reset_index()
+            keep = keep.drop_duplicates("url", keep="last")["index"].sort_values()
+            latest = latest.take(pa.array(keep.to_numpy()))
+
+            tables = []
+            if BASE_FILE in files:
+                base = pq.read_table(
+                    os.path.join(self._dir(dataset), BASE_FILE),
+                    columns=list(dict.fromkeys(names + ["url"])),
+                    filters=filters,
+                    schema=schema,
+                    memory_map=True,
+                )
+                base = base.filter(pc.invert(pc.is_in(base["url"], value_set=latest["url"])))
+                tables.append(base.select(names))
+            if filters:
+                latest = latest.filter(pq.filters_to_expression(filters))
+            tables.append(latest.select(names))
+        return pa.concat_tables(tables)
+
+    def query(self, dataset="analysis", columns=None, **conditions):
+        """
+        read() 결과를 DataFrame 으로
+        """
+        return self.read(dataset, columns, **conditions).to_pandas()
+
+    def urls(self, dataset="scraped"):
+        """
+        URL 컬럼만 읽어서 중복 판정용 집합으로
+        """
+        return set(self.read(dataset, ["url"], dedupe=False).column("url").to_pylist())
+
+    def count(self, dataset="analysis"):
+        return sum(pq.ParquetFile(os.path.join(self._dir(dataset), name)).metadata.num_rows for name in self._parts(dataset))
@@ -0,0 +1,187 @@
+import inspect
+import logging
+from datetime import datetime
+
+import httpx
+import pytz
+
+from config import Config
+from modules.dedup import passed_watermark, post_id_from_url
+from modules.scraper import kst_to_et
+from modules.metrics import metrics
+from modules.parsers import content_text, get_pool
+
+logger = logging.getLogger(__name__)
+
+KST = pytz.timezone("Asia/Seoul")
+
+class FetchError(Exception):
+    pass
+
+def _kst_title(created_at):
+    """
+    API 의 created_at (ISO 8601, UTC) → 웹 타임라인 <time title> 과 같은 형식의 KST 문자열
+    예: "Jan 20, 2025, 02:30 AM"
+    """
+    dt = pytz.utc.localize(datetime.strptime(created_at[:19], "%Y-%m-%dT%H:%M:%S"))
+    return dt.astimezone(KST).strftime("%b %d, %Y, %I:%M %p")
+
+def status_to_post(status, text=None):
+    """
+    API status → Selenium 경로와 같은 게시물 dict (time, kst_time, content, url)
+    text: 미리 추출한 본문 텍스트 (없으면 여기서 status["content"] HTML 을 파싱)
+    ReTruth(reblog) 이거나 본문이 비어 있으면 None
+    """
+    if status.get("reblog"):
+        return None
+
+    if text is None:
+        text = content_text(status.get("content") or "")
+    text = text.strip()
+    if not text:
+        return None
+
+    timestamp_raw = _kst_title(status["created_at"]) if status.get("created_at") else "N/A"
+    return {
+        "time": kst_to_et(timestamp_raw) if timestamp_raw != "N/A" else "N/A",
+        "kst_time": timestamp_raw,
+        "content": text,
+        "url": status.get("url"),
+    }
+
+class HttpTimelineFetcher:
+    """
+    브라우저 없이 타임라인 JSON API 로 게시물을 수집하는 백엔드
+    - 하나의 httpx.AsyncClient 로 연결 재사용 (keep-alive)
+    - max_id 커서로 페이지네이션
+    - collect_new_posts / probe_top_post 는 Selenium 경로와 같은 게시물 dict / 종료 조건 사용
+    """
+
+    def __init__(self, base_url=None, page_size=None, timeout=None):
+        self.base_url = (base_url or Config.HTTP_SCRAPER_BASE_URL).rstrip("/")
+        self.page_size = page_size or Config.HTTP_SCRAPER_PAGE_SIZE
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers={
+                "Accept": "application/json",
+                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/142.0.7444.163 Safari/537.36",
+            },
+            timeout=timeout or Config.HTTP_SCRAPER_TIMEOUT,
+            limits=httpx.Limits(max_keepalive_connections=4, max_connections=8),
+        )
+        self._account_ids = {}
+
+    async def close(self):
+        await self.client.aclose()
+
+    async def _get_json(self, path, params=None):
+        try:
+            with metrics.span("scrape.http_request"):
+                response = await self.client.get(path, params=params)
+        except httpx.HTTPError as e:
+            raise FetchError(f"{e.__class__.__name__}: {e}")
+        if response.status_code != 200:
+            raise FetchError(f"HTTP {response.status_code}: {path}")
+        try:
+            return response.json()
+        except ValueError:
+            raise FetchError(f"JSON 이 아닌 응답: {path}")
+
+    async def account_id(self, handle):
+        handle = handle.lstrip("@")
+        if handle not in self._account_ids:
+            account = await self._get_json("/api/v1/accounts/lookup", {"acct": handle})
+            self._account_ids[handle] = account["id"]
+        return self._account_ids[handle]
+
+    async def iter_statuses(self, handle, max_pages=None):
+        """
+        최신 게시물부터 페이지 단위로 status 를 가져옵니다. (max_id 커서)
+        Yields: (status, 본문 텍스트) - 본문 HTML 은 페이지 단위로 파서 프로세스에서 추출
+        """
+        account_id = await self.account_id(handle)
+        params = {"limit": self.page_size, "exclude_replies": "true"}
+        max_pages = max_pages or Config.HTTP_SCRAPER_MAX_PAGES
+
+        for _ in range(max_pages):
+            statuses = await self._get_json(f"/api/v1/accounts/{account_id}/statuses", params)
+            if not statuses:
+                return
+            texts = await get_pool().content_texts([status.get("content") or "" for status in statuses])
+            for status, text in zip(statuses, texts):
+                yield status, text
+            params = dict(params, max_id=statuses[-1]["id"])
+
+    @metrics.timed("scrape.probe", backend="http")
+    async def probe_top_post(self, existing_urls, watermark=None, handle=None):
+        """
+        첫 페이지의 최신 게시물 1개만 확인하는 가벼운 변경 감지 (Selenium probe_top_post 와 동일한 의미)
+        """
+        handle = handle or Config.TRUTH_SOCIAL_URL.rstrip("/").rsplit("/", 1)[-1]
+        account_id = await self.account_id(handle)
+        statuses = await self._get_json(
+            f"/api/v1/accounts/{account_id}/statuses", {"limit": 5, "exclude_replies": "true"}
+        )
+        for status in statuses:
+            # 고정 게시물/리트루스는 최신 게시물 판단에 쓸 수 없음
+            if status.get("pinned") or status.get("reblog") or not status.get("url"):
+                continue
+
+            top_url = status["url"]
+            et_time = kst_to_et(_kst_title(status["created_at"])) if status.get("created_at") else "N/A"
+            known = top_url in existing_urls or passed_watermark(watermark, post_id_from_url(top_url), et_time)
+            return not known
+
+        # 판단할 수 있는 게시물이 없으면 전체 수집으로 확인
+        return True
+
+    @metrics.timed("scrape.collect", backend="http")
+    async def collect_new_posts(self, existing_urls, max_count=450, watermark=None, on_post=None, handle=None, max_pages=None):
+        """
+        Selenium collect_new_posts 와 같은 종료 조건으로 신규 게시물을 수집합니다.
+        on_post 는 일반 함수 또는 코루틴 함수 모두 가능
+        max_pages: 최대 페이지 수 (기본 Config.HTTP_SCRAPER_MAX_PAGES, 백필 시 더 깊게)
+        """
+        handle = handle or Config.TRUTH_SOCIAL_URL.rstrip("/").rsplit("/", 1)[-1]
+        collected = []
+        seen_urls = set()
+
+        async for status, text in self.iter_statuses(handle, max_pages):
+            # 리트루스 제외
+            if status.get("reblog"):
+                continue
+
+            url = status.get("url")
+            if not url or url in seen_urls:
+                continue
+            seen_urls.add(url)
+
+            # 이미 수집한 게시물 → 종료 조건
+            if url in existing_urls:
+                if status.get("pinned"):
+                    # 상단 고정 게시물은 시간 순서와 무관 → 건너뛰기만
+                    continue
+                logger.info("🎯 기존 데이터 도달 → 수집 종료")
+                return collected
+
+            post = status_to_post(status, text)
+            if post is None:
+                continue
+            post["source"] = "@" + handle.lstrip("@")
+
+            if not status.get("pinned") and passed_watermark(watermark, post_id_from_url(url), post["time"]):
+                logger.info("🎯 워터마크 통과 → 수집 종료")
+                return collected
+
+            collected.append(post)
+            logger.debug(f"[수집] {len(collected)}개 URL 확보 (HTTP)")
+            metrics.inc("posts_collected_total", backend="http")
+            if on_post:
+                result = on_post(post)
+                if inspect.isawaitable(result):
+                    await result
+
+            if len(collected) >= max_count:
+                return collected
+
+        return collected
@@ -0,0 +1,224 @@
+import os
+import logging
+import sqlite3
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+from config import Config
+from modules.dedup import PostIndex, account_from_url, post_id_from_url
+from modules.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# 테이블별 컬럼 정의 (첫 번째 컬럼이 URL 고유 키)
+RAW_COLUMNS = ["url", "time", "kst_time", "content", "source"]
+ANALYSIS_COLUMNS = [
+    "tweet_url", "time", "time_str", "tweet_content", "original_content",
+    "impact_on_market", "sentiment_score", "market_impact_score",
+    "keywords", "sector", "reason", "source",
+]
+
+TABLES = {
+    "scraped_posts": RAW_COLUMNS,
+    "analysis_results": ANALYSIS_COLUMNS,
+}
+
+# 기존 엑셀 캐시 (최초 1회 가져오기 / 내보내기 기본 경로)
+LEGACY_WORKBOOKS = {
+    "scraped_posts": "trump_posts_scraped.xlsx",
+    "analysis_results": "trump_posts_AI_analysis.xlsx",
+}
+
+def _to_sql_value(value):
+    if value is None or (not isinstance(value, (list, tuple, dict)) and pd.isna(value)):
+        return None
+    if isinstance(value, (str, int, float)):
+        return value
+    if hasattr(value, "item"):
+        # numpy 스칼라 → 파이썬 기본 타입
+        return value.item()
+    return str(value)
+
+class LocalStore:
+    """
+    스크래퍼 캐시와 분석 결과 백업을 위한 로컬 SQLite 저장소 (append-only)
+    - URL 고유 인덱스로 중복 제거 → 사이클당 비용은 신규 행 수에만 비례
+    - 최초 생성 시 기존 엑셀 파일을 한 번만 가져옴
+    - 엑셀은 export_to_excel() 로 필요할 때만 생성
+    """
+
+    def __init__(self, path=None):
+        self.path = path or Config.LOCAL_DB_PATH
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+
+        for table, columns in TABLES.items():
+            key, rest = columns[0], columns[1:]
+            created = not self._table_exists(table)
+            self.conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                f"{key} TEXT PRIMARY KEY, "
+                + "".join(f"{col}, " for col in rest)
+                + "saved_at TEXT)"
+            )
+            if created:
+                self._import_legacy_workbook(table)
+            else:
+                # 이전 버전 DB 에 없는 컬럼 추가 (예: source)
+                existing = {row[1] for row in self.conn.execute(f"PRAGMA table_info({table})")}
+                for col in rest:
+                    if col not in existing:
+                        self.conn.execute(f"ALTER TABLE {table} ADD COLUMN {col}")
+
+        # 스크래퍼 중복 판정용: 수집한 게시물 ID 인덱스 + 계정별 워터마크
+        self.conn.execute("CREATE TABLE IF NOT EXISTS post_ids (post_id INTEGER PRIMARY KEY, account TEXT)")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS watermarks ("
+            "account TEXT PRIMARY KEY, post_id INTEGER, time TEXT, url TEXT, updated_at TEXT)"
+        )
+        if not self.conn.execute("SELECT 1 FROM post_ids LIMIT 1").fetchone():
+            self._index_posts(
+                [{"url": url, "time": t} for url, t in self.conn.execute("SELECT url, time FROM scraped_posts")]
+            )
+        self.conn.commit()
+
+    def _table_exists(self, table):
+        row = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+        ).fetchone()
+        return row is not None
+
+    def _import_legacy_workbook(self, table):
+        workbook = LEGACY_WORKBOOKS.get(table)
+        if not workbook or not os.path.exists(workbook):
+            return
+        try:
+            df = pd.read_excel(workbook)
+            # 엑셀은 최신 행이 위쪽 → 오래된 행부터 넣어야 최신 값이 남음
+            rows = df.iloc[::-1].to_dict("records")
+            self._upsert(table, rows)
+            logger.info(f"📥 기존 엑셀 가져오기 완료: {workbook} → {table} ({len(rows)}개)")
+        except Exception as e:
+            logger.warning(f"⚠️ 기존 엑셀 가져오기 오류 ({workbook}): {e}")
+
+    def _upsert(self, table, rows):
+        columns = TABLES[table]
+        saved_at = datetime.now().isoformat()
+        values = []
+        for row in rows:
+            key = _to_sql_value(row.get(columns[0]))
+            if key is None:
+                continue
+            values.append(
+                [str(key)]
+                + [_to_sql_value(row.get(col)) for col in columns[1:]]
+                + [saved_at]
+            )
+
+        placeholders = ", ".join("?" for _ in range(len(columns) + 1))
+        with self._lock:
+            # 같은 URL 이면 새 값으로 교체 (기존 엑셀의 keep='first' 와 동일)
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}, saved_at) VALUES ({placeholders})",
+                values
+            )
+            self.conn.commit()
+        return len(values)
+
+    def append_raw_posts(self, posts):
+        count = self._upsert("scraped_posts", posts)
+        with self._lock:
+            self._index_posts(posts)
+            self.conn.commit()
+        return count
+
+    def _index_posts(self, posts):
+        """
+        게시물 ID 를 인덱스에 추가하고 계정별 워터마크(가장 최신 게시물)를 전진시킵니다.
+        """
+        newest = {}
+        rows = []
+        for post in posts:
+            url = post.get("url")
+            post_id = post_id_from_url(url)
+            if post_id is None:
+                continue
+            account = account_from_url(url)
+            rows.append((post_id, account))
+            if account not in newest or post_id > newest[account][0]:
+                newest[account] = (post_id, _to_sql_value(post.get("time")), url)
+
+        self.conn.executemany("INSERT OR IGNORE INTO post_ids (post_id, account) VALUES (?, ?)", rows)
+
+        now = datetime.now().isoformat()
+        for account, (post_id, post_time, url) in newest.items():
+            # 더 최신 게시물일 때만 갱신 (오래된 게시물 백필로 워터마크가 뒤로 가지 않도록)
+            self.conn.execute(
+                """
+                INSERT INTO watermarks (account, post_id, time, url, updated_at) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(account) DO UPDATE SET
+                    post_id = excluded.post_id, time = excluded.time,
+                    url = excluded.url, updated_at = excluded.updated_at
+                WHERE excluded.post_id > watermarks.post_id
+                """,
+                (account, post_id, post_time, url, now)
+            )
+
+    def load_post_index(self):
+        """
+        수집한 게시물 ID 의 정렬 배열을 불러옵니다. (기본 키 순서로 읽어 이미 정렬된 상태)
+        """
+        with self._lock:
+            return PostIndex(row[0] for row in self.conn.execute("SELECT post_id FROM post_ids ORDER BY post_id"))
+
+    def get_watermark(self, account):
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT post_id, time, url FROM watermarks WHERE account = ?", (account,)
+            ).fetchone()
+        if not row:
+            return None
+        return {"post_id": row[0], "time": row[1], "url": row[2]}
+
+    def append_analysis_results(self, results):
+        return self._upsert("analysis_results", results)
+
+    def get_urls(self, table="scraped_posts"):
+        key = TABLES[table][0]
+        with self._lock:
+            return {row[0] for row in self.conn.execute(f"SELECT {key} FROM {table}")}
+
+    def get_post_times(self, since=None):
+        """
+        스크랩한 게시물의 게시 시각(ET 문자열) 목록 (폴링 스케줄러용)
+        """
+        query = "SELECT time FROM scraped_posts WHERE time IS NOT NULL AND time != 'N/A'"
+        params = ()
+        if since:
+            query += " AND time >= ?"
+            params = (since,)
+        with self._lock:
+            return [row[0] for row in self.conn.execute(query, params)]
+
+    def read_table(self, table):
+        """
+        테이블 전체를 DataFrame 으로 반환합니다. (최신 행이 위쪽, 엑셀과 동일한 순서)
+        """
+        with self._lock:
+            return pd.read_sql_query(
+                f"SELECT {', '.join(TABLES[table])} FROM {table} ORDER BY rowid DESC", self.conn
+            )
+
+    def export_to_excel(self, table, path=None):
+        """
+        요청 시에만 엑셀 파일을 생성합니다.
+        """
+        path = path or LEGACY_WORKBOOKS[table]
+        df = self.read_table(table)
+        df.to_excel(path, index=False, engine='openpyxl')
+        logger.info(f"✅ 엑셀 내보내기 완료: {path} ({len(df)}개)")
+        return path
@@ -0,0 +1,99 @@
+import os
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+try:
+    import msvcrt
+except ImportError:  # POSIX
+    msvcrt = None
+
+# 프로세스 간 잠금 사용 가능 여부 (POSIX: fcntl.flock, Windows: msvcrt.locking)
+AVAILABLE = fcntl is not None or msvcrt is not None
+
+# 디렉터리를 잠글 때 그 안에 만드는 잠금 파일 ("_" 로 시작 → 이력 캐시 읽기에서 제외)
+DIR_LOCK_FILE = "_lock"
+
+def _open(path):
+    if os.path.isdir(path):
+        path = os.path.join(path, DIR_LOCK_FILE)
+    return os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+
+def _try_lock(fd):
+    """
+    대기하지 않고 배타 잠금 (잡았으면 True)
+    """
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            # 첫 1바이트 영역 잠금 (파일 크기와 무관)
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+    except OSError:
+        return False
+    return True
+
+def _unlock(fd):
+    if fcntl is None:
+        try:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        except OSError:
+            pass
+    os.close(fd)  # flock 은 닫으면 풀림
+
+@contextmanager
+def file_lock(path, poll=0.05):
+    """
+    프로세스 간 배타 잠금, 다른 프로세스가 잡고 있으면 풀릴 때까지 대기
+    path 가 디렉터리면 그 안의 잠금 파일을 사용
+    """
+    if not AVAILABLE:
+        yield
+        return
+    fd = _open(path)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        else:
+            while not _try_lock(fd):
+                time.sleep(poll)
+    except BaseException:
+        os.close(fd)
+        raise
+    try:
+        yield
+    finally:
+        _unlock(fd)
+
+def acquire(path):
+    """
+    대기하지 않고 배타 잠금을 잡습니다. (프로세스가 끝날 때까지 유지할 때)
+    Returns: release() 에 넘길 값, 다른 프로세스가 잡고 있으면 None
+    """
+    if not AVAILABLE:
+        return -1
+    fd = _open(path)
+    if not _try_lock(fd):
+        os.close(fd)
+        return None
+    return fd
+
+def release(fd):
+    if fd is not None and fd >= 0:
+        _unlock(fd)
+
+def is_locked(path):
+    """
+    다른 프로세스가 path 의 잠금을 잡고 있는지 (파일이 없으면 False)
+    """
+    if not AVAILABLE or not os.path.exists(path):
+        return False
+    fd = acquire(path)
+    release(fd)
+    return fd is None
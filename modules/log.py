@@ -0,0 +1,51 @@
+import json
+import logging
+import sys
+from datetime import datetime
+
+from config import Config
+
+# LogRecord 기본 속성 (extra 로 넘긴 필드만 골라내기 위해 사용)
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+class JsonFormatter(logging.Formatter):
+    """
+    한 줄에 JSON 하나 (time, level, logger, message + extra 필드)
+    """
+
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+def setup_logging(level=None, fmt=None):
+    """
+    루트 로거 설정
+    - level: Config.LOG_LEVEL (DEBUG | INFO | WARNING | ERROR)
+    - fmt: Config.LOG_FORMAT ("text" | "json")
+    """
+    level = (level or Config.LOG_LEVEL).upper()
+    fmt = fmt or Config.LOG_FORMAT
+
+    handler = logging.StreamHandler(sys.stdout)
+    if fmt == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)-7s %(name)s | %(message)s", "%H:%M:%S"))
+
+    root = logging.getLogger()
+    root.handlers[:] = [handler]
+    root.setLevel(level)
+
+    # 외부 라이브러리의 요청 단위 로그는 경고 이상만
+    for name in ("httpx", "httpcore", "openai", "urllib3", "selenium", "WDM"):
+        logging.getLogger(name).setLevel(max(logging.WARNING, root.level))
@@ -0,0 +1,233 @@
+import asyncio
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# 지연 시간 히스토그램 버킷 (초)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+PROMETHEUS_PREFIX = "trump_agent_"
+
+def _key(name, labels):
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (
+        '{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in pairs
+    )
+    return "{" + ",".join(escaped) + "}"
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # 마지막 칸은 +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for le, count in zip(list(self.buckets) + ["+Inf"], self.counts):
+            total += count
+            yield le, total
+
+class Metrics:
+    """
+    프로세스 내 지표 저장소 (카운터 / 게이지 / 히스토그램)
+    - span(): 구간 소요 시간 → span_seconds 히스토그램, 예외 → errors_total
+    - 사이클별 구간 누적 시간으로 느린 사이클의 원인(스크롤/파싱/LLM/Supabase)을 요약
+    - export(): Prometheus textfile 또는 JSON lines 로 내보내기
+    스크래퍼 스레드와 이벤트 루프에서 동시에 기록하므로 잠금으로 보호합니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = defaultdict(float)
+        self.gauges = {}
+        self.histograms = {}
+        self.cycle = defaultdict(float)
+
+    def inc(self, name, value=1, **labels):
+        with self._lock:
+            self.counters[_key(name, labels)] += value
+
+    def gauge(self, name, value, **labels):
+        with self._lock:
+            self.gauges[_key(name, labels)] = value
+
+    def observe(self, name, value, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+
+    @contextmanager
+    def span(self, name, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.inc("errors_total", span=name, **labels)
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            self.observe("span_seconds", elapsed, span=name, **labels)
+            with self._lock:
+                self.cycle[name] += elapsed
+            logger.debug(
+                f"⏱️ {name}: {elapsed * 1000:.1f}ms",
+                extra={"span": name, "duration_ms": round(elapsed * 1000, 1), **labels}
+            )
+
+    def timed(self, name, **labels):
+        """
+        함수/코루틴 함수 전체를 span 으로 기록하는 데코레이터
+        """
+        def decorator(func):
+            if asyncio.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    with self.span(name, **labels):
+                        return await func(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(name, **labels):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def total(self, name, **labels):
+        """
+        이름이 name 이고 labels 를 모두 포함하는 카운터 값의 합계
+        """
+        wanted = set(_key(name, labels)[1])
+        with self._lock:
+            return sum(
+                value for (counter, counter_labels), value in self.counters.items()
+                if counter == name and wanted <= set(counter_labels)
+            )
+
+    def record_usage(self, agent, result):
+        """
+        Runner.run 결과의 토큰 사용량 (result.context_wrapper.usage)
+        """
+        usage = getattr(getattr(result, "context_wrapper", None), "usage", None)
+        self.inc("llm_requests_total", getattr(usage, "requests", 0) or 1, agent=agent)
+        if usage is None:
+            return
+        self.inc("llm_tokens_total", getattr(usage, "input_tokens", 0) or 0, agent=agent, type="input")
+        self.inc("llm_tokens_total", getattr(usage, "output_tokens", 0) or 0, agent=agent, type="output")
+
+    # ------------------------------------------------------------------
+    # 사이클 요약
+    # ------------------------------------------------------------------
+    def start_cycle(self):
+        with self._lock:
+            self.cycle.clear()
+
+    def cycle_summary(self):
+        """
+        이번 사이클의 구간별 누적 시간 (초, 큰 순서)
+        동시에 실행된 구간(분석 워커 등)은 각각 더하므로 합계가 사이클 시간보다 클 수 있음
+        """
+        with self._lock:
+            return dict(sorted(self.cycle.items(), key=lambda item: item[1], reverse=True))
+
+    # ------------------------------------------------------------------
+    # Export
+    # ------------------------------------------------------------------
+    def snapshot(self):
+        with self._lock:
+            return {
+                "time": datetime.now().isoformat(timespec="seconds"),
+                "counters": [
+                    {"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in self.counters.items()
+                ],
+                "gauges": [
+                    {"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in self.gauges.items()
+                ],
+                "histograms": [
+                    {
+                        "name": name, "labels": dict(labels), "count": h.count, "sum": round(h.sum, 6),
+                        "buckets": {str(le): count for le, count in h.cumulative()},
+                    }
+                    for (name, labels), h in self.histograms.items()
+                ],
+                "cycle": {name: round(seconds, 6) for name, seconds in self.cycle.items()},
+            }
+
+    def to_prometheus(self):
+        lines = []
+        with self._lock:
+            for kind, series in (("counter", self.counters), ("gauge", self.gauges)):
+                for name in sorted({name for name, _ in series}):
+                    lines.append(f"# TYPE {PROMETHEUS_PREFIX}{name} {kind}")
+                    for (metric, labels), value in sorted(series.items()):
+                        if metric == name:
+                            lines.append(f"{PROMETHEUS_PREFIX}{name}{_format_labels(labels)} {value}")
+
+            for name in sorted({name for name, _ in self.histograms}):
+                lines.append(f"# TYPE {PROMETHEUS_PREFIX}{name} histogram")
+                for (metric, labels), h in sorted(self.histograms.items(), key=lambda item: item[0]):
+                    if metric != name:
+                        continue
+                    for le, count in h.cumulative():
+                        lines.append(f"{PROMETHEUS_PREFIX}{name}_bucket{_format_labels(labels, [('le', le)])} {count}")
+                    lines.append(f"{PROMETHEUS_PREFIX}{name}_sum{_format_labels(labels)} {h.sum}")
+                    lines.append(f"{PROMETHEUS_PREFIX}{name}_count{_format_labels(labels)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, fmt=None, path=None):
+        """
+        fmt: Config.METRICS_EXPORT ("prometheus" | "jsonl" | "none")
+        - prometheus: node_exporter textfile collector 용 파일을 원자적으로 교체
+        - jsonl: 호출할 때마다 스냅샷 한 줄 추가
+        """
+        fmt = fmt or Config.METRICS_EXPORT
+        if fmt not in ("prometheus", "jsonl"):
+            return None
+        path = path or Config.METRICS_PATH or ("metrics.prom" if fmt == "prometheus" else "metrics.jsonl")
+
+        try:
+            if fmt == "prometheus":
+                tmp_path = path + ".tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.write(self.to_prometheus())
+                os.replace(tmp_path, path)
+            else:
+                with open(path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(self.snapshot(), ensure_ascii=False, default=str) + "\n")
+        except OSError as e:
+            logger.warning(f"⚠️ 지표 내보내기 오류 ({path}): {e}")
+            return None
+        return path
+
+# 프로세스 전체에서 공유하는 지표 저장소
+metrics = Metrics()
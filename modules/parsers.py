@@ -0,0 +1,349 @@
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from bs4 import BeautifulSoup
+
+from config import Config
+from modules.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# 빠른 순서 (auto 일 때 설치된 것 중 첫 번째 사용)
+BACKENDS = ("selectolax", "lxml", "bs4")
+
+# 타임라인 레코드 추출 규칙 (모든 백엔드 공통, 페이지 내 스크립트 EXTRACT_NEW_POSTS_JS 와 동일)
+# - 게시물 본문: div[data-testid="status-content"]
+# - 게시물 노드: 본문의 가장 가까운 상위 div[data-index]
+# - 시간/링크: 게시물 노드의 첫 <time> 과 그 상위 a[href]
+# - 상태 표시: 게시물 노드의 첫 div[role="status-info"] (ReTruthed / Pinned)
+# - 본문 텍스트: 공백을 제거한 텍스트 조각을 이어 붙이고, <br> 은 줄바꿈으로 변환
+
+def _record(index, href, title, status_text, text):
+    return {
+        "index": index,
+        "href": href,
+        "title": title,
+        "retruthed": status_text is not None and "ReTruthed" in status_text,
+        "pinned": status_text is not None and "Pinned" in status_text,
+        "text": text,
+    }
+
+# ----------------------------------------------------------------------
+# bs4 (html.parser, 기준 구현)
+# ----------------------------------------------------------------------
+def node_text(node):
+    """
+    본문 텍스트: 공백을 제거한 텍스트 조각을 이어 붙이고, <br> 은 줄바꿈으로 변환
+    """
+    text_parts = []
+    for elem in node.descendants:
+        if getattr(elem, "name", None) == "br":
+            text_parts.append("\n")
+        elif isinstance(elem, str):
+            t = elem.strip()
+            if t:
+                text_parts.append(t)
+    return "".join(text_parts)
+
+def _bs4_records(html, seen_indices):
+    soup = BeautifulSoup(html, "html.parser")
+    records = []
+    claimed = set()
+
+    for post in soup.find_all("div", attrs={"data-testid": "status-content"}):
+        parent = post.find_parent("div", attrs={"data-index": True})
+        if not parent:
+            continue
+
+        index = parent["data-index"]
+        if index in seen_indices or index in claimed:
+            continue
+        claimed.add(index)
+
+        time_tag = parent.find("time")
+
+        href = None
+        if time_tag:
+            a = time_tag.find_parent("a", href=True)
+            if a:
+                href = a["href"]
+
+        status_info = parent.find("div", role="status-info")
+
+        records.append(_record(
+            index,
+            href,
+            time_tag['title'] if time_tag and time_tag.has_attr('title') else None,
+            status_info.get_text(strip=True) if status_info else None,
+            node_text(post),
+        ))
+
+    return records
+
+def _bs4_text(fragment):
+    return node_text(BeautifulSoup(fragment, "html.parser"))
+
+# ----------------------------------------------------------------------
+# lxml (libxml2, XPath)
+# ----------------------------------------------------------------------
+def _lxml_text(node, comments=True):
+    from lxml import etree
+
+    parts = []
+
+    def add(text):
+        t = text.strip()
+        if t:
+            parts.append(t)
+
+    def walk(element):
+        if element.text:
+            add(element.text)
+        for child in element:
+            if child.tag == "br":
+                parts.append("\n")
+            elif isinstance(child.tag, str):
+                walk(child)
+            elif child.tag is etree.Comment and comments and child.text:
+                add(child.text)
+            if child.tail:
+                add(child.tail)
+
+    walk(node)
+    return "".join(parts)
+
+def _lxml_records(html, seen_indices):
+    from lxml import html as lxml_html
+
+    if not html or not html.strip():
+        return []
+    root = lxml_html.document_fromstring(html)
+    records = []
+    claimed = set()
+
+    for post in root.iterfind('.//div[@data-testid="status-content"]'):
+        parent = post.xpath("ancestor::div[@data-index][1]")
+        if not parent:
+            continue
+        parent = parent[0]
+
+        index = parent.get("data-index")
+        if index in seen_indices or index in claimed:
+            continue
+        claimed.add(index)
+
+        time_tag = parent.find(".//time")
+        href = None
+        if time_tag is not None:
+            a = time_tag.xpath("ancestor::a[@href][1]")
+            if a:
+                href = a[0].get("href")
+
+        status_info = parent.find('.//div[@role="status-info"]')
+
+        records.append(_record(
+            index,
+            href,
+            time_tag.get("title") if time_tag is not None else None,
+            _lxml_text(status_info, comments=False) if status_info is not None else None,
+            _lxml_text(post),
+        ))
+
+    return records
+
+def _lxml_text_fragment(fragment):
+    from lxml import html as lxml_html
+
+    if not fragment or not fragment.strip():
+        return ""
+    return _lxml_text(lxml_html.fragment_fromstring(fragment, create_parent="div"))
+
+# ----------------------------------------------------------------------
+# selectolax (lexbor, CSS 선택자)
+# ----------------------------------------------------------------------
+def _lexbor_text(node, comments=True):
+    parts = []
+    for elem in node.traverse(include_text=True):
+        tag = elem.tag
+        if tag == "br":
+            parts.append("\n")
+            continue
+        if tag == "-text":
+            text = elem.text_content
+        elif tag == "-comment" and comments:
+            text = elem.comment_content
+        else:
+            continue
+        t = (text or "").strip()
+        if t:
+            parts.append(t)
+    return "".join(parts)
+
+def _closest(node, tag, attribute):
+    node = node.parent
+    while node is not None:
+        if node.tag == tag and attribute in node.attributes:
+            return node
+        node = node.parent
+    return None
+
+def _selectolax_records(html, seen_indices):
+    from selectolax.lexbor import LexborHTMLParser
+
+    tree = LexborHTMLParser(html or "")
+    records = []
+    claimed = set()
+
+    for post in tree.css('div[data-testid="status-content"]'):
+        parent = _closest(post, "div", "data-index")
+        if parent is None:
+            continue
+
+        index = parent.attributes["data-index"] or ""
+        if index in seen_indices or index in claimed:
+            continue
+        claimed.add(index)
+
+        time_tag = parent.css_first("time")
+        href = None
+        if time_tag is not None:
+            a = _closest(time_tag, "a", "href")
+            if a is not None:
+                href = a.attributes["href"] or ""
+
+        title = None
+        if time_tag is not None and "title" in time_tag.attributes:
+            title = time_tag.attributes["title"] or ""  # 값 없는 속성은 bs4 와 같이 ""
+
+        status_info = parent.css_first('div[role="status-info"]')
+
+        records.append(_record(
+            index,
+            href,
+            title,
+            _lexbor_text(status_info, comments=False) if status_info is not None else None,
+            _lexbor_text(post),
+        ))
+
+    return records
+
+def _selectolax_text_fragment(fragment):
+    from selectolax.lexbor import LexborHTMLParser
+
+    body = LexborHTMLParser(fragment or "").body
+    return _lexbor_text(body) if body is not None else ""
+
+_RECORDS = {"bs4": _bs4_records, "lxml": _lxml_records, "selectolax": _selectolax_records}
+_TEXTS = {"bs4": _bs4_text, "lxml": _lxml_text_fragment, "selectolax": _selectolax_text_fragment}
+
+# ----------------------------------------------------------------------
+# 백엔드 선택
+# ----------------------------------------------------------------------
+def is_available(backend):
+    if backend == "bs4":
+        return True
+    try:
+        if backend == "lxml":
+            import lxml.html  # noqa: F401
+        elif backend == "selectolax":
+            import selectolax.lexbor  # noqa: F401
+        else:
+            return False
+    except ImportError:
+        return False
+    return True
+
+def available_backends():
+    return [backend for backend in BACKENDS if is_available(backend)]
+
+_resolved = {}
+
+def resolve(backend=None):
+    """
+    "auto" → 설치된 가장 빠른 백엔드, 설치되지 않은 백엔드 → bs4 (경고 한 번)
+    """
+    backend = backend or Config.SCRAPER_PARSER
+    if backend not in _resolved:
+        if backend == "auto":
+            _resolved[backend] = available_backends()[0]
+        elif is_available(backend):
+            _resolved[backend] = backend
+        else:
+            logger.warning(f"⚠️ HTML 파서 '{backend}' 를 사용할 수 없습니다 (미설치) → bs4 로 대체")
+            _resolved[backend] = "bs4"
+    return _resolved[backend]
+
+def extract_records(html, seen_indices=(), backend=None):
+    """
+    타임라인 HTML 에서 아직 처리하지 않은 data-index 노드의 레코드를 문서 순서대로 반환합니다.
+    이미 처리한 data-index 노드는 본문 추출 전에 건너뜁니다.
+    """
+    return _RECORDS[resolve(backend)](html, seen_indices)
+
+def content_text(fragment, backend=None):
+    """
+    게시물 본문 HTML 조각 → 텍스트 (extract_records 의 본문 규칙과 동일)
+    """
+    return _TEXTS[resolve(backend)](fragment)
+
+def content_texts(fragments, backend=None):
+    backend = resolve(backend)
+    return [_TEXTS[backend](fragment) for fragment in fragments]
+
+# ----------------------------------------------------------------------
+# 프로세스 풀
+# ----------------------------------------------------------------------
+class ParserPool:
+    """
+    HTML 파싱을 별도 프로세스에서 실행 (이벤트 루프/스크래퍼 스레드가 GIL 을 두고 경쟁하지 않음)
+    - workers == 0 이거나 이미 워커 프로세스 안이면 현재 프로세스에서 바로 파싱
+    """
+
+    def __init__(self, workers=None, backend=None):
+        self.workers = Config.PARSER_WORKERS if workers is None else workers
+        self.backend = resolve(backend)
+        self._executor = None
+        if multiprocessing.parent_process() is not None:
+            self.workers = 0
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def records(self, html, seen_indices=()):
+        """
+        블로킹 호출 (스크래퍼 스레드용)
+        """
+        with metrics.span("scrape.parse_html", backend=self.backend):
+            if not self.workers:
+                return extract_records(html, seen_indices, self.backend)
+            return self._get_executor().submit(extract_records, html, set(seen_indices), self.backend).result()
+
+    async def content_texts(self, fragments):
+        """
+        이벤트 루프용 (파싱하는 동안 루프를 막지 않음)
+        """
+        with metrics.span("scrape.parse_html", backend=self.backend):
+            if not self.workers:
+                return content_texts(fragments, self.backend)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), content_texts, list(fragments), self.backend)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+_pool = None
+
+def get_pool():
+    """
+    Config.PARSER_WORKERS 로 만든 프로세스 공용 파서 풀 (최초 호출 시 생성)
+    """
+    global _pool
+    if _pool is None:
+        _pool = ParserPool()
+    return _pool
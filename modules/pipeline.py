@@ -0,0 +1,382 @@
+import asyncio
+import logging
+import re
+import threading
+from datetime import datetime
+
+import pytz
+
+from config import Config
+from modules.preprocessor import preprocess_tweet
+from modules.dedup import account_from_url
+from modules.entities import get_index
+from modules.metrics import metrics
+from modules.ratelimit import BACKLOG, LIVE, REPORT, priority
+
+logger = logging.getLogger(__name__)
+
+# 스테이지 종료 신호
+_DONE = object()
+
+class PipelineStopped(RuntimeError):
+    """
+    다른 스테이지 오류로 파이프라인이 중단되어 스크래퍼의 emit 이 거부됨
+    """
+
+async def _close_stage(stage, out_q):
+    """
+    stage 가 끝나면 (오류/취소 포함) 다음 스테이지에 종료 신호
+    오류/취소 시에는 기다리지 않음 (큐가 가득 차 있으면 생략, 다음 스테이지도 run() 이 함께 취소)
+    """
+    try:
+        result = await stage
+    except BaseException:
+        try:
+            out_q.put_nowait(_DONE)
+        except asyncio.QueueFull:
+            pass
+        raise
+    await out_q.put(_DONE)
+    return result
+
+def build_result(post, target_content, analysis):
+    """
+    스크랩한 게시물 + 분석 결과 → posts 테이블/로컬 백업에 저장할 행
+    - tickers: 원문/분석 근거에서 찾은 상장 기업 티커 (상장 기업 목록이 없으면 None)
+    - keywords: 분석 에이전트가 놓친 기업명을 보충 (최대 5개)
+    """
+    keywords = analysis.get('keywords', [])
+    tickers = None
+    index = get_index()
+    if index:
+        tickers, names = index.analyze(post['content'], analysis.get('reason', ''))
+        if isinstance(keywords, list):
+            known = {keyword.lower() for keyword in keywords}
+            keywords = (keywords + [name for name in names if name.lower() not in known])[:max(5, len(keywords))]
+
+    return {
+        'time': post['time'],          # US Time (Numeric/String)
+        'time_str': post['kst_time'], # KST Time String (time_str)
+        'tweet_content': target_content, # Save cleaned content to DB
+        'original_content': post['content'], # Optional: keep original if needed
+        'tweet_url': post.get('url', None),
+        'source': post.get('source') or account_from_url(post.get('url')),  # 수집한 계정 (@handle)
+        'impact_on_market': analysis.get('impact_on_market', 'Unknown'),
+        'sentiment_score': analysis.get('sentiment_score', 0.0),
+        'market_impact_score': analysis.get('market_impact_score', 0.0),
+        'keywords': ', '.join(keywords) if isinstance(keywords, list) else str(keywords),
+        'sector': ', '.join(analysis.get('sector', [])) if isinstance(analysis.get('sector'), list) else str(analysis.get('sector', '')),
+        'reason': analysis.get('reason', ''),
+        'tickers': tickers
+    }
+
+def has_ticker_in_last_sentence(reason_text):
+    """
+    Check if the last sentence of reason contains ticker symbols
+    Expected format: "NVDA, TSM, AMD." or "NVDA."
+    """
+    if not reason_text:
+        return False
+
+    # Split by period and get the last non-empty sentence
+    sentences = [s.strip() for s in reason_text.split('.') if s.strip()]
+    if not sentences:
+        return False
+
+    last_sentence = sentences[-1]
+
+    # Pattern: One or more uppercase ticker symbols (1-5 letters) separated by commas
+    # Example: "NVDA, TSM, AMD" or "NVDA" or "AAPL, MSFT"
+    ticker_pattern = r'^[A-Z]{1,5}(\s*,\s*[A-Z]{1,5})*$'
+
+    return bool(re.match(ticker_pattern, last_sentence))
+
+def has_ticker(result_data):
+    """
+    상장 기업 목록으로 확인된 티커가 있는지
+    (목록이 없거나 목록에서 하나도 찾지 못하면 reason의 마지막 문장에 티커 형식이 있는지
+     → 목록에 없는 심볼만 적힌 경우, 예: "SPY, QQQ." 도 기존 규칙대로 인정)
+    """
+    if result_data.get('tickers'):
+        return True
+    return has_ticker_in_last_sentence(result_data.get('reason', ''))
+
+def needs_report(result_data):
+    """
+    리포트 생성 조건:
+    1) Direct impact
+    2) score >= Config.REPORT_MIN_SCORE (0.5)
+    3) 실제 상장 기업 티커가 확인되는지 (has_ticker)
+    """
+    passed = (
+        result_data.get('impact_on_market') == 'Direct'
+        and result_data.get('market_impact_score', 0.0) >= Config.REPORT_MIN_SCORE
+        and has_ticker(result_data)
+    )
+    if passed and result_data.get('tickers') == []:
+        # 상장 기업 목록에 없는 심볼로만 통과 → 목록 보강 대상
+        symbols = [s.strip() for s in result_data.get('reason', '').rstrip('. ').rsplit('.', 1)[-1].split(',')]
+        logger.info(f"ℹ️ 상장 기업 목록에 없는 티커로 리포트 조건 통과: {', '.join(symbols)} (LISTINGS_PATH 에 추가 필요)")
+        metrics.inc("report_gate_unlisted_total")
+    return passed
+
+def report_input(result_data):
+    """
+    리포트 에이전트에 넘길 분석 결과
+    """
+    return {
+        'impact_on_market': result_data.get('impact_on_market'),
+        'sentiment_score': result_data.get('sentiment_score'),
+        'market_impact_score': result_data.get('market_impact_score', 0.0),
+        'keywords': result_data.get('keywords'),
+        'sector': result_data.get('sector'),
+        'reason': result_data.get('reason', ''),
+        'tickers': result_data.get('tickers') or []
+    }
+
+def post_priority(post):
+    """
+    LLM 요청 우선순위: 게시 후 Config.LLM_LIVE_WINDOW 이내 (또는 시각을 모르는) 게시물은 LIVE,
+    그보다 오래된 게시물 (첫 실행/장애 후 밀린 게시물) 은 BACKLOG
+    post: 게시물 또는 build_result 결과 (time: ET 문자열)
+    """
+    try:
+        posted = datetime.strptime(str(post.get('time')), "%Y-%m-%d %H:%M:%S")
+    except ValueError:
+        return LIVE
+    now = datetime.now(pytz.timezone("America/New_York")).replace(tzinfo=None)
+    return LIVE if (now - posted).total_seconds() <= Config.LLM_LIVE_WINDOW else BACKLOG
+
+def report_priority(result_data):
+    return max(REPORT, post_priority(result_data))
+
+async def run_by_priority(items, levels, run):
+    """
+    items 를 우선순위별로 나눠 각 묶음을 해당 우선순위로 동시에 실행합니다. (최근 게시물이 밀린 게시물 뒤에서 기다리지 않음)
+    levels: items 와 같은 순서의 우선순위, run(묶음): 결과 목록을 돌려주는 코루틴 함수
+    Returns: 입력 순서와 같은 순서의 결과
+    """
+    groups = {}
+    for i, level in enumerate(levels):
+        groups.setdefault(level, []).append(i)
+
+    results = [None] * len(items)
+
+    async def run_group(level, indexes):
+        with priority(level):
+            outputs = await run([items[i] for i in indexes])
+        for i, output in zip(indexes, outputs):
+            results[i] = output
+
+    await asyncio.gather(*(run_group(level, indexes) for level, indexes in groups.items()))
+    return results
+
+class StreamingPipeline:
+    """
+    스크랩 → 전처리 → 분석 → 저장 → 리포트 스트리밍 파이프라인
+    - Selenium 스크래퍼는 워커 스레드에서 (HTTP 스크래퍼는 이벤트 루프에서) 실행되며, 게시물을 찾는 즉시 큐에 넣음
+    - 각 스테이지는 크기가 제한된 큐로 연결 (뒤 스테이지가 밀리면 앞 스테이지가 대기)
+    - 분석 워커는 대기 중인 게시물만 묶어서 바로 요청 → 가장 최신 게시물은 배치가 차기를 기다리지 않음
+    - 리포트는 Config.REPORT_CONCURRENCY 개 워커가 동시 생성, analyze 테이블에는 사이클 끝에 일괄 저장
+    """
+
+    def __init__(self, analyzer, reporter, storage, queue_size=None, concurrency=None, batch_size=None):
+        self.analyzer = analyzer
+        self.reporter = reporter
+        self.storage = storage
+        self.queue_size = queue_size or Config.PIPELINE_QUEUE_SIZE
+        self.concurrency = max(1, concurrency or Config.ANALYSIS_CONCURRENCY)
+        self.batch_size = max(1, batch_size or Config.ANALYSIS_BATCH_SIZE)
+        self.report_concurrency = max(1, Config.REPORT_CONCURRENCY)
+        self.results = []
+        self.reports = []
+
+    async def run(self, scrape, on_first_post=None):
+        """
+        scrape(emit): 게시물마다 emit(post) 를 호출하는 블로킹 함수 (워커 스레드에서 실행)
+                      또는 코루틴 함수 (이벤트 루프에서 실행, await emit(post))
+        on_first_post(): 첫 게시물이 들어왔을 때 한 번 호출
+        Returns: 스크랩한 게시물 목록, 저장된 분석 결과 목록
+        """
+        loop = asyncio.get_running_loop()
+        raw_q = asyncio.Queue(self.queue_size)
+        analyze_q = asyncio.Queue(self.queue_size)
+        store_q = asyncio.Queue(self.queue_size)
+        report_q = asyncio.Queue(self.queue_size)
+        scraped = []
+        stopped = threading.Event()  # 다른 스테이지가 실패하면 스크래퍼 스레드도 멈춤
+
+        def emit(post):
+            if stopped.is_set():
+                raise PipelineStopped("다른 스테이지 오류로 파이프라인 중단")
+            # 큐가 가득 차면 스크래퍼 스레드가 여기서 대기 (backpressure)
+            asyncio.run_coroutine_threadsafe(raw_q.put(post), loop).result()
+
+        def scrape_worker():
+            try:
+                return scrape(emit)
+            finally:
+                asyncio.run_coroutine_threadsafe(raw_q.put(_DONE), loop).result()
+
+        async def preprocess_loop():
+            while True:
+                post = await raw_q.get()
+                if post is _DONE:
+                    return
+
+                scraped.append(post)
+                try:
+                    if len(scraped) == 1 and on_first_post:
+                        on_first_post()
+
+                    # Save raw data first (cache)
+                    await asyncio.to_thread(self.storage.save_raw_posts, [post])
+
+                    # Use cleaned content for analysis
+                    target_content = preprocess_tweet(post['content'])
+                except Exception as e:
+                    logger.warning(f"⚠️ 전처리 스테이지 오류 ({post.get('url')}): {e}")
+                    metrics.inc("errors_total", span="pipeline.preprocess")
+                    continue
+                if not target_content:
+                    logger.warning(f"⚠️ 전처리 후 내용 없음 (Skip): {post.get('url')}")
+                    continue
+                await analyze_q.put((post, target_content))
+
+        scrape_task = asyncio.ensure_future(
+            _close_stage(scrape(raw_q.put), raw_q) if asyncio.iscoroutinefunction(scrape)
+            else loop.run_in_executor(None, scrape_worker)
+        )
+        tasks = [
+            scrape_task,
+            asyncio.ensure_future(_close_stage(preprocess_loop(), analyze_q)),
+            asyncio.ensure_future(self._run_workers(self._analyze_worker, self.concurrency, analyze_q, store_q)),
+            asyncio.ensure_future(_close_stage(self._store_stage(store_q, report_q), report_q)),
+            asyncio.ensure_future(self._run_workers(self._report_worker, self.report_concurrency, report_q, None)),
+        ]
+        # 스크래퍼 오류는 종료 신호로 전달되어 이미 받은 게시물까지 처리 → 나머지 스테이지 오류만 즉시 중단
+        pending, failed = set(tasks), False
+        while pending and not failed:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_EXCEPTION)
+            failed = any(task is not scrape_task and not task.cancelled() and task.exception() for task in done)
+        if failed:
+            # 한 스테이지가 실패하면 나머지는 큐에서 영원히 기다리므로 모두 취소
+            stopped.set()
+            for task in tasks:
+                task.cancel()  # 스레드에서 도는 스크래퍼는 취소되지 않음
+            # 스레드는 취소할 수 없으므로 emit 에서 막혀 있으면 큐를 비워 깨움 (다음 emit 에서 중단)
+            while not scrape_task.done():
+                while not raw_q.empty():
+                    raw_q.get_nowait()
+                await asyncio.wait([scrape_task], timeout=0.05)
+        outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+
+        # Save reports to analyze table (사이클당 한 번 bulk upsert)
+        if self.reports:
+            await self.storage.save_reports(self.reports)
+
+        # 취소/중단 신호보다 원래 오류를 먼저
+        errors = [
+            outcome for outcome in outcomes
+            if isinstance(outcome, BaseException) and not isinstance(outcome, (asyncio.CancelledError, PipelineStopped))
+        ]
+        if errors:
+            raise errors[0]
+        return scraped, self.results
+
+    async def _run_workers(self, worker, count, in_q, out_q):
+        workers = asyncio.gather(*(worker(in_q, out_q) for _ in range(count)))
+        if out_q is None:
+            return await workers
+        return await _close_stage(workers, out_q)
+
+    @staticmethod
+    def _drain(queue, first, limit):
+        """
+        first 뒤로 지금 당장 꺼낼 수 있는 항목만 limit 개까지 모읍니다. (대기하지 않음)
+        """
+        items = [first]
+        while len(items) < limit:
+            try:
+                item = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            if item is _DONE:
+                # 다른 워커도 종료할 수 있도록 되돌려 놓음
+                queue.put_nowait(_DONE)
+                break
+            items.append(item)
+        return items
+
+    async def _analyze_worker(self, in_q, out_q):
+        while True:
+            item = await in_q.get()
+            if item is _DONE:
+                await in_q.put(_DONE)
+                return
+
+            batch = self._drain(in_q, item, self.batch_size)
+            try:
+                with priority(min(post_priority(post) for post, _ in batch)):
+                    analyses = await self.analyzer.analyze_batch([content for _, content in batch])
+                rows = [
+                    build_result(post, target_content, analysis)
+                    for (post, target_content), analysis in zip(batch, analyses)
+                ]
+            except Exception as e:
+                # 스테이지가 멈추면 앞뒤 큐가 모두 막히므로 해당 묶음만 건너뜀
+                logger.warning(f"⚠️ 분석 스테이지 오류 ({len(batch)}개 건너뜀): {e}")
+                metrics.inc("errors_total", span="pipeline.analyze")
+                continue
+            for row in rows:
+                await out_q.put(row)
+
+    async def _store_stage(self, in_q, out_q):
+        while True:
+            item = await in_q.get()
+            if item is _DONE:
+                return
+
+            rows = self._drain(in_q, item, self.queue_size)
+            self.results.extend(rows)
+
+            # Save results to posts table and get IDs
+            try:
+                url_id_map = await self.storage.save_results(None, rows)
+            except Exception as e:
+                logger.warning(f"⚠️ 저장 스테이지 오류 ({len(rows)}개): {e}")
+                metrics.inc("errors_total", span="pipeline.store")
+                continue
+
+            for result_data in rows:
+                try:
+                    if not needs_report(result_data):
+                        logger.debug(f"⏭️ 리포트 생성 조건 미충족 (Impact: {result_data.get('impact_on_market')}, Score: {result_data.get('market_impact_score')}, Ticker: {has_ticker(result_data)})")
+                        continue
+                except Exception as e:
+                    logger.warning(f"⚠️ 리포트 조건 확인 오류 ({result_data.get('tweet_url')}): {e}")
+                    metrics.inc("errors_total", span="pipeline.store")
+                    continue
+
+                logger.info(f"✅ 리포트 생성 조건 만족 (영향도: {result_data.get('market_impact_score')}, 티커 확인됨)")
+                # Post ID 를 모르면 None → 게시물 저장 후 URL 로 연결
+                post_id = url_id_map.get(result_data.get('tweet_url'))
+                await out_q.put((post_id, result_data))
+
+    async def _report_worker(self, in_q, out_q):
+        while True:
+            item = await in_q.get()
+            if item is _DONE:
+                await in_q.put(_DONE)
+                return
+
+            post_id, result_data = item
+            try:
+                with priority(report_priority(result_data)):
+                    report = await self.reporter.generate_report(report_input(result_data), result_data.get('tweet_content'))
+            except Exception as e:
+                logger.warning(f"⚠️ 리포트 스테이지 오류 (ID: {post_id}): {e}")
+                metrics.inc("errors_total", span="pipeline.report")
+                continue
+            # analyze 테이블에는 사이클 끝에 한 번에 저장
+            self.reports.append((post_id, report, result_data.get('time_str'), result_data.get('tweet_url')))
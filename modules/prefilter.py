@@ -0,0 +1,97 @@
+import json
+import logging
+import math
+import os
+import zlib
+
+logger = logging.getLogger(__name__)
+
+N_FEATURES = 1 << 18
+SKIP_REASON = "Skipped by local prefilter"  # 필터가 만든 결과의 reason 접두어 (학습 데이터에서 제외)
+
+def features(text, n_features=N_FEATURES, ngram=2):
+    """
+    전처리된 텍스트 → 해시된 단어 unigram (+ ngram=2 이면 bigram) 인덱스 목록 (중복 포함)
+    파이썬 hash() 는 프로세스마다 달라지므로 crc32 사용, bigram 은 두 단어 해시를 조합
+    """
+    hashes = [zlib.crc32(token.encode("utf-8")) for token in text.split()]
+    indices = [h % n_features for h in hashes]
+    if ngram > 1:
+        indices.extend(((a * 0x9E3779B1) ^ b) % n_features for a, b in zip(hashes, hashes[1:]))
+    return indices
+
+class NoImpactFilter:
+    """
+    LLM 호출 전에 시장 영향이 없는 ('No') 게시물을 걸러내는 로컬 선형 분류기
+    - 해시된 단어 unigram/bigram 로지스틱 회귀 (학습: python train_prefilter.py)
+    - P(No) >= threshold 인 게시물만 건너뜀 (그 외는 항상 LLM 분석)
+    """
+
+    def __init__(self, weights, bias, threshold, n_features=N_FEATURES, ngram=2):
+        self.weights = weights
+        self.bias = bias
+        self.threshold = threshold
+        self.n_features = n_features
+        self.ngram = ngram
+
+    @classmethod
+    def load(cls, path, threshold=None):
+        """
+        모델 파일이 없으면 None (필터 비활성)
+        threshold: 기본값은 학습 시 선택된 값
+        """
+        if not path or not os.path.exists(path):
+            logger.info(f"ℹ️ 사전 필터 모델 없음 ({path}) → 모든 게시물을 LLM 으로 분석")
+            return None
+        with open(path, encoding="utf-8") as f:
+            model = json.load(f)
+        return cls(
+            weights={int(index): weight for index, weight in model["weights"].items()},
+            bias=model["bias"],
+            threshold=threshold if threshold is not None else model["threshold"],
+            n_features=model["n_features"],
+            ngram=model["ngram"],
+        )
+
+    def save(self, path, **info):
+        """
+        info: 학습 데이터 크기, 검증 지표 등 함께 기록할 값
+        """
+        model = {
+            "n_features": self.n_features,
+            "ngram": self.ngram,
+            "threshold": self.threshold,
+            "bias": self.bias,
+            "weights": {str(index): round(weight, 6) for index, weight in self.weights.items() if weight},
+            **info,
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(model, f, ensure_ascii=False)
+
+    def score(self, text):
+        """
+        P(impact_on_market == 'No')
+        """
+        z = self.bias
+        weights = self.weights
+        for index in features(text, self.n_features, self.ngram):
+            z += weights.get(index, 0.0)
+        if z < -30:
+            return 0.0
+        return 1.0 / (1.0 + math.exp(-z))
+
+    def check(self, text):
+        """
+        확실한 'No' 이면 LLM 대신 사용할 분석 결과, 아니면 None
+        """
+        probability = self.score(text)
+        if probability < self.threshold:
+            return None
+        return {
+            "impact_on_market": "No",
+            "sentiment_score": 0.0,
+            "market_impact_score": 0.0,
+            "keywords": [],
+            "sector": [],
+            "reason": f"{SKIP_REASON} (P(No)={probability:.2f}).",
+        }
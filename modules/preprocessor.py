@@ -43,3 +43,43 @@ def is_valid_tweet(content):
         return False
         
     return True
+
+# preprocess_batch 용 컴파일된 패턴
+_MENTION_RE = re.compile(r'@\S+')
+_HASHTAG_RE = re.compile(r'\B#\S+')
+_URL_RE = re.compile(r'http\S+')
+_WORD_RE = re.compile(r'\w+')
+_SINGLE_CHAR_RE = re.compile(r' [a-zA-Z] ')
+
+def _clean(tweet):
+    tweet = tweet.lower()
+
+    # 해당 문자가 없으면 패턴 검색 자체를 건너뜀
+    if '@' in tweet:
+        tweet = _MENTION_RE.sub('', tweet)
+    if '#' in tweet:
+        tweet = _HASHTAG_RE.sub('', tweet)
+    if 'http' in tweet:
+        tweet = _URL_RE.sub('', tweet)
+
+    # 단어 사이가 항상 공백 하나이므로
+    # - 단일 문자 패턴은 \s+ 대신 공백 하나로 충분
+    # - 공백 정리/큰따옴표 이스케이프는 결과를 바꾸지 않음
+    tweet = ' '.join(_WORD_RE.findall(tweet))
+    return _SINGLE_CHAR_RE.sub(' ', tweet)
+
+def preprocess_batch(tweets, drop_invalid=False):
+    """
+    여러 트윗을 한 번에 전처리합니다. (preprocess_tweet 과 결과 동일)
+    - tweets: pandas Series 또는 리스트 (Series 면 인덱스 유지)
+    - drop_invalid: True 면 is_valid_tweet 을 통과하지 못한 항목 제거
+    """
+    is_series = isinstance(tweets, pd.Series)
+    values = tweets.tolist() if is_series else list(tweets)
+    missing = pd.isna(values) if values else []
+    cleaned = ['' if na else _clean(tweet) for tweet, na in zip(values, missing)]
+
+    if is_series:
+        result = pd.Series(cleaned, index=tweets.index, name=tweets.name, dtype=object)
+        return result[[is_valid_tweet(c) for c in cleaned]] if drop_invalid else result
+    return [c for c in cleaned if is_valid_tweet(c)] if drop_invalid else cleaned
@@ -0,0 +1,197 @@
+import asyncio
+import contextvars
+import itertools
+import math
+import time
+from contextlib import contextmanager
+
+from config import Config
+from modules.metrics import metrics
+
+
+def estimate_tokens(text):
+    """
+    토큰 수를 대략적으로 추정합니다. (영문 기준 약 4글자 = 1토큰)
+    """
+    if not text:
+        return 0
+    return math.ceil(len(text) / 4)
+
+
+class _Bucket:
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+
+    def resize(self, per_minute):
+        self.capacity = float(per_minute)
+        self.tokens = min(self.tokens, self.capacity)
+        self.rate = per_minute / 60.0
+
+    def refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount):
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+
+# 우선순위 (작을수록 먼저)
+LIVE, REPORT, BACKLOG = 0, 1, 2
+PRIORITY_NAMES = {LIVE: "live", REPORT: "report", BACKLOG: "backlog"}
+
+_priority = contextvars.ContextVar("llm_priority", default=None)
+
+@contextmanager
+def priority(level):
+    """
+    이 블록 안에서 (이 블록에서 만든 태스크 포함) 보내는 LLM 요청의 우선순위
+    """
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+def current_priority(default=LIVE):
+    level = _priority.get()
+    return default if level is None else level
+
+
+class _Waiter:
+    __slots__ = ("priority", "deadline", "seq", "tokens", "future", "queued_at")
+
+    def __init__(self, priority, deadline, seq, tokens, future, queued_at):
+        self.priority = priority
+        self.deadline = deadline
+        self.seq = seq
+        self.tokens = tokens
+        self.future = future
+        self.queued_at = queued_at
+
+    def key(self, now):
+        # 마감 시각이 지난 요청은 한 단계 위 우선순위로 (하위 작업이 무한정 밀리지 않도록)
+        level = self.priority - 1 if now > self.deadline and self.priority > LIVE else self.priority
+        return level, self.deadline, self.seq
+
+
+class LLMScheduler:
+    """
+    LLM 요청 스케줄러 (분석/리포트 에이전트가 하나를 공유)
+    - RPM(분당 요청 수) / TPM(분당 토큰 수) 토큰 버킷 하나를 모든 요청이 함께 사용
+    - 대기 중인 요청은 우선순위 (실시간 게시물 > 리포트 > 백로그) → 마감 시각이 이른 순서로 배정
+      (앞 요청이 버킷을 기다리는 동안 뒤 요청이 끼어들지 않음)
+    - 백로그 요청은 버킷에 reserve 비율 이상이 남을 때만 배정 → 새 게시물이 들어오면 바로 보낼 여유를 남김
+    - rpm, tpm 이 None 또는 0 이면 해당 제한은 적용하지 않습니다.
+    - set_share() 로 한도의 일부만 사용 (같은 API 키를 쓰는 다른 프로세스에 나머지를 양보)
+    """
+
+    def __init__(self, rpm=None, tpm=None, reserve=None, deadlines=None):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.share = 1.0
+        self.requests = _Bucket(rpm) if rpm else None
+        self.token_bucket = _Bucket(tpm) if tpm else None
+        self.reserve = Config.LLM_BACKLOG_RESERVE if reserve is None else reserve
+        # 우선순위별 배정 마감 (대기 시작부터 초, None 이면 마감 없음)
+        self.deadlines = deadlines or {
+            LIVE: Config.LLM_LIVE_DEADLINE,
+            REPORT: Config.LLM_REPORT_DEADLINE,
+            BACKLOG: None,
+        }
+        self._waiters = []
+        self._seq = itertools.count()
+        self._timer = None
+
+    def set_share(self, share):
+        """
+        rpm/tpm 중 이 스케줄러가 쓸 비율 (0~1]. 바뀌면 True
+        """
+        share = min(1.0, max(0.01, share))
+        if share == self.share:
+            return False
+        self.share = share
+        if self.requests:
+            self.requests.resize(max(1, int(self.rpm * share)))
+        if self.token_bucket:
+            self.token_bucket.resize(max(1, int(self.tpm * share)))
+        return True
+
+    async def acquire(self, tokens=0, priority=None, deadline=None):
+        """
+        요청 1건과 tokens 만큼의 토큰 예산을 배정받을 때까지 대기합니다.
+        priority: 기본값은 현재 컨텍스트의 우선순위 (없으면 LIVE)
+        deadline: 배정 마감 (time.monotonic 기준, 기본값은 우선순위별 설정)
+        """
+        level = current_priority() if priority is None else priority
+        now = time.monotonic()
+        if deadline is None:
+            budget = self.deadlines.get(level)
+            deadline = now + budget if budget else math.inf
+
+        waiter = _Waiter(level, deadline, next(self._seq), tokens, asyncio.get_running_loop().create_future(), now)
+        self._waiters.append(waiter)
+        metrics.gauge("llm_queue_depth", len(self._waiters))
+        self._dispatch()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+                self._dispatch()
+            raise
+
+        granted = time.monotonic()
+        name = PRIORITY_NAMES.get(level, str(level))
+        metrics.observe("llm_queue_wait_seconds", granted - now, priority=name)
+        if granted > deadline:
+            metrics.inc("llm_deadline_missed_total", priority=name)
+
+    def _amount(self, waiter):
+        # 버킷 용량보다 큰 요청은 용량만큼만 요구 (영구 대기 방지)
+        return min(waiter.tokens, self.token_bucket.capacity)
+
+    def _wait_time(self, waiter):
+        reserve = self.reserve if waiter.priority >= BACKLOG else 0.0
+        wait = 0.0
+        if self.requests:
+            need = min(1 + reserve * self.requests.capacity, self.requests.capacity)
+            wait = max(wait, self.requests.wait_time(need))
+        if self.token_bucket:
+            need = min(self._amount(waiter) + reserve * self.token_bucket.capacity, self.token_bucket.capacity)
+            wait = max(wait, self.token_bucket.wait_time(need))
+        return wait
+
+    def _dispatch(self):
+        """
+        배정할 수 있는 요청을 순서대로 깨우고, 버킷이 모자라면 채워질 시각에 다시 호출되도록 예약
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        now = time.monotonic()
+        for bucket in (self.requests, self.token_bucket):
+            if bucket:
+                bucket.refill(now)
+
+        while self._waiters:
+            waiter = min(self._waiters, key=lambda w: w.key(now))
+            if waiter.future.done():  # 취소됨
+                self._waiters.remove(waiter)
+                continue
+            wait = self._wait_time(waiter)
+            if wait > 0:
+                self._timer = asyncio.get_running_loop().call_later(wait, self._dispatch)
+                break
+            self._waiters.remove(waiter)
+            if self.requests:
+                self.requests.tokens -= 1
+            if self.token_bucket:
+                self.token_bucket.tokens -= self._amount(waiter)
+            waiter.future.set_result(None)
+        metrics.gauge("llm_queue_depth", len(self._waiters))
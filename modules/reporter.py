@@ -1,12 +1,23 @@
 from agents import Agent, Runner
-import json
 import asyncio
+import logging
 from datetime import datetime
 
 from config import Config
+from modules.ratelimit import REPORT, current_priority, estimate_tokens
+from modules.cache import ResultCache
+from modules.metrics import metrics
+from modules.schemas import MarketReport, parse_structured
+from modules.entities import get_index
+
+logger = logging.getLogger(__name__)
+
+# 리포트 JSON (title/forecast/posts/stock) 에 대한 대략적인 출력 토큰 예산
+EXPECTED_OUTPUT_TOKENS = 600
 
 class TrumpReporter:
-    def __init__(self):
+    def __init__(self, limiter=None):
+        self.limiter = limiter
         self.agent = Agent(
             name="트럼프 트윗 리포트 에이전트",
             model=Config.OPENAI_MODEL_NAME,
@@ -28,7 +39,42 @@ class TrumpReporter:
                 "- Respond strictly in valid JSON format with no extra text\n"
             )
         )
+        self.cache = (
+            ResultCache("reporter", Config.OPENAI_MODEL_NAME, self.agent.instructions)
+            if Config.CACHE_ENABLED else None
+        )
+
+    async def _run(self, input_text):
+        if self.limiter:
+            with metrics.span("llm.rate_limit", agent="reporter"):
+                await self.limiter.acquire(
+                    estimate_tokens(self.agent.instructions) + estimate_tokens(input_text) + EXPECTED_OUTPUT_TOKENS,
+                    priority=current_priority(REPORT)
+                )
+        with metrics.span("llm.request", agent="reporter"):
+            try:
+                result = await asyncio.wait_for(Runner.run(self.agent, input_text), timeout=Config.LLM_TIMEOUT)
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"LLM 응답 시간 초과 ({Config.LLM_TIMEOUT}초)")
+        metrics.record_usage("reporter", result)
+        return result.final_output
+
+    @staticmethod
+    def _listed_stock(stock, tickers):
+        """
+        상장 기업 목록에 없는 티커는 제외, 남는 것이 없으면 게시물에서 찾은 티커로 대체 (최대 3개)
+        게시물에서 찾은 티커도 없으면 (목록에 없는 심볼로 리포트 조건을 통과한 경우) 그대로 사용
+        """
+        index = get_index()
+        if not index:
+            return stock
+        symbols = [ticker for ticker in stock.split(",") if ticker]
+        listed = [ticker for ticker in symbols if index.is_listed(ticker)]
+        if len(listed) < len(symbols):
+            metrics.inc("report_tickers_dropped_total", len(symbols) - len(listed))
+        return ",".join((listed or tickers or symbols)[:3])
 
+    @metrics.timed("report.generate")
     async def generate_report(self, analysis_result, tweet_content):
         """
         Generate a professional market report based on analyzer results
@@ -44,6 +90,10 @@ class TrumpReporter:
             # Calculate model score
             model_score = analysis_result.get('market_impact_score', 0.0) * 10
             
+            # 상장 기업 목록으로 확인된 티커가 있으면 함께 전달
+            tickers = analysis_result.get('tickers') or []
+            listed = f"- Listed Tickers Mentioned: {', '.join(tickers)}\n" if tickers else ""
+
             # Prepare input for reporter agent
             input_text = f"""
 Analyze the following Trump tweet and its market analysis:
@@ -57,32 +107,38 @@ Analysis Results:
 - Keywords: {analysis_result.get('keywords')}
 - Sector: {analysis_result.get('sector')}
 - Reason: {analysis_result.get('reason')}
-
+{listed}
 Model Score (market_impact_score * 10): {model_score}
 
 Generate a professional investment report in JSON format.
 """
             
-            print(f"📊 리포트 생성 중...")
-            result = await Runner.run(self.agent, input_text)
-            response_text = result.final_output
-            
-            # JSON Parsing
-            if "```json" in response_text:
-                response_text = response_text.split("```json")[1].split("```")[0].strip()
-            elif "```" in response_text:
-                response_text = response_text.split("```")[1].split("```")[0].strip()
-            
-            report = json.loads(response_text)
-            
-            # Ensure model score is correctly set
-            report['model'] = model_score
+            if self.cache:
+                cached = self.cache.get(input_text)
+                if cached is not None:
+                    logger.debug(f"💾 캐시된 리포트 사용: {cached.get('title', '')[:30]}...")
+                    return cached
+
+            logger.debug(f"📊 리포트 생성 중...")
+            response_text = await self._run(input_text)
+
+            # 스키마 검증 (model 점수는 입력값으로 고정, 실패한 필드만 재요청)
+            report = await parse_structured(
+                MarketReport, response_text, input_text,
+                reask=self._run,
+                agent="reporter",
+                overrides={"model": model_score}
+            )
+            report['stock'] = self._listed_stock(report['stock'], tickers)
+            if self.cache:
+                self.cache.set(input_text, report)
             
-            print(f"✅ 리포트 생성 완료: {report.get('title')[:30]}...")
+            logger.info(f"✅ 리포트 생성 완료: {report.get('title')[:30]}...")
             return report
             
         except Exception as e:
-            print(f"⚠️ 리포트 생성 오류: {e}")
+            logger.warning(f"⚠️ 리포트 생성 오류: {e}")
+            metrics.inc("errors_total", span="report.generate")
             return {
                 "title": "리포트 생성 실패",
                 "forecast": "리포트 생성 중 오류가 발생했습니다. 리포트 생성 중 오류가 발생했습니다. 리포트 생성 중 오류가 발생했습니다.",
@@ -90,3 +146,23 @@ Generate a professional investment report in JSON format.
                 "model": analysis_result.get('market_impact_score', 0.0) * 10,
                 "stock": ""
             }
+
+    async def generate_reports(self, items, concurrency=None):
+        """
+        여러 리포트를 동시에 생성합니다.
+        
+        Args:
+            items: List of (analysis_result, tweet_content)
+            concurrency: 동시 요청 수 (기본값: Config.REPORT_CONCURRENCY)
+            
+        Returns:
+            List of report dicts in the same order as items
+        """
+        concurrency = max(1, concurrency or Config.REPORT_CONCURRENCY)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run_one(analysis_result, tweet_content):
+            async with semaphore:
+                return await self.generate_report(analysis_result, tweet_content)
+
+        return await asyncio.gather(*(run_one(a, c) for a, c in items))
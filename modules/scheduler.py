@@ -0,0 +1,106 @@
+import random
+from collections import Counter
+from datetime import datetime, timedelta
+
+import pytz
+
+from config import Config
+
+ET = pytz.timezone("America/New_York")
+
+def _parse_et(value):
+    try:
+        return datetime.strptime(str(value), "%Y-%m-%d %H:%M:%S")
+    except (TypeError, ValueError):
+        return None
+
+class PollScheduler:
+    """
+    게시물 도착 빈도에 맞춰 폴링 간격을 조절하는 스케줄러
+    - 최근 게시 빈도 + 과거 데이터의 시간대(ET)별 게시 빈도로 시간당 예상 게시물 수를 추정
+    - 예상 게시물 1개당 약 1/Config.POLL_POSTS_PER_INTERVAL 번 폴링하도록 간격 결정
+    - 신규 게시물 발견 직후(연속 게시 가능성)에는 최소 간격으로 폴링
+    - 지터로 동시 요청 패턴을 분산, 오류가 이어지면 지수 백오프
+    """
+
+    def __init__(self, min_interval=None, max_interval=None, history_days=28, recent_hours=2):
+        self.min_interval = Config.POLL_MIN_INTERVAL if min_interval is None else min_interval
+        self.max_interval = Config.POLL_MAX_INTERVAL if max_interval is None else max_interval
+        self.history_days = history_days
+        self.recent_hours = recent_hours
+        self.post_times = []
+        self.errors = 0
+        self.found_new = False
+
+    def history_cutoff(self):
+        """
+        스케줄링에 사용하는 과거 데이터의 시작 시각 (ET 문자열)
+        """
+        return (self._now() - timedelta(days=self.history_days)).strftime("%Y-%m-%d %H:%M:%S")
+
+    def observe(self, times):
+        """
+        게시 시각(ET, "%Y-%m-%d %H:%M:%S")을 기록합니다.
+        """
+        for value in times:
+            parsed = _parse_et(value)
+            if parsed:
+                self.post_times.append(parsed)
+
+        # 분석에 쓰는 기간만 보관
+        cutoff = _parse_et(self.history_cutoff())
+        self.post_times = [t for t in self.post_times if t >= cutoff]
+
+    def record_success(self, new_posts):
+        self.errors = 0
+        self.found_new = bool(new_posts)
+        self.observe(post.get("time") for post in new_posts or [])
+
+    def record_error(self):
+        self.errors += 1
+        self.found_new = False
+
+    @staticmethod
+    def _now():
+        return datetime.now(ET).replace(tzinfo=None)
+
+    def expected_rate(self, now=None):
+        """
+        시간당 예상 게시물 수 = max(최근 15분/1시간/recent_hours 게시 빈도, 같은 시간대의 과거 평균 빈도)
+        """
+        now = now or self._now()
+        if not self.post_times:
+            return None
+
+        # 짧은 창일수록 연속 게시에 빠르게 반응
+        recent_rate = 0.0
+        for hours in (0.25, 1, self.recent_hours):
+            cutoff = now - timedelta(hours=hours)
+            recent_rate = max(recent_rate, sum(1 for t in self.post_times if t >= cutoff) / hours)
+
+        span_days = max(1.0, (now - min(self.post_times)).total_seconds() / 86400)
+        by_hour = Counter(t.hour for t in self.post_times)
+        hourly_rate = by_hour.get(now.hour, 0) / span_days
+
+        return max(recent_rate, hourly_rate)
+
+    def next_delay(self):
+        """
+        다음 폴링까지 대기할 시간(초)
+        """
+        if self.errors:
+            delay = min(self.max_interval, Config.POLL_ERROR_BACKOFF * (2 ** (self.errors - 1)))
+        elif self.found_new:
+            delay = self.min_interval
+        else:
+            rate = self.expected_rate()
+            if rate is None:
+                delay = Config.POLL_BASE_INTERVAL  # 과거 데이터 없음
+            elif rate <= 0:
+                delay = self.max_interval
+            else:
+                delay = Config.POLL_POSTS_PER_INTERVAL / rate * 3600
+
+        delay = min(self.max_interval, max(self.min_interval, delay))
+        jitter = Config.POLL_JITTER
+        return delay * random.uniform(1 - jitter, 1 + jitter)
@@ -0,0 +1,336 @@
+import ast
+import json
+import logging
+import re
+from typing import List, Literal
+
+from pydantic import BaseModel, Field, ValidationError, field_validator
+
+from config import Config
+from modules.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# ----------------------------------------------------------------------
+# Output schemas
+# ----------------------------------------------------------------------
+def _to_list(value):
+    # "NVDA, Apple" 처럼 문자열로 온 목록도 허용
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [part.strip() for part in value.split(",") if part.strip()]
+    return value
+
+# 문장 끝 후보: 마침표/느낌표/물음표 (+ 닫는 따옴표/괄호) 뒤 공백
+_SENTENCE_END_RE = re.compile(r"[.!?。]+[\"')\]]*\s+")
+_TICKER_RE = re.compile(r"^[A-Z]{1,5}([.-][A-Z]{1,2})?$")
+# 마침표로 끝나도 문장 끝이 아닌 약어 (소문자, 마지막 마침표 제외)
+_ABBREVIATIONS = {
+    "mr", "mrs", "ms", "dr", "prof", "st", "jr", "sr", "inc", "corp", "co", "ltd", "llc", "plc",
+    "vs", "etc", "e.g", "i.e", "approx", "est", "no", "dept", "gov", "sen", "rep", "gen", "jan", "feb",
+    "mar", "apr", "jun", "jul", "aug", "sep", "sept", "oct", "nov", "dec",
+}
+_INITIALS_RE = re.compile(r"(?:[A-Za-z]\.)*[A-Za-z]")  # U.S / U.K / J (이니셜)
+
+def _is_abbreviation(token):
+    token = token.lstrip("(\"'")
+    return token.lower() in _ABBREVIATIONS or bool(_INITIALS_RE.fullmatch(token))
+
+def count_sentences(text):
+    """
+    문장 수 (약어/이니셜 뒤의 마침표나 소문자로 이어지는 경우는 문장 끝으로 보지 않음)
+    예: "U.S. stocks rise." → 1
+    """
+    text = text.strip()
+    if not text:
+        return 0
+    count = 1
+    for match in _SENTENCE_END_RE.finditer(text):
+        words = text[:match.start()].split()
+        if text[match.start()] == "." and words and _is_abbreviation(words[-1]):
+            continue
+        if text[match.end()].islower():
+            continue
+        count += 1
+    return count
+
+class TweetAnalysis(BaseModel):
+    impact_on_market: Literal["Direct", "Indirect", "No"]
+    sentiment_score: float = Field(ge=-1.0, le=1.0)
+    market_impact_score: float = Field(ge=0.0, le=1.0)
+    keywords: List[str]
+    sector: List[str]
+    reason: str = Field(min_length=1)
+
+    @field_validator("impact_on_market", mode="before")
+    @classmethod
+    def _normalize_impact(cls, value):
+        if isinstance(value, str):
+            for choice in ("Direct", "Indirect", "No"):
+                if value.strip().lower() == choice.lower():
+                    return choice
+        return value
+
+    @field_validator("keywords", mode="before")
+    @classmethod
+    def _keywords(cls, value):
+        value = _to_list(value)
+        # 최대 5개 (중요도 순)
+        return value[:5] if isinstance(value, list) else value
+
+    @field_validator("sector", mode="before")
+    @classmethod
+    def _sector(cls, value):
+        return _to_list(value)
+
+class MarketReport(BaseModel):
+    title: str = Field(min_length=1)
+    forecast: str
+    posts: str = Field(min_length=1)
+    model: float = 0.0
+    stock: str = ""
+
+    @field_validator("forecast")
+    @classmethod
+    def _three_sentences(cls, value):
+        count = count_sentences(value)
+        if count != 3:
+            raise ValueError(f"forecast must contain exactly 3 sentences (got {count})")
+        return value.strip()
+
+    @field_validator("stock", mode="before")
+    @classmethod
+    def _tickers(cls, value):
+        tickers = [t.strip().lstrip("$").upper() for t in _to_list(value)]
+        invalid = [t for t in tickers if not _TICKER_RE.match(t)]
+        if invalid:
+            raise ValueError(f"invalid ticker symbols: {', '.join(invalid)}")
+        # 최대 3개, 공백 없이 쉼표로 구분
+        return ",".join(tickers[:3])
+
+def validate(model, data):
+    """
+    Returns: (검증된 인스턴스 또는 None, {필드: 오류 메시지})
+    """
+    if not isinstance(data, dict):
+        data = {}
+    try:
+        return model.model_validate(data), {}
+    except ValidationError as e:
+        errors = {}
+        for error in e.errors():
+            field = str(error["loc"][0]) if error["loc"] else "__root__"
+            errors.setdefault(field, error["msg"])
+        return None, errors
+
+def reask_prompt(original_input, data, errors):
+    """
+    검증에 실패한 필드만 다시 요청하는 프롬프트
+    """
+    fields = sorted(errors)
+    problems = "\n".join(f"- {field}: {errors[field]}" for field in fields)
+    previous = json.dumps(data, ensure_ascii=False, default=str) if isinstance(data, dict) else "(unparseable)"
+    return (
+        f"{original_input}\n\n"
+        f"Your previous JSON response was:\n{previous}\n\n"
+        f"The following fields are missing or invalid:\n{problems}\n\n"
+        f"Follow all original instructions and respond strictly with a valid JSON object "
+        f"containing only these keys: {json.dumps(fields)}."
+    )
+
+# ----------------------------------------------------------------------
+# Local JSON repair
+# ----------------------------------------------------------------------
+_FENCE_RE = re.compile(r"```(?:json|JSON)?\s*(.*?)```", re.S)
+_SMART_QUOTES = str.maketrans({"“": '"', "”": '"', "„": '"'})
+_PY_LITERALS = {"True": "true", "False": "false", "None": "null"}    # → JSON
+_JSON_LITERALS = {"true": "True", "false": "False", "null": "None"}  # → 파이썬 (ast.literal_eval)
+
+def _close_json(body, literals=_PY_LITERALS):
+    """
+    첫 번째 최상위 JSON 값만 잘라내고 (뒤쪽 설명 문장 제거)
+    - 문자열 밖의 후행 쉼표 제거, 문자열 밖의 리터럴만 literals 로 변환 (문자열 내용은 그대로)
+    - "..." 와 '...' 문자열 모두 인식 (파이썬 리터럴 형태 응답)
+    - 응답이 중간에 잘린 경우 열린 문자열/괄호를 닫음
+    Returns: (텍스트, 문자열 안에서 잘렸는지)
+    """
+    out = []
+    stack = []
+    quote = None
+    escaped = False
+    i = 0
+    while i < len(body):
+        ch = body[i]
+        if quote:
+            out.append(ch)
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == quote:
+                quote = None
+            i += 1
+            continue
+
+        if ch in "\"'":
+            quote = ch
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+        elif ch in "}]":
+            # 후행 쉼표 제거
+            while out and out[-1].isspace():
+                out.pop()
+            if out and out[-1] == ",":
+                out.pop()
+            if stack:
+                stack.pop()
+            out.append(ch)
+            if not stack:
+                return "".join(out), False
+            i += 1
+            continue
+        elif ch.isalpha():
+            word = re.match(r"\w+", body[i:]).group(0)
+            out.append(literals.get(word, word))
+            i += len(word)
+            continue
+        out.append(ch)
+        i += 1
+
+    # 잘린 응답
+    truncated = quote is not None
+    if truncated:
+        if escaped:
+            out.pop()  # 끝에 남은 역슬래시
+        out.append(quote)
+    text = "".join(out).rstrip()
+    if text.endswith(","):
+        text = text[:-1]
+    elif text.endswith(":"):
+        text += " null"
+    return text + "".join(reversed(stack)), truncated
+
+def _drop_truncated(value):
+    """
+    잘린 문자열 (문서의 마지막 값) 이 들어 있는 필드/항목을 제거 → 스키마 검증에서 누락으로 잡혀 재요청
+    """
+    container = value
+    while True:
+        if isinstance(container, dict) and container:
+            key = next(reversed(list(container)))
+        elif isinstance(container, list) and container:
+            key = len(container) - 1
+        else:
+            return value
+        child = container[key]
+        if isinstance(child, (dict, list)) and child:
+            container = child
+            continue
+        if isinstance(container, dict):
+            del container[key]
+        else:
+            container.pop()
+        return value
+
+def repair_json(text):
+    """
+    LLM 응답에서 JSON 값을 추출하고 흔한 형식 오류를 로컬에서 복구합니다.
+    (코드 펜스, 앞뒤 설명 문장, 스마트 따옴표, 후행 쉼표, 파이썬 리터럴/작은따옴표, 잘린 응답)
+    문자열 중간에서 잘린 응답은 잘린 필드를 버림 (반쪽 문장을 그대로 받지 않고 재요청하도록)
+    Raises: ValueError (복구 불가)
+    """
+    if isinstance(text, (dict, list)):
+        return text
+    if not isinstance(text, str):
+        raise ValueError(f"문자열 응답이 아닙니다: {type(text).__name__}")
+
+    text = text.strip()
+    fenced = _FENCE_RE.search(text)
+    if fenced:
+        text = fenced.group(1).strip()
+    elif text.startswith("```"):
+        # 닫히지 않은 코드 펜스
+        text = text.split("\n", 1)[1] if "\n" in text else ""
+
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+
+    starts = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+    if not starts:
+        raise ValueError("응답에서 JSON 을 찾을 수 없습니다")
+    raw = text[min(starts):].translate(_SMART_QUOTES)
+
+    value = None
+    body, truncated = _close_json(raw)
+    try:
+        value = json.loads(body)
+    except ValueError:
+        try:
+            # 작은따옴표 문자열 등 파이썬 리터럴 형태 (문자열 밖의 true/false/null 만 변환)
+            py_body, truncated = _close_json(raw, _JSON_LITERALS)
+            value = ast.literal_eval(py_body)
+        except (ValueError, SyntaxError):
+            value = None
+    if not isinstance(value, (dict, list)):
+        raise ValueError("JSON 복구 실패")
+
+    if truncated:
+        logger.info("✂️ 잘린 응답: 마지막 문자열 필드는 버리고 재요청")
+        metrics.inc("llm_output_truncated_total")
+        value = _drop_truncated(value)
+    return value
+
+def load_json(text, agent):
+    """
+    json.loads 로 바로 읽히지 않으면 repair_json 으로 복구 (llm_output_repairs_total{kind="local"})
+    """
+    if isinstance(text, (dict, list)):
+        return text
+    try:
+        return json.loads(text)
+    except (TypeError, ValueError):
+        pass
+    value = repair_json(text)
+    metrics.inc("llm_output_repairs_total", agent=agent, kind="local")
+    return value
+
+async def parse_structured(model, response, original_input, reask, agent, overrides=None, attempts=None):
+    """
+    LLM 응답을 스키마로 검증한 dict 로 변환합니다.
+    1) 로컬 JSON 복구 → 2) 검증 실패 시 실패한 필드만 재요청 (reask(prompt) → 응답 텍스트) 후 병합
+    - overrides: 검증 전에 덮어쓸 값 (예: 리포트의 model 점수)
+    - attempts: 재요청 횟수 (기본값: Config.LLM_REASK_ATTEMPTS)
+    Raises: ValueError (재요청 후에도 검증 실패)
+    """
+    attempts = Config.LLM_REASK_ATTEMPTS if attempts is None else attempts
+    try:
+        data = load_json(response, agent)
+    except ValueError:
+        data = None
+
+    for attempt in range(attempts + 1):
+        if isinstance(data, dict) and overrides:
+            data.update(overrides)
+        instance, errors = validate(model, data)
+        if instance is not None:
+            return instance.model_dump()
+        if attempt == attempts:
+            break
+
+        logger.info(f"🔁 필드 재요청 ({agent}): {', '.join(sorted(errors))}")
+        metrics.inc("llm_output_repairs_total", agent=agent, kind="reask")
+        try:
+            fixed = load_json(await reask(reask_prompt(original_input, data, errors)), agent)
+        except ValueError:
+            continue
+        if isinstance(fixed, dict):
+            if isinstance(data, dict):
+                data = dict(data, **{key: value for key, value in fixed.items() if key in errors})
+            else:
+                data = fixed
+
+    metrics.inc("llm_output_invalid_total", agent=agent)
+    raise ValueError(f"출력 스키마 검증 실패: {errors}")
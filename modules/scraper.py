@@ -1,11 +1,20 @@
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
-from bs4 import BeautifulSoup
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException
 import time
+import logging
 from datetime import datetime
 import pytz
 from config import Config
+from modules.dedup import account_from_url, passed_watermark, post_id_from_url
+from modules.metrics import metrics
+from modules.parsers import get_pool
+
+logger = logging.getLogger(__name__)
 
 def kst_to_et(kst_str):
     try:
@@ -18,11 +27,19 @@ def kst_to_et(kst_str):
     et_dt = kst_dt.astimezone(et_tz)
     return et_dt.strftime("%Y-%m-%d %H:%M:%S")
 
-def get_driver():
+def get_driver(headless=None):
+    if headless is None:
+        headless = Config.HEADLESS
+
     options = Options()
     options.add_argument("--start-maximized")
-    # Headless mode is often better for cloud/background agents, but let's keep it visible for now if user wants
-    # options.add_argument("--headless") 
+    # Headless mode is often better for cloud/background agents
+    if headless:
+        options.add_argument("--headless=new")
+        options.add_argument("--window-size=1920,1080")
+        options.add_argument("--disable-gpu")
+        options.add_argument("--no-sandbox")
+        options.add_argument("--disable-dev-shm-usage")
     options.add_argument(
         "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/142.0.7444.163 Safari/537.36"
     )
@@ -36,6 +53,28 @@ def get_driver():
         
     return driver
 
+@metrics.timed("scrape.page_load")
+def open_timeline(driver, url=Config.TRUTH_SOCIAL_URL):
+    """
+    타임라인 페이지를 엽니다.
+    - 이미 같은 페이지가 열려 있으면 새로 띄우지 않고 새로고침만 합니다.
+    - 고정 대기 대신 첫 게시물이 렌더링될 때까지만 기다립니다. (최대 Config.PAGE_LOAD_TIMEOUT 초)
+    """
+    if driver.current_url.rstrip("/") == url.rstrip("/"):
+        driver.refresh()
+    else:
+        driver.get(url)
+
+    try:
+        WebDriverWait(driver, Config.PAGE_LOAD_TIMEOUT).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, 'div[data-testid="status-content"]'))
+        )
+    except TimeoutException:
+        logger.warning(f"⚠️ 게시물 로딩 대기 시간 초과 ({Config.PAGE_LOAD_TIMEOUT}초)")
+
+    # 새로고침 시 브라우저가 이전 스크롤 위치를 복원하므로 맨 위로 이동
+    driver.execute_script("window.scrollTo(0, 0);")
+
 # def collect_new_posts(driver, existing_urls, max_count=100):
 #     driver.get(Config.TRUTH_SOCIAL_URL)
 #     time.sleep(4)
@@ -124,89 +163,169 @@ def get_driver():
 #         scroll_attempts += 1
 
 #     return collected
-def collect_new_posts(driver, existing_urls, max_count=450):
-    driver.get("https://truthsocial.com/@realDonaldTrump")
-    time.sleep(4)
+# 아직 처리하지 않은 data-index 노드만 골라 구조화된 레코드로 반환하는 페이지 내 스크립트
+# (arguments[0]: 이미 처리한 data-index 목록)
+# 레코드 필드는 modules/parsers.py 의 HTML 파서와 동일한 규칙으로 추출합니다.
+EXTRACT_NEW_POSTS_JS = r"""
+const seen = new Set(arguments[0] || []);
+const records = [];
+const claimed = new Set();
+
+function strippedText(root, keepBreaks) {
+    const parts = [];
+    const walker = document.createTreeWalker(root, NodeFilter.SHOW_ELEMENT | NodeFilter.SHOW_TEXT);
+    let node = walker.nextNode();
+    while (node) {
+        if (node.nodeType === Node.TEXT_NODE) {
+            const t = node.nodeValue.trim();
+            if (t) parts.push(t);
+        } else if (keepBreaks && node.tagName === 'BR') {
+            parts.push('\n');
+        }
+        node = walker.nextNode();
+    }
+    return parts.join('');
+}
+
+document.querySelectorAll('div[data-testid="status-content"]').forEach(function (post) {
+    const parent = post.parentElement && post.parentElement.closest('div[data-index]');
+    if (!parent) return;
+
+    const index = parent.getAttribute('data-index');
+    if (seen.has(index) || claimed.has(index)) return;
+    claimed.add(index);
+
+    const timeTag = parent.querySelector('time');
+    const link = timeTag ? timeTag.closest('a[href]') : null;
+    const statusInfo = parent.querySelector('div[role="status-info"]');
+
+    records.push({
+        index: index,
+        href: link ? link.getAttribute('href') : null,
+        title: timeTag ? timeTag.getAttribute('title') : null,
+        retruthed: statusInfo ? strippedText(statusInfo, false).indexOf('ReTruthed') !== -1 : false,
+        pinned: statusInfo ? strippedText(statusInfo, false).indexOf('Pinned') !== -1 : false,
+        text: strippedText(post, true)
+    });
+});
+return records;
+"""
+
+@metrics.timed("scrape.parse")
+def extract_new_records(driver, seen_indices):
+    """
+    현재 화면에서 아직 처리하지 않은 data-index 노드의 레코드를 문서 순서대로 반환합니다.
+    - Config.SCRAPER_EXTRACTION == "script": 브라우저 안에서 새 노드만 추출 (page_source 전송/재파싱 없음)
+    - Config.SCRAPER_EXTRACTION == "soup": page_source 를 파싱 (Config.SCRAPER_PARSER 백엔드, 파서 프로세스에서)
+    """
+    if Config.SCRAPER_EXTRACTION == "soup":
+        return get_pool().records(driver.page_source, seen_indices)
+    return driver.execute_script(EXTRACT_NEW_POSTS_JS, list(seen_indices)) or []
+
+@metrics.timed("scrape.probe", backend="selenium")
+def probe_top_post(driver, existing_urls, watermark=None, url=Config.TRUTH_SOCIAL_URL):
+    """
+    전체 스크롤 전에 상단 게시물만 확인하는 가벼운 변경 감지
+    Returns: 신규 게시물이 있을 수 있으면 True, 상단 게시물이 이미 수집한 것이면 False
+    """
+    open_timeline(driver, url)
+
+    for record in extract_new_records(driver, set()):
+        href = record.get("href")
+        # 고정 게시물/리트루스는 최신 게시물 판단에 쓸 수 없음
+        if not href or record.get("pinned") or record.get("retruthed"):
+            continue
+
+        top_url = "https://truthsocial.com" + href if href.startswith("/") else href
+        title = record.get("title")
+        et_time = kst_to_et(title) if title else "N/A"
+        known = top_url in existing_urls or passed_watermark(watermark, post_id_from_url(top_url), et_time)
+        return not known
+
+    # 판단할 수 있는 게시물이 없으면 전체 스크랩으로 확인
+    return True
+
+@metrics.timed("scrape.collect", backend="selenium")
+def collect_new_posts(driver, existing_urls, max_count=450, watermark=None, on_post=None, reload=True, url=Config.TRUTH_SOCIAL_URL):
+    """
+    타임라인을 스크롤하며 신규 게시물을 수집합니다.
+    - existing_urls: 이미 수집한 게시물 (URL 집합 또는 PostIndex)
+    - watermark: 마지막으로 수집한 가장 최신 게시물 {"post_id", "time"}
+      해당 게시물이 삭제되어 보이지 않아도, 워터마크보다 오래된 게시물에 도달하면 종료
+    - on_post: 게시물을 수집할 때마다 호출되는 콜백 (스트리밍 파이프라인용)
+    - reload: False 면 이미 열려 있는 페이지(probe_top_post 직후)를 그대로 사용
+    - url: 수집할 계정의 타임라인 (게시물의 source 에 계정 이름 기록)
+    """
+    if reload:
+        open_timeline(driver, url)
+    source = account_from_url(url)
 
     collected = []
     seen_urls = set()
+    seen_indices = set()  # URL 까지 확인된 data-index (다음 스크롤부터 제외)
 
     scroll_attempts = 0
     max_scroll_attempts = 450  # 넉넉하게
 
-    prev_height = 0
-
     while scroll_attempts < max_scroll_attempts:
-        soup = BeautifulSoup(driver.page_source, "html.parser")
-        posts = soup.find_all("div", attrs={"data-testid": "status-content"})
-
-        found_new = False
-
-        for post in posts:
-            parent = post.find_parent("div", attrs={"data-index": True})
-            if not parent:
+        for record in extract_new_records(driver, seen_indices):
+            href = record.get("href")
+            if not href:
+                # 아직 렌더링 중인 노드 → 다음 스크롤에서 다시 확인
                 continue
+            seen_indices.add(record["index"])
 
-            time_tag = parent.find("time")
-
-            url = None
-            if time_tag:
-                a = time_tag.find_parent("a", href=True)
-                if a:
-                    href = a["href"]
-                    url = "https://truthsocial.com" + href if href.startswith("/") else href
+            post_url = "https://truthsocial.com" + href if href.startswith("/") else href
 
-            if not url:
+            if post_url in seen_urls:
                 continue
+            seen_urls.add(post_url)
 
-            if url in seen_urls:
-                continue
-            seen_urls.add(url)
+            timestamp_raw = record["title"] if record.get("title") is not None else "N/A"
+            et_time = kst_to_et(timestamp_raw) if timestamp_raw != "N/A" else "N/A"
 
-            # 이미 엑셀에 있는 게시물 → 여기가 "종료 조건"
-            if url in existing_urls:
-                print("🎯 기존 데이터 도달 → 스크롤 종료")
+            # 이미 수집한 게시물 → 여기가 "종료 조건"
+            if post_url in existing_urls:
+                if record.get("pinned"):
+                    # 상단 고정 게시물은 시간 순서와 무관 → 건너뛰기만
+                    continue
+                logger.info("🎯 기존 데이터 도달 → 스크롤 종료")
                 return collected
 
-            # 리트루스 제외
-            status_info = parent.find("div", role="status-info")
-            if status_info and "ReTruthed" in status_info.get_text(strip=True):
+            # 리트루스 제외 (링크가 원본 게시물을 가리키므로 워터마크 비교 대상도 아님)
+            if record.get("retruthed"):
                 continue
 
+            # 마지막 수집 게시물이 삭제된 경우에도 워터마크를 지나면 종료
+            if not record.get("pinned") and passed_watermark(watermark, post_id_from_url(post_url), et_time):
+                logger.info("🎯 워터마크 통과 → 스크롤 종료")
+                return collected
+
             # 본문
-            text_parts = []
-            for elem in post.descendants:
-                if getattr(elem, "name", None) == "br":
-                    text_parts.append("\n")
-                elif isinstance(elem, str):
-                    t = elem.strip()
-                    if t:
-                        text_parts.append(t)
-
-            text = "".join(text_parts).strip()
+            text = (record.get("text") or "").strip()
             if not text:
                 continue
 
-            timestamp_raw = time_tag['title'] if time_tag and time_tag.has_attr('title') else "N/A"
-            et_time = kst_to_et(timestamp_raw) if timestamp_raw != "N/A" else "N/A"
-
             collected.append({
                 "time": et_time,
                 "kst_time": timestamp_raw,
                 "content": text,
-                "url": url
+                "url": post_url,
+                "source": source
             })
 
-            found_new = True
-
-            print(f"[수집] {len(collected)}개 URL 확보")
+            logger.debug(f"[수집] {len(collected)}개 URL 확보")
+            metrics.inc("posts_collected_total", backend="selenium")
+            if on_post:
+                on_post(collected[-1])
 
             if len(collected) >= max_count:
                 return collected
 
         # 스크롤 다운
-        driver.execute_script("window.scrollBy(0, 800);")
-        time.sleep(2.0)
+        with metrics.span("scrape.scroll"):
+            driver.execute_script("window.scrollBy(0, 800);")
+            time.sleep(2.0)
 
         scroll_attempts += 1
 
@@ -0,0 +1,126 @@
+import asyncio
+import logging
+import multiprocessing
+import queue
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.util import Finalize
+
+from config import Config
+from modules.browser import DriverManager
+from modules.dedup import account_from_url
+from modules.scraper import collect_new_posts, probe_top_post
+from modules.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# 워커 프로세스마다 하나씩 띄우는 브라우저 (사이클 간 재사용)
+_browser = None
+
+def _init_worker(headless):
+    global _browser
+    _browser = DriverManager(headless=headless)
+    # 워커 프로세스가 종료될 때 브라우저도 함께 종료
+    Finalize(_browser, _browser.quit, exitpriority=10)
+
+def scrape_source(browser, url, existing_urls, watermark, probe=True, on_post=None, max_count=100):
+    """
+    한 계정의 타임라인: 상단 게시물 확인 → 신규 게시물 수집 (블로킹)
+    Returns: 게시물 목록 (상단 게시물이 이미 수집한 것이면 빈 목록)
+    """
+    if probe:
+        if not browser.run(probe_top_post, existing_urls, watermark, url=url):
+            logger.info(f"🔄 {account_from_url(url)}: 신규 글 없음 (상단 게시물 변화 없음)")
+            return []
+    return browser.run(
+        collect_new_posts, existing_urls, max_count=max_count, watermark=watermark,
+        on_post=on_post, reload=not probe, url=url
+    )
+
+def _scrape_in_worker(url, existing_urls, watermark, probe, out_q):
+    try:
+        return scrape_source(_browser, url, existing_urls, watermark, probe, on_post=out_q.put if out_q else None)
+    finally:
+        if out_q:
+            out_q.put(None)
+
+class ScraperPool:
+    """
+    여러 계정을 동시에 수집하는 브라우저 워커 풀
+    - 워커 프로세스마다 자기 Chrome 세션을 띄워 두고 사이클 간 재사용
+    - 계정마다 한 작업 → 계정 수가 워커 수 이하면 사이클 시간은 가장 느린 계정 기준
+    - 수집한 게시물은 관리자 큐로 즉시 부모 프로세스에 전달 (스트리밍 파이프라인의 분석 큐로)
+    - workers <= 1 이면 프로세스 없이 현재 프로세스의 브라우저 하나로 차례대로 수집
+    """
+
+    def __init__(self, browser, workers=None, headless=None):
+        self.browser = browser
+        self.workers = Config.SCRAPER_WORKERS if workers is None else workers
+        self.headless = headless
+        self._executor = None
+        self._manager = None
+        self._lock = asyncio.Lock()
+
+    def _get_executor(self):
+        if self._executor is None:
+            logger.info(f"🌐 브라우저 워커 {self.workers}개 시작")
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_init_worker, initargs=(self.headless,)
+            )
+            self._manager = multiprocessing.Manager()
+        return self._executor
+
+    async def scrape(self, url, existing_urls, watermark, probe=True, on_post=None):
+        """
+        on_post: 코루틴 함수 (게시물을 수집할 때마다 호출)
+        Returns: 게시물 목록
+        """
+        with metrics.span("scrape.source", source=account_from_url(url)):
+            if self.workers <= 1:
+                return await self._scrape_local(url, existing_urls, watermark, probe, on_post)
+            return await self._scrape_in_pool(url, existing_urls, watermark, probe, on_post)
+
+    async def _scrape_local(self, url, existing_urls, watermark, probe, on_post):
+        loop = asyncio.get_running_loop()
+
+        def emit(post):
+            asyncio.run_coroutine_threadsafe(on_post(post), loop).result()
+
+        # 브라우저가 하나뿐이므로 계정을 차례대로
+        async with self._lock:
+            return await asyncio.to_thread(
+                scrape_source, self.browser, url, existing_urls, watermark, probe, emit if on_post else None
+            )
+
+    async def _scrape_in_pool(self, url, existing_urls, watermark, probe, on_post):
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        out_q = self._manager.Queue() if on_post else None
+        future = loop.run_in_executor(executor, _scrape_in_worker, url, existing_urls, watermark, probe, out_q)
+
+        if out_q is not None:
+            while True:
+                try:
+                    post = await asyncio.to_thread(out_q.get, True, 0.5)
+                except queue.Empty:
+                    if future.done():
+                        break  # 워커가 비정상 종료 (종료 신호 없음)
+                    continue
+                if post is None:
+                    break
+                await on_post(post)
+
+        try:
+            return await future
+        except BrokenProcessPool:
+            # 워커가 죽으면 풀 전체를 다시 만듦 (다음 사이클부터)
+            self.close()
+            raise
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
@@ -1,40 +1,74 @@
-import os
-import pandas as pd
-from supabase import create_client, Client
+import logging
+from datetime import datetime
+
 from config import Config
+from modules.history import HistoryStore
+from modules.local_store import LocalStore
+from modules.writer import SupabaseWriter
+from modules.metrics import metrics
+
+logger = logging.getLogger(__name__)
 
 class Storage:
     def __init__(self):
-        self.supabase: Client = None
+        # 비동기 Supabase 쓰기 (연결 재사용 + 재시도 + 로컬 저널)
+        self.writer: SupabaseWriter = None
         if Config.SUPABASE_URL and Config.SUPABASE_KEY:
             try:
-                self.supabase = create_client(Config.SUPABASE_URL, Config.SUPABASE_KEY)
-                print("✅ Supabase 연결 성공")
+                self.writer = SupabaseWriter()
+                logger.info("✅ Supabase 연결 성공")
             except Exception as e:
-                print(f"⚠️ Supabase 연결 실패: {e}")
+                logger.warning(f"⚠️ Supabase 연결 실패: {e}")
         else:
-            print("⚠️ Supabase 설정이 없습니다. 로컬 엑셀 파일만 사용합니다.")
+            logger.warning("⚠️ Supabase 설정이 없습니다. 로컬 저장소만 사용합니다.")
+
+        # 스크래퍼 캐시 + 분석 결과 백업 (append-only SQLite)
+        self.local = LocalStore()
+
+        # 분석/스크랩 이력의 컬럼형 캐시 (분석/중복 조회용, 새 결과도 함께 추가)
+        self.history: HistoryStore = None
+        if Config.HISTORY_ENABLED:
+            try:
+                self.history = HistoryStore(local_store=self.local)
+            except Exception as e:
+                logger.warning(f"⚠️ 이력 캐시 초기화 오류: {e}")
 
-    def save_results(self, new_posts, analysis_results):
+    async def close(self):
+        if self.writer:
+            await self.writer.close()
+
+    @metrics.timed("storage.flush")
+    async def flush(self):
+        """
+        저널에 남아 있는 Supabase 쓰기를 재전송합니다. (백엔드 복구 시)
+        """
+        if self.writer:
+            return await self.writer.flush()
+
+    @metrics.timed("storage.save_results")
+    async def save_results(self, new_posts, analysis_results):
         """
-        Save results to both Supabase and Excel (as backup)
+        Save results to both Supabase and the local store (as backup)
         Returns: Dictionary mapping tweet URLs to their database IDs
         """
         url_id_map = {}
         
         # 1. Save to Supabase
-        if self.supabase:
-            url_id_map = self._save_to_supabase(analysis_results)
+        if self.writer:
+            url_id_map = await self._save_to_supabase(analysis_results)
 
-        # 2. Save to Excel (Legacy/Backup)
-        self._save_to_excel(analysis_results)
+        # 2. Save to local store (Backup)
+        self._save_to_local(analysis_results)
+        self._save_to_history("analysis", analysis_results)
         
         return url_id_map
 
-    def _save_to_supabase(self, results):
+    @metrics.timed("storage.save_to_supabase")
+    async def _save_to_supabase(self, results):
         """
         Save analysis results to Supabase posts table
-        Returns: List of inserted/updated post IDs with their tweet URLs
+        Returns: Dictionary mapping tweet URLs to their post IDs
+        (실패한 행은 저널에 남아 다음 쓰기 때 재전송됩니다)
         """
         try:
             # Prepare data for Supabase
@@ -43,6 +77,7 @@ class Storage:
             for item in results:
                 row = {
                     "url": item.get('tweet_url'),
+                    "source": item.get('source'),
                     "content": item.get('tweet_content'),
                     "time_str": item.get('time_str'),
                     "time": item.get('time'), # Ensure this key exists in results or map from posted_time
@@ -56,95 +91,156 @@ class Storage:
                 data_to_insert.append(row)
 
             if data_to_insert:
-                response = self.supabase.table("posts").upsert(data_to_insert, on_conflict="url").execute()
-                print(f"✅ Supabase 저장 완료: {len(data_to_insert)}개 항목")
-                
-                # Return list of (url, id) tuples for report generation
-                inserted_data = response.data
-                url_id_map = {}
-                if inserted_data:
-                    for record in inserted_data:
-                        url_id_map[record.get('url')] = record.get('id')
-                return url_id_map
+                outcome = await self.writer.write(posts=data_to_insert)
+                return outcome["url_ids"]
             return {}
         except Exception as e:
-            print(f"⚠️ Supabase 저장 오류: {e}")
+            logger.warning(f"⚠️ Supabase 저장 오류: {e}")
+            metrics.inc("errors_total", span="storage.save_to_supabase")
             return {}
 
-    def _save_to_excel(self, results, filename="trump_posts_AI_analysis.xlsx"):
+    @metrics.timed("storage.save_to_local")
+    def _save_to_local(self, results):
         if not results:
             return
 
         try:
-            if os.path.exists(filename):
-                df_existing = pd.read_excel(filename)
-                df_new = pd.DataFrame(results)
-                df_combined = pd.concat([df_new, df_existing], ignore_index=True)
-                df_combined.drop_duplicates(subset=['tweet_url'], keep='first', inplace=True)
-            else:
-                df_combined = pd.DataFrame(results)
-
-            df_combined.to_excel(filename, index=False, engine='openpyxl')
-            print(f"✅ 엑셀 저장 완료: {filename}")
+            count = self.local.append_analysis_results(results)
+            logger.info(f"✅ 로컬 백업 저장 완료: {count}개 항목")
         except Exception as e:
-            print(f"⚠️ 엑셀 저장 오류: {e}")
+            logger.warning(f"⚠️ 로컬 백업 저장 오류: {e}")
+            metrics.inc("errors_total", span="storage.save_to_local")
+
+    @metrics.timed("storage.save_to_history")
+    def _save_to_history(self, dataset, rows):
+        if not self.history or not rows:
+            return
 
-    def get_existing_urls(self, excel_path="trump_posts_scraped.xlsx"):
+        try:
+            self.history.append(dataset, rows)
+        except Exception as e:
+            logger.warning(f"⚠️ 이력 캐시 저장 오류: {e}")
+            metrics.inc("errors_total", span="storage.save_to_history")
+
+    @metrics.timed("storage.get_existing_urls")
+    def get_existing_urls(self):
         # Ideally fetch from Supabase too, but for now keep local cache for scraper efficiency
-        if os.path.exists(excel_path):
-            try:
-                df = pd.read_excel(excel_path)
-                return set(df['url'].astype(str))
-            except:
-                return set()
-        return set()
-
-    def save_raw_posts(self, posts, excel_path="trump_posts_scraped.xlsx"):
-        # Save raw scraped data to Excel (scraper cache)
+        try:
+            return self.local.get_urls("scraped_posts")
+        except Exception as e:
+            logger.warning(f"⚠️ 기존 URL 조회 오류: {e}")
+            metrics.inc("errors_total", span="storage.get_existing_urls")
+            return set()
+
+    @metrics.timed("storage.get_post_index")
+    def get_post_index(self):
+        """
+        스크래퍼 종료 조건용: 이미 수집한 게시물 ID 인덱스 (정렬 배열)
+        """
+        try:
+            return self.local.load_post_index()
+        except Exception as e:
+            logger.warning(f"⚠️ 게시물 인덱스 조회 오류: {e}")
+            metrics.inc("errors_total", span="storage.get_post_index")
+            return set()
+
+    @metrics.timed("storage.get_watermark")
+    def get_watermark(self, account):
+        """
+        계정별 워터마크 (마지막으로 수집한 가장 최신 게시물)
+        Returns: {"post_id", "time", "url"} 또는 None
+        """
+        try:
+            return self.local.get_watermark(account)
+        except Exception as e:
+            logger.warning(f"⚠️ 워터마크 조회 오류: {e}")
+            metrics.inc("errors_total", span="storage.get_watermark")
+            return None
+
+    @metrics.timed("storage.save_raw_posts")
+    def save_raw_posts(self, posts):
+        # Save raw scraped data to the local store (scraper cache)
         if not posts:
             return
             
         try:
-            if os.path.exists(excel_path):
-                df = pd.read_excel(excel_path)
-                new_df = pd.DataFrame(posts)
-                df = pd.concat([new_df, df], ignore_index=True)
-                df.drop_duplicates(subset=['url'], keep='first', inplace=True)
-            else:
-                df = pd.DataFrame(posts)
-            
-            df.to_excel(excel_path, index=False)
+            self.local.append_raw_posts(posts)
         except Exception as e:
-            print(f"⚠️ Raw 데이터 저장 오류: {e}")
+            logger.warning(f"⚠️ Raw 데이터 저장 오류: {e}")
+            metrics.inc("errors_total", span="storage.save_raw_posts")
+        self._save_to_history("scraped", posts)
+
+    def export_to_excel(self):
+        """
+        로컬 저장소 내용을 엑셀 파일로 내보냅니다. (요청 시에만 실행)
+        Returns: 생성된 파일 경로 목록
+        """
+        return [
+            self.local.export_to_excel("scraped_posts"),
+            self.local.export_to_excel("analysis_results"),
+        ]
+
+    @staticmethod
+    def _report_row(report_data):
+        return {
+            "title": report_data.get('title', ''),
+            "time": datetime.now().isoformat(),  # 리포트 생성 시간
+            "forecast": report_data.get('forecast', ''),
+            "posts": report_data.get('posts', ''),
+            "model": report_data.get('model', 0.0),
+            "stock": report_data.get('stock', '')
+        }
 
-    def save_report_to_supabase(self, post_id, report_data, tweet_time_str):
+    async def save_report_to_supabase(self, post_id, report_data, tweet_time_str, tweet_url=None):
         """
         Save report data to Supabase analyze table
         
         Args:
-            post_id: ID from posts table
+            post_id: ID from posts table (None 이면 tweet_url 로 연결)
             report_data: Dict containing title, forecast, posts, model, stock
             tweet_time_str: Original tweet timestamp (KST)
+            tweet_url: URL of the post the report belongs to
         """
-        if not self.supabase:
-            print("⚠️ Supabase 연결이 없어 리포트를 저장할 수 없습니다.")
-            return
+        return await self.save_reports([(post_id, report_data, tweet_time_str, tweet_url)])
+
+    @metrics.timed("storage.save_reports")
+    async def save_reports(self, reports):
+        """
+        Save several reports to the Supabase analyze table in one bulk upsert
         
-        try:
-            from datetime import datetime
-            
-            report_row = {
-                "id": post_id,
-                "title": report_data.get('title', ''),
-                "time": datetime.now().isoformat(),  # 리포트 생성 시간
-                "forecast": report_data.get('forecast', ''),
-                "posts": report_data.get('posts', ''),
-                "model": report_data.get('model', 0.0),
-                "stock": report_data.get('stock', '')
-            }
-            
-            response = self.supabase.table("analyze").upsert(report_row, on_conflict="id").execute()
-            print(f"✅ 리포트 저장 완료 (ID: {post_id}): {report_data.get('title')[:30]}...")
+        Args:
+            reports: List of (post_id, report_data, tweet_time_str, tweet_url)
+                     post_id 를 아직 모르면 None → 게시물 저장 후 tweet_url 로 연결
             
+        Returns:
+            Dict with 'saved' (list of post IDs), 'queued' (저널에 남은 항목 수)
+            and 'failed' (list of (post_id or url, error message))
+        """
+        outcome = {"saved": [], "queued": 0, "failed": []}
+        if not reports:
+            return outcome
+
+        if not self.writer:
+            logger.warning(f"⚠️ Supabase 연결이 없어 리포트 {len(reports)}개를 저장할 수 없습니다.")
+            outcome["failed"] = [(post_id or url, "Supabase 연결 없음") for post_id, _, _, url in reports]
+            return outcome
+
+        try:
+            result = await self.writer.write(reports=[
+                {"post_id": post_id, "post_url": url, "row": self._report_row(report_data)}
+                for post_id, report_data, _, url in reports
+            ])
+            outcome["saved"] = result["saved_reports"]
+            outcome["queued"] = result["queued"]
+            outcome["failed"] = [(key, error) for table, key, error in result["failed"] if table == "analyze"]
         except Exception as e:
-            print(f"⚠️ 리포트 저장 오류: {e}")
+            logger.warning(f"⚠️ 리포트 저장 오류: {e}")
+            metrics.inc("errors_total", span="storage.save_reports")
+            outcome["failed"] = [(post_id or url, str(e)) for post_id, _, _, url in reports]
+
+        logger.info(f"✅ 리포트 일괄 저장: 성공 {len(outcome['saved'])}개 / 대기 {outcome['queued']}개 / 실패 {len(outcome['failed'])}개")
+        metrics.inc("reports_total", len(outcome["saved"]), result="saved")
+        metrics.inc("reports_total", len(outcome["failed"]), result="failed")
+        for key, error in outcome["failed"]:
+            logger.error(f"❌ 리포트 저장 실패 ({key}): {error}")
+        return outcome
@@ -0,0 +1,283 @@
+import asyncio
+import json
+import logging
+import os
+import random
+
+import httpx
+
+from config import Config
+from modules.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# 재시도해도 소용없는 오류 (잘못된 데이터 등) 와 구분하기 위한 상태 코드
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+# 테이블별 upsert 충돌 키
+CONFLICT_KEYS = {
+    "posts": "url",
+    "analyze": "id",
+}
+
+# 나중에 추가된 컬럼 (unified_schema.sql 의 ALTER) → 테이블에 없으면 보내지 않음 (처음 쓸 때 한 번 확인)
+OPTIONAL_COLUMNS = {
+    "posts": ("source",),
+}
+
+# PostgREST 의 "컬럼 없음" 오류 코드 (select: 42703, insert/upsert: PGRST204)
+MISSING_COLUMN_CODES = ("42703", "PGRST204")
+
+class WriteError(Exception):
+    def __init__(self, message, retryable=True, status=None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.status = status
+
+class SupabaseWriter:
+    """
+    Supabase(PostgREST) 비동기 쓰기 클라이언트
+    - 하나의 httpx.AsyncClient 로 연결을 재사용
+    - 일시적 오류(네트워크, 429, 5xx)는 지수 백오프로 재시도
+    - 끝내 실패한 쓰기는 로컬 저널(JSONL)에 기록해 두었다가 다음 쓰기 때 함께 재전송
+      (저널 + 신규 행을 테이블별로 합쳐 한 번에 upsert)
+    - 리포트는 게시물 URL 로 보관 → 게시물 ID 를 모르는 상태(posts 저장 실패)에서도 유실되지 않음
+    """
+
+    def __init__(self, url=None, key=None, journal_path=None, max_retries=None, timeout=None):
+        url = url or Config.SUPABASE_URL
+        key = key or Config.SUPABASE_KEY
+        self.journal_path = journal_path or Config.WRITE_JOURNAL_PATH
+        self.max_retries = Config.WRITE_MAX_RETRIES if max_retries is None else max_retries
+        self.client = httpx.AsyncClient(
+            base_url=url.rstrip("/") + "/rest/v1",
+            headers={
+                "apikey": key,
+                "Authorization": f"Bearer {key}",
+                "Content-Type": "application/json",
+            },
+            timeout=timeout or Config.WRITE_TIMEOUT,
+        )
+        self.url_ids = {}  # 게시물 URL → posts.id (이번 실행 중 확인된 것)
+        self.missing_columns = {}  # 테이블 → 없는 선택 컬럼 (확인 전이면 키 없음)
+        self._lock = asyncio.Lock()
+
+    async def close(self):
+        await self.client.aclose()
+
+    # ------------------------------------------------------------------
+    # HTTP
+    # ------------------------------------------------------------------
+    async def _request(self, method, path, **kwargs):
+        delay = Config.WRITE_RETRY_BASE
+        for attempt in range(self.max_retries + 1):
+            try:
+                with metrics.span("supabase.request", method=method, table=path.strip("/")):
+                    response = await self.client.request(method, path, **kwargs)
+            except httpx.TransportError as e:
+                error = WriteError(f"{e.__class__.__name__}: {e}")
+            else:
+                if response.status_code < 300:
+                    return response
+                error = WriteError(
+                    f"HTTP {response.status_code}: {response.text[:200]}",
+                    retryable=response.status_code in RETRYABLE_STATUS,
+                    status=response.status_code,
+                )
+
+            if not error.retryable or attempt == self.max_retries:
+                raise error
+            wait = delay * (2 ** attempt) * (1 + random.random() * 0.25)
+            logger.info(f"🔁 Supabase 재시도 {attempt + 1}/{self.max_retries} ({wait:.1f}초 후): {error}")
+            metrics.inc("supabase_retries_total")
+            await asyncio.sleep(wait)
+
+    async def _missing_columns(self, table):
+        """
+        OPTIONAL_COLUMNS 중 테이블에 없는 컬럼 (프로세스당 한 번 확인)
+        일시적 오류는 WriteError 그대로 (확인 결과를 저장하지 않고 다음 쓰기 때 다시)
+        """
+        if table not in self.missing_columns:
+            missing = set()
+            for column in OPTIONAL_COLUMNS.get(table, ()):
+                try:
+                    await self._request("GET", f"/{table}", params={"select": column, "limit": 0})
+                except WriteError as e:
+                    if e.retryable or not any(code in str(e) for code in MISSING_COLUMN_CODES):
+                        raise
+                    missing.add(column)
+                    logger.error(
+                        f"❌ Supabase {table} 테이블에 '{column}' 컬럼이 없습니다 → 이 컬럼 없이 저장합니다. "
+                        f"unified_schema.sql 의 마이그레이션 (ALTER TABLE {table} ADD COLUMN ...) 을 실행하세요."
+                    )
+                    metrics.inc("supabase_missing_columns_total", table=table, column=column)
+            self.missing_columns[table] = missing
+        return self.missing_columns[table]
+
+    async def _upsert(self, table, rows, returning=False):
+        missing = await self._missing_columns(table)
+        if missing:
+            rows = [{key: value for key, value in row.items() if key not in missing} for row in rows]
+        response = await self._request(
+            "POST",
+            f"/{table}",
+            params={"on_conflict": CONFLICT_KEYS[table]},
+            headers={"Prefer": "resolution=merge-duplicates," + ("return=representation" if returning else "return=minimal")},
+            content=json.dumps(rows, ensure_ascii=False, default=str),
+        )
+        return response.json() if returning else []
+
+    async def _lookup_post_ids(self, urls):
+        urls = [url for url in urls if url and url not in self.url_ids]
+        if not urls:
+            return
+        quoted = ",".join('"' + url.replace('"', '\\"') + '"' for url in urls)
+        response = await self._request("GET", "/posts", params={"select": "id,url", "url": f"in.({quoted})"})
+        for record in response.json():
+            self.url_ids[record.get("url")] = record.get("id")
+
+    # ------------------------------------------------------------------
+    # Write-behind journal
+    # ------------------------------------------------------------------
+    def _read_journal(self):
+        entries = []
+        if not os.path.exists(self.journal_path):
+            return entries
+        with open(self.journal_path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        continue
+        return entries
+
+    def _write_journal(self, entries):
+        if not entries:
+            if os.path.exists(self.journal_path):
+                os.remove(self.journal_path)
+            return
+        tmp_path = self.journal_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+        os.replace(tmp_path, self.journal_path)
+
+    @staticmethod
+    def _coalesce(entries, key):
+        # 같은 키는 마지막 값만 남김 (저널 → 신규 순서이므로 최신 값 우선)
+        merged = {}
+        for entry in entries:
+            merged[key(entry)] = entry
+        return list(merged.values())
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    async def upsert(self, table, rows):
+        """
+        저널 없이 바로 upsert 합니다. (대량 적재용, 일시적 오류는 재시도)
+        Raises: WriteError
+        """
+        await self._upsert(table, rows)
+
+    @metrics.timed("supabase.write")
+    async def write(self, posts=(), reports=()):
+        """
+        posts: posts 테이블 행 목록
+        reports: {"post_url", "post_id"(없으면 None), "row"} 목록 (row 에는 id 제외)
+
+        Returns:
+            Dict with 'url_ids' (URL → posts.id), 'saved_reports' (post IDs),
+            'queued' (저널에 남은 항목 수), 'failed' (재시도 불가 오류 목록)
+        """
+        async with self._lock:
+            journal = self._read_journal()
+            post_entries = self._coalesce(
+                [e for e in journal if e.get("table") == "posts"]
+                + [{"table": "posts", "row": row} for row in posts],
+                key=lambda e: e["row"].get("url")
+            )
+            report_entries = self._coalesce(
+                [e for e in journal if e.get("table") == "analyze"]
+                + [{"table": "analyze", "post_url": r.get("post_url"), "post_id": r.get("post_id"), "row": r["row"]}
+                   for r in reports],
+                # URL 로 합침 (저널의 ID 없는 항목과 ID 가 채워진 신규 항목도 같은 게시물로)
+                key=lambda e: e.get("post_url") or e.get("post_id")
+            )
+            replayed = len(journal)
+            if replayed:
+                logger.info(f"📼 저널 재전송: {replayed}개 항목")
+
+            outcome = {"url_ids": {}, "saved_reports": [], "queued": 0, "failed": []}
+            remaining = []
+
+            # 1. posts (ID 를 돌려받아 리포트 연결에 사용)
+            if post_entries:
+                try:
+                    records = await self._upsert("posts", [e["row"] for e in post_entries], returning=True)
+                    for record in records:
+                        self.url_ids[record.get("url")] = record.get("id")
+                        outcome["url_ids"][record.get("url")] = record.get("id")
+                    logger.info(f"✅ Supabase 저장 완료: {len(post_entries)}개 항목")
+                except WriteError as e:
+                    if e.retryable:
+                        logger.warning(f"⚠️ Supabase 저장 오류 → 저널에 보관: {e}")
+                        remaining.extend(post_entries)
+                    else:
+                        logger.error(f"❌ Supabase 저장 오류 (재시도 불가): {e}")
+                        outcome["failed"].extend(("posts", entry["row"].get("url"), str(e)) for entry in post_entries)
+
+            # 2. analyze (게시물 ID 를 모르면 URL 로 조회)
+            if report_entries:
+                lookup_ok = True
+                try:
+                    await self._lookup_post_ids(
+                        [e.get("post_url") for e in report_entries if not e.get("post_id")]
+                    )
+                except WriteError as e:
+                    lookup_ok = False
+                    logger.warning(f"⚠️ 게시물 ID 조회 오류: {e}")
+
+                pending_urls = {e["row"].get("url") for e in remaining if e.get("table") == "posts"}
+                ready, waiting = [], []
+                for entry in report_entries:
+                    post_id = entry.get("post_id") or self.url_ids.get(entry.get("post_url"))
+                    if post_id:
+                        entry["post_id"] = post_id
+                        ready.append(entry)
+                    elif not lookup_ok or entry.get("post_url") in pending_urls:
+                        # 게시물이 아직 저장되지 않음 → 다음 쓰기 때 다시 연결
+                        waiting.append(entry)
+                    else:
+                        outcome["failed"].append(("analyze", entry.get("post_url"), "posts 테이블에 게시물 없음"))
+
+                # ID 조회 후 같은 게시물 ID 로 합침 (한 upsert 안에 같은 id 가 두 번 들어가면 PostgREST 가 거부)
+                ready = self._coalesce(ready, key=lambda e: e["post_id"])
+                if ready:
+                    try:
+                        await self._upsert("analyze", [dict(e["row"], id=e["post_id"]) for e in ready])
+                        outcome["saved_reports"] = [e["post_id"] for e in ready]
+                    except WriteError as e:
+                        if e.retryable:
+                            logger.warning(f"⚠️ 리포트 저장 오류 → 저널에 보관: {e}")
+                            remaining.extend(ready)
+                        else:
+                            logger.error(f"❌ 리포트 저장 오류 (재시도 불가): {e}")
+                            outcome["failed"].extend(("analyze", entry["post_id"], str(e)) for entry in ready)
+                remaining.extend(waiting)
+
+            self._write_journal(remaining)
+            outcome["queued"] = len(remaining)
+            metrics.gauge("supabase_journal_queued", len(remaining))
+            metrics.inc("supabase_write_failures_total", len(outcome["failed"]))
+            if remaining:
+                logger.info(f"📼 저널 대기: {len(remaining)}개 항목 (다음 쓰기 때 재전송)")
+            return outcome
+
+    async def flush(self):
+        """
+        저널에 남은 항목만 재전송합니다.
+        """
+        return await self.write()
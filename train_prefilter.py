@@ -0,0 +1,181 @@
+"""
+LLM 사전 필터 (modules/prefilter.py) 학습 및 평가
+- 라벨: 저장된 분석 결과 (이력 캐시) 의 impact_on_market ('No' 이면 양성)
+- 검증 세트 (URL 해시 기준 20%) 에서 임계값별 'No' 정밀도/재현율을 출력하고,
+  목표 정밀도를 만족하는 가장 낮은 임계값을 골라 전체 데이터로 다시 학습해 저장
+사용법:
+    python train_prefilter.py [--target-precision 0.97] [--out prefilter_model.json]
+    python train_prefilter.py --eval prefilter_model.json   # 저장된 라벨 전체에 대한 평가만
+"""
+import argparse
+import os
+import time
+import zlib
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from config import Config
+from modules.history import HistoryStore
+from modules.local_store import LocalStore
+from modules.prefilter import N_FEATURES, SKIP_REASON, NoImpactFilter, features
+from modules.preprocessor import preprocess_batch
+
+THRESHOLDS = (0.5, 0.6, 0.7, 0.8, 0.85, 0.9, 0.95, 0.97, 0.99)
+
+def load_labeled(history=None):
+    """
+    이력 캐시 (엑셀 + 로컬 저장소) 에서 라벨이 있는 분석 결과만, 필요한 컬럼만 읽습니다.
+    사전 필터가 직접 'No' 로 건너뛴 행은 LLM 라벨이 아니므로 제외 (자기 예측으로 다시 학습하지 않도록)
+    """
+    history = history or HistoryStore(local_store=LocalStore())
+    df = history.query(
+        "analysis",
+        ["url", "content", "original_tweet", "impact_on_market", "reason"],
+        impact=["Direct", "Indirect", "No"],
+    )
+    df = df[~df["reason"].fillna("").astype(str).str.startswith(SKIP_REASON)]
+    raw = df["original_tweet"].fillna(df["content"]).fillna("").astype(str)
+    data = pd.DataFrame({
+        "url": df["url"].astype(str),
+        "text": preprocess_batch(raw.tolist()),
+        "label": df["impact_on_market"].astype(str),
+    })
+    # 같은 본문이 여러 URL 로 있으면 하나만 사용
+    return data[data["text"] != ""].drop_duplicates("text", keep="last").reset_index(drop=True)
+
+def is_validation(url):
+    return zlib.crc32(url.encode("utf-8")) % 5 == 0
+
+def train(texts, labels, epochs=300, lr=0.5, l2=1e-4):
+    """
+    해시 특징 로지스틱 회귀 (전체 배치 Adagrad)
+    labels: 1 = 'No'
+    """
+    rows, cols = [], []
+    for row, text in enumerate(texts):
+        indices = features(text)
+        rows.extend([row] * len(indices))
+        cols.extend(indices)
+    rows = np.asarray(rows, dtype=np.int64)
+    cols = np.asarray(cols, dtype=np.int64)
+    y = np.asarray(labels, dtype=np.float64)
+    n = len(y)
+
+    weights = np.zeros(N_FEATURES)
+    bias = 0.0
+    g2_w = np.full(N_FEATURES, 1e-8)
+    g2_b = 1e-8
+    for _ in range(epochs):
+        z = bias + np.bincount(rows, weights=weights[cols], minlength=n)
+        error = 1.0 / (1.0 + np.exp(-z)) - y
+        grad_w = np.bincount(cols, weights=error[rows], minlength=N_FEATURES) / n + l2 * weights
+        grad_b = error.mean()
+        g2_w += grad_w ** 2
+        g2_b += grad_b ** 2
+        weights -= lr * grad_w / np.sqrt(g2_w)
+        bias -= lr * grad_b / np.sqrt(g2_b)
+
+    used = np.unique(cols)
+    return {int(i): float(weights[i]) for i in used}, float(bias)
+
+def report(scores, labels, thresholds=THRESHOLDS):
+    """
+    임계값별 'No' 정밀도/재현율, 건너뛸 비율, 잘못 건너뛴 Direct/Indirect 수
+    """
+    scores = np.asarray(scores)
+    labels = np.asarray(labels)
+    is_no = labels == "No"
+    rows = []
+    print(f"   {'threshold':>9} {'precision':>9} {'recall':>7} {'skipped':>8} {'miss Direct':>11} {'miss Indirect':>13}")
+    for threshold in thresholds:
+        skipped = scores >= threshold
+        tp = int((skipped & is_no).sum())
+        precision = tp / skipped.sum() if skipped.any() else 1.0
+        recall = tp / is_no.sum() if is_no.any() else 0.0
+        row = {
+            "threshold": threshold,
+            "precision": round(float(precision), 4),
+            "recall": round(float(recall), 4),
+            "skip_rate": round(float(skipped.mean()), 4),
+            "missed_direct": int((skipped & (labels == "Direct")).sum()),
+            "missed_indirect": int((skipped & (labels == "Indirect")).sum()),
+        }
+        rows.append(row)
+        print(
+            f"   {threshold:>9.2f} {row['precision']:>9.1%} {row['recall']:>7.1%} {row['skip_rate']:>8.1%} "
+            f"{row['missed_direct']:>11} {row['missed_indirect']:>13}"
+        )
+    return rows
+
+def pick_threshold(rows, target_precision):
+    """
+    목표 정밀도를 만족하고 Direct 게시물을 하나도 건너뛰지 않는 가장 낮은 임계값 (없으면 None)
+    """
+    for row in rows:
+        if row["precision"] >= target_precision and row["missed_direct"] == 0:
+            return row
+    return None
+
+def evaluate(path):
+    model = NoImpactFilter.load(path)
+    if model is None:
+        return
+    data = load_labeled()
+    start = time.perf_counter()
+    scores = [model.score(text) for text in data["text"]]
+    elapsed = time.perf_counter() - start
+    print(f"📊 저장된 라벨 전체 평가: {len(data)}개 (게시물당 {elapsed / len(data) * 1e6:.1f}µs)")
+    print("   (학습에 사용된 데이터 포함 → 새 게시물 기준 성능은 학습 시 출력되는 검증 세트 결과를 참고)")
+    report(scores, data["label"], sorted(set(THRESHOLDS) | {model.threshold}))
+    print(f"   (현재 임계값: {model.threshold})")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--out", default=Config.PREFILTER_MODEL_PATH)
+    parser.add_argument("--target-precision", type=float, default=0.97, help="검증 세트에서 'No' 정밀도 목표")
+    parser.add_argument("--epochs", type=int, default=300)
+    parser.add_argument("--l2", type=float, default=1e-4)
+    parser.add_argument("--eval", metavar="MODEL", help="학습 없이 저장된 모델만 평가")
+    args = parser.parse_args()
+
+    if args.eval:
+        evaluate(args.eval)
+        return 0
+
+    data = load_labeled()
+    validation = data["url"].map(is_validation)
+    train_set, valid_set = data[~validation], data[validation]
+    print(f"📂 라벨 데이터 {len(data)}개 (학습 {len(train_set)} / 검증 {len(valid_set)})")
+    print(f"   {data['label'].value_counts().to_dict()}")
+
+    weights, bias = train(train_set["text"].tolist(), (train_set["label"] == "No").tolist(), args.epochs, l2=args.l2)
+    model = NoImpactFilter(weights, bias, threshold=1.0)
+    print("📊 검증 세트:")
+    rows = report([model.score(text) for text in valid_set["text"]], valid_set["label"])
+    chosen = pick_threshold(rows, args.target_precision)
+    if chosen is None:
+        # 기준 없이 저장하면 PREFILTER_ENABLED (기본 true) 로 바로 사용되어 Direct 게시물도 건너뛸 수 있음
+        print(
+            f"❌ 정밀도 {args.target_precision:.0%} 이상이면서 Direct 를 놓치지 않는 임계값이 없습니다 → 모델을 저장하지 않습니다."
+        )
+        if os.path.exists(args.out):
+            print(f"   기존 모델 ({args.out}) 은 그대로 사용됩니다. 사용하지 않으려면 PREFILTER_ENABLED=false 또는 파일을 삭제하세요.")
+        return 1
+    print(f"✅ 선택된 임계값: {chosen['threshold']} (정밀도 {chosen['precision']:.1%}, 재현율 {chosen['recall']:.1%})")
+
+    # 전체 데이터로 다시 학습해 저장
+    weights, bias = train(data["text"].tolist(), (data["label"] == "No").tolist(), args.epochs, l2=args.l2)
+    model = NoImpactFilter(weights, bias, threshold=chosen["threshold"])
+    model.save(
+        args.out,
+        trained_at=datetime.now().isoformat(timespec="seconds"),
+        samples=len(data),
+        validation=chosen,
+    )
+    print(f"💾 모델 저장: {args.out} (가중치 {len(weights)}개)")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -8,6 +8,7 @@ CREATE TABLE posts (
     
     -- 식별자
     url TEXT UNIQUE NOT NULL,        -- tweet_url -> url (Excel 통일)
+    source TEXT,                     -- 수집한 계정 (@handle, SOURCES 설정)
     
     -- 내용
     content TEXT,                    -- tweet_content -> content (Excel 통일)
@@ -28,3 +29,6 @@ CREATE TABLE posts (
 -- RLS 설정
 ALTER TABLE posts ENABLE ROW LEVEL SECURITY;
 CREATE POLICY "Enable all access for all users" ON posts FOR ALL USING (true) WITH CHECK (true);
+
+-- 기존 테이블에 계정 컬럼만 추가하는 경우 (추가 전에는 source 없이 저장되고 실행 시 오류 로그로 안내)
+-- ALTER TABLE posts ADD COLUMN IF NOT EXISTS source TEXT;
@@ -1,5 +1,5 @@
 import pandas as pd
-import re
+from modules.preprocessor import preprocess_batch
 
 # === 1. 원본 엑셀 불러오기 ===
 input_file = "trump_posts_scraped.xlsx"
@@ -10,22 +10,8 @@ df = pd.read_excel(input_file)
 rt_prefixes = ("RT @", "RT:", "RT ")
 df = df[~df['content'].str.startswith(rt_prefixes, na=False)].copy()
 
-# === 3. 트윗 전처리 함수 ===
-def preprocess_tweet(tweet):
-    if pd.isna(tweet):
-        return ''
-    tweet = tweet.lower()
-    tweet = re.sub(r'@\S+', '', tweet)           # 멘션 제거
-    tweet = re.sub(r'\B#\S+', '', tweet)         # 해시태그 제거
-    tweet = re.sub(r'http\S+', '', tweet)        # URL 제거
-    tweet = ' '.join(re.findall(r'\w+', tweet)) # 특수문자 제거
-    tweet = re.sub(r'\s+[a-zA-Z]\s+', ' ', tweet) # 단일 문자 제거
-    tweet = re.sub(r'\s+', ' ', tweet).strip()     # 공백 정리
-    tweet = tweet.replace('"', '\\"')            # 큰따옴표 이스케이프
-    return tweet
-
-# === 4. content 컬럼만 clean tweet으로 변경 ===
-df['content'] = df['content'].apply(preprocess_tweet)
+# === 3~4. content 컬럼만 clean tweet으로 변경 (modules.preprocessor.preprocess_tweet 과 결과 동일) ===
+df['content'] = preprocess_batch(df['content'])
 
 # === 5. 전처리 후 RT 트윗 제거 ===
 df = df[~df['content'].str.startswith("rt", na=False)].copy()